@@ -0,0 +1,3 @@
+from .deadlines import DeadlineExceeded, deadline
+
+__all__ = ['DeadlineExceeded', 'deadline']
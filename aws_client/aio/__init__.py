@@ -0,0 +1,12 @@
+"""
+Awaitable wrappers running blocking calls on bounded per-service
+executors that share the pooled clients. Requires Python 3.7+.
+"""
+from .aws_lambda import LambdaFunction
+from .executor import configure
+from .s3 import S3Bucket
+from .sns import SNSClient
+from .sqs import SQSQueue
+
+__all__ = ['LambdaFunction', 'S3Bucket', 'SNSClient', 'SQSQueue',
+           'configure']
@@ -0,0 +1,42 @@
+from ..aws_lambda.lambda_function import \
+    LambdaFunction as BlockingLambdaFunction
+from .executor import AsyncWrapper, delegate
+
+
+class LambdaFunction(AsyncWrapper):
+    """
+    Awaitable AWS Lambda wrapper
+    """
+    service = 'lambda'
+
+    def __init__(self,
+                 function_name,
+                 region_name,
+                 aws_access_key_id,
+                 aws_secret_access_key,
+                 version=None,
+                 timeout=None,
+                 **kwargs):
+        """
+        :param function_name: AWS Lambda function name
+        :param timeout: default per-call timeout in seconds
+        :type timeout: float
+        :param kwargs: additional client settings
+        """
+        super(LambdaFunction, self).__init__(
+            BlockingLambdaFunction(function_name, region_name,
+                                   aws_access_key_id, aws_secret_access_key,
+                                   version=version, **kwargs),
+            timeout=timeout
+        )
+        self.function_name = function_name
+
+    warmup = delegate(BlockingLambdaFunction, 'warmup')
+
+    async def __call__(self, payload, async_call=True):
+        """
+        :param payload: payload object, must be json serializable
+        :param async_call: Flag for async call
+        :return: None for async_call call or AWS Lambda function result
+        """
+        return await self._run(self.wrapped, payload, async_call)
@@ -0,0 +1,141 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# calls in flight per service, independent of the HTTP connection pool
+DEFAULT_MAX_WORKERS = 256
+# concurrent long polls per service, kept apart so pollers waiting for
+# messages never hold the workers other calls need
+DEFAULT_MAX_POLLERS = 256
+
+_executors = {}
+_lock = threading.Lock()
+_limits = {'max_workers': DEFAULT_MAX_WORKERS,
+           'max_pollers': DEFAULT_MAX_POLLERS}
+
+
+def configure(max_workers=None, max_pollers=None):
+    """
+    Set executor sizes, applies to executors created afterwards
+    :param max_workers: threads per service for calls
+    :type max_workers: int
+    :param max_pollers: threads per service for long polling
+    :type max_pollers: int
+    """
+    with _lock:
+        if max_workers:
+            _limits['max_workers'] = max_workers
+        if max_pollers:
+            _limits['max_pollers'] = max_pollers
+
+
+def get_executor(service, polling=False):
+    """
+    Bounded executor for service calls.
+    Long polls get an executor of their own, a poller holds its thread for
+    the whole polling time and would otherwise starve the other calls.
+    :param service: AWS service ('s3', 'sqs' etc.)
+    :param polling: executor for long polling calls
+    :type polling: bool
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    """
+    name = '{}-poll'.format(service) if polling else service
+    executor = _executors.get(name)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=_limits[
+                        'max_pollers' if polling else 'max_workers'],
+                    thread_name_prefix='aws-client-{}'.format(name),
+                )
+                _executors[name] = executor
+    return executor
+
+
+def shutdown(wait=True):
+    """
+    Stop all service executors
+    :param wait: wait for running calls
+    """
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+def _after_fork():
+    global _lock
+    # executor threads do not exist in the child
+    _lock = threading.Lock()
+    _executors.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+async def run(service, func, *args, timeout=None, polling=False,
+              **kwargs):
+    """
+    Run blocking call on service executor.
+    Cancelling the awaiting task (or hitting `timeout`) drops the call if
+    it has not started yet, a call already in flight finishes in the
+    background and its result is discarded. The call runs in a copy of
+    the current context, so an enclosing `deadline` applies to it.
+    :param service: AWS service
+    :param func: blocking callable
+    :param timeout: seconds to wait for result
+    :param polling: run on the long polling executor of service
+    :raises asyncio.TimeoutError: on timeout
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(
+        get_executor(service, polling=polling),
+        functools.partial(context.run, func, *args, **kwargs)
+    )
+    if timeout is None:
+        return await future
+    return await asyncio.wait_for(future, timeout)
+
+
+class AsyncWrapper(object):
+    """
+    Base of awaitable wrappers around blocking ones
+    """
+    service = None
+
+    def __init__(self, wrapped, timeout=None):
+        """
+        :param wrapped: blocking wrapper
+        :param timeout: default per-call timeout in seconds
+        :type timeout: float
+        """
+        self.wrapped = wrapped
+        self.timeout = timeout
+
+    async def _run(self, func, *args, **kwargs):
+        return await run(self.service, func, *args,
+                         timeout=self.timeout, **kwargs)
+
+
+def delegate(wrapped_class, name):
+    """
+    Build awaitable method calling blocking method `name` on executor
+    :param wrapped_class: blocking wrapper class
+    :param name: method name
+    """
+    blocking = getattr(wrapped_class, name)
+
+    async def method(self, *args, **kwargs):
+        return await self._run(getattr(self.wrapped, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = blocking.__doc__
+    return method
@@ -0,0 +1,134 @@
+import itertools
+
+from ..s3.s3bucket import S3Bucket as BlockingS3Bucket
+from .executor import AsyncWrapper, delegate
+
+# records taken from the blocking listing per executor call
+PAGE_SIZE = 1000
+
+
+class S3Bucket(AsyncWrapper):
+    """
+    Awaitable interface to S3 bucket
+    """
+    service = 's3'
+
+    def __init__(self,
+                 bucket_name,
+                 region_name,
+                 aws_access_key_id,
+                 aws_secret_access_key,
+                 timeout=None,
+                 **kwargs):
+        """
+        :param bucket_name: bucket's name
+        :param timeout: default per-call timeout in seconds
+        :type timeout: float
+        :param kwargs: additional client settings
+        """
+        super(S3Bucket, self).__init__(
+            BlockingS3Bucket(bucket_name, region_name, aws_access_key_id,
+                             aws_secret_access_key, **kwargs),
+            timeout=timeout
+        )
+        self.bucket_name = bucket_name
+
+    warmup = delegate(BlockingS3Bucket, 'warmup')
+    list_objects = delegate(BlockingS3Bucket, 'list_objects')
+    copy = delegate(BlockingS3Bucket, 'copy')
+    outer_copy = delegate(BlockingS3Bucket, 'outer_copy')
+    copy_many = delegate(BlockingS3Bucket, 'copy_many')
+    upload_from_path = delegate(BlockingS3Bucket, 'upload_from_path')
+    upload_from_string = delegate(BlockingS3Bucket, 'upload_from_string')
+    exist = delegate(BlockingS3Bucket, 'exist')
+    exist_many = delegate(BlockingS3Bucket, 'exist_many')
+    sizes = delegate(BlockingS3Bucket, 'sizes')
+    download_into = delegate(BlockingS3Bucket, 'download_into')
+    download_to_path = delegate(BlockingS3Bucket, 'download_to_path')
+    remove = delegate(BlockingS3Bucket, 'remove')
+    remove_many = delegate(BlockingS3Bucket, 'remove_many')
+    remove_prefix = delegate(BlockingS3Bucket, 'remove_prefix')
+    make_public = delegate(BlockingS3Bucket, 'make_public')
+    make_private = delegate(BlockingS3Bucket, 'make_private')
+    get_file_size = delegate(BlockingS3Bucket, 'get_file_size')
+
+    async def get_object(self, key):
+        """
+        Read object, the body is read on the executor
+        :param key: path to object on bucket
+        :type key: str
+        :return: content, content-length
+        :rtype: tuple
+        """
+        def read():
+            body, length = self.wrapped.get_object(key)
+            try:
+                return body.read(), length
+            finally:
+                body.close()
+
+        return await self._run(read)
+
+    async def iter_objects(self, prefix='', delimiter=None,
+                           start_after=None, workers=1):
+        """
+        Iterate over all objects on bucket like `S3Bucket.iter_objects`,
+        records are taken from the blocking iterator on the executor a
+        page at a time
+        :param prefix: key prefix
+        :type prefix: str
+        :param delimiter: group keys sharing prefix up to delimiter
+        :type delimiter: str
+        :param start_after: list keys after this one
+        :type start_after: str
+        :param workers: concurrent listings, see `S3Bucket.iter_objects`
+        :type workers: int
+        :return: async iterator of ObjectSummary and CommonPrefix
+        """
+        records = self.wrapped.iter_objects(prefix, delimiter, start_after,
+                                            workers)
+        try:
+            while True:
+                page = await self._run(
+                    list, itertools.islice(records, PAGE_SIZE)
+                )
+                if not page:
+                    return
+                for record in page:
+                    yield record
+        finally:
+            await self._run(records.close)
+
+    def generate_url(self, *args, **kwargs):
+        """
+        Generate presigned url, signing is local so it is not awaitable
+        """
+        return self.wrapped.generate_url(*args, **kwargs)
+
+    def generate_urls(self, *args, **kwargs):
+        """
+        Generate presigned urls, signing is local so it is not awaitable
+        """
+        return self.wrapped.generate_urls(*args, **kwargs)
+
+    def generate_cloudfront_url(self, *args, **kwargs):
+        """
+        Generate CloudFront signed url, signing is local so it is not awaitable
+        """
+        return self.wrapped.generate_cloudfront_url(*args, **kwargs)
+
+    def generate_cloudfront_urls(self, *args, **kwargs):
+        """
+        Generate CloudFront signed urls, signing is local so it is not
+        awaitable
+        """
+        return self.wrapped.generate_cloudfront_urls(*args, **kwargs)
+
+    def generate_cloudfront_cookies(self, *args, **kwargs):
+        """
+        Generate CloudFront signed cookies, signing is local so it is not
+        awaitable
+        """
+        return self.wrapped.generate_cloudfront_cookies(*args, **kwargs)
+
+    reduce_url = staticmethod(BlockingS3Bucket.reduce_url)
@@ -0,0 +1,31 @@
+from ..sns.client import SNSClient as BlockingSNSClient
+from .executor import AsyncWrapper, delegate
+
+
+class SNSClient(AsyncWrapper):
+    """
+    Awaitable SNS client
+    """
+    service = 'sns'
+
+    def __init__(self,
+                 region_name,
+                 aws_access_key_id,
+                 aws_secret_access_key,
+                 timeout=None,
+                 **kwargs):
+        """
+        :param timeout: default per-call timeout in seconds
+        :type timeout: float
+        :param kwargs: additional client settings
+        """
+        super(SNSClient, self).__init__(
+            BlockingSNSClient(region_name, aws_access_key_id,
+                              aws_secret_access_key, **kwargs),
+            timeout=timeout
+        )
+
+    warmup = delegate(BlockingSNSClient, 'warmup')
+    get_topic_arn = delegate(BlockingSNSClient, 'get_topic_arn')
+    publish = delegate(BlockingSNSClient, 'publish')
+    subscribe_to_lambda = delegate(BlockingSNSClient, 'subscribe_to_lambda')
@@ -0,0 +1,75 @@
+from ..sqs.queue import SQSQueue as BlockingSQSQueue
+from .executor import AsyncWrapper, delegate, run
+
+
+class SQSQueue(AsyncWrapper):
+    """
+    Awaitable interface to SQS queue
+    """
+    service = 'sqs'
+
+    def __init__(self, queue_name,
+                 region_name,
+                 aws_access_key_id,
+                 aws_secret_access_key,
+                 auto_creation=False,
+                 endpoint_url=None,
+                 timeout=None,
+                 **kwargs):
+        """
+        Messages are returned as plain dicts from client API
+        :param queue_name: name of SQS queue
+        :param timeout: default per-call timeout in seconds, long polling
+        `wait_timeout` is added to it
+        :type timeout: float
+        :param kwargs: additional client settings
+        """
+        kwargs.setdefault('use_resource', False)
+        super(SQSQueue, self).__init__(
+            BlockingSQSQueue(queue_name, region_name, aws_access_key_id,
+                             aws_secret_access_key,
+                             auto_creation=auto_creation,
+                             endpoint_url=endpoint_url, **kwargs),
+            timeout=timeout
+        )
+
+    warmup = delegate(BlockingSQSQueue, 'warmup')
+    get_queue_url = delegate(BlockingSQSQueue, 'get_queue_url')
+    purge = delegate(BlockingSQSQueue, 'purge')
+    send_messages = delegate(BlockingSQSQueue, 'send_messages')
+    delete_messages = delegate(BlockingSQSQueue, 'delete_messages')
+    get_queue_size = delegate(BlockingSQSQueue, 'get_queue_size')
+    get_queue_not_visible_number = delegate(
+        BlockingSQSQueue, 'get_queue_not_visible_number'
+    )
+
+    async def receive_messages(self, count=None, wait_timeout=None):
+        """
+        Long polls run on their own executor, so they do not hold up other
+        calls to the service
+        :param count: must be in range from 1 to 10
+        :param wait_timeout: long polling time in seconds
+        :return: list of messages
+        :rtype list
+        """
+        timeout = self.timeout
+        if timeout is not None and wait_timeout:
+            timeout += wait_timeout
+        return await run(self.service, self.wrapped.receive_messages,
+                         count, wait_timeout, timeout=timeout,
+                         polling=bool(wait_timeout))
+
+    async def messages(self, count=10, wait_timeout=20, stop_when_empty=False):
+        """
+        Long poll the queue and yield received messages
+        :param count: messages per receive call, from 1 to 10
+        :param wait_timeout: long polling time in seconds
+        :param stop_when_empty: finish when a receive call returns nothing
+        :return: async iterator of messages
+        """
+        while True:
+            messages = await self.receive_messages(count, wait_timeout)
+            if not messages and stop_when_empty:
+                return
+            for message in messages:
+                yield message
@@ -17,7 +17,8 @@ class APIGatewayClient(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
         :param region_name: AWS region name
         :type region_name: str
@@ -25,15 +26,21 @@ class APIGatewayClient(BaseAWSClient):
         :type aws_access_key_id: str
         :param aws_secret_access_key: AWS credentials
         :type aws_secret_access_key: str
+        :param kwargs: additional client settings
         """
         super(APIGatewayClient, self).__init__(
             service='apigateway',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def __get_api_id(self, api_name):
+        return self.lookup('api_id', api_name,
+                           lambda: self.__fetch_api_id(api_name))
+
+    def __fetch_api_id(self, api_name):
         api_list = self.instance.get_rest_apis().get('items')
         for item in api_list:
             if item['name'] == api_name:
@@ -57,6 +64,7 @@ class APIGatewayClient(BaseAWSClient):
                 body=json.dumps(swagger_json)
             )
             LOGGER.info('API created with id `{}`'.format(response['id']))
+            self.forget('api_id', api_name)
         else:
             if (swagger_json['host'].endswith('amazonaws.com') and
                     not swagger_json['host'].startswith(api_id)):
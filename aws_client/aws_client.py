@@ -1,15 +1,41 @@
+import functools
 import logging
+import threading
+import time
 
-import boto3
+from botocore.exceptions import ClientError
+
+from . import cache, deadlines, metrics, singleflight
+from .exceptions import BaseAWSClientException
+from .registry import registry
+from .retry import DEFAULT_RETRY_POLICY, RetryStats, is_retryable_error
 
 LOGGER = logging.getLogger(__name__)
 
 
-class BaseAWSClientException(Exception):
+class ClientProxy(object):
     """
-    Base AWS CLient Exception
+    Proxy to pooled boto3 client.
+    API operations are routed through owner's `call`, other attributes
+    (meta, exceptions, presigning, waiters) come from the client itself.
     """
-    pass
+
+    def __init__(self, owner, client):
+        self._owner = owner
+        self._client = client
+        self._operations = client.meta.method_to_api_mapping
+
+    @property
+    def client(self):
+        """
+        :rtype: botocore.client.BaseClient
+        """
+        return self._client
+
+    def __getattr__(self, name):
+        if name in self._operations:
+            return functools.partial(self._owner.call, name)
+        return getattr(self._client, name)
 
 
 class BaseAWSClient(object):
@@ -21,6 +47,9 @@ class BaseAWSClient(object):
                  region_name,
                  aws_access_key_id,
                  aws_secret_access_key,
+                 retry_policy=None,
+                 circuit_breaker=None,
+                 hedging_policy=None,
                  **kwargs
                  ):
         """
@@ -29,6 +58,15 @@ class BaseAWSClient(object):
         :param region_name: AWS region
         :param aws_access_key_id: AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param retry_policy: retry policy for API calls,
+        shared default policy if not set
+        :type retry_policy: aws_client.retry.RetryPolicy
+        :param circuit_breaker: breaker failing calls fast while the
+        service endpoint is unhealthy, not used if not set
+        :type circuit_breaker: aws_client.breaker.CircuitBreaker
+        :param hedging_policy: hedge slow idempotent reads made with
+        `hedged_call`, not used if not set
+        :type hedging_policy: aws_client.hedging.HedgingPolicy
         :param kwargs: additional keywords arguments
         """
         settings = {
@@ -40,4 +78,234 @@ class BaseAWSClient(object):
 
         self.settings = settings
         settings.update(kwargs)
-        self.instance = boto3.client(service, **settings)
+        self.service = service
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.retry_stats = RetryStats()
+        self.circuit_breaker = circuit_breaker
+        self.hedging_policy = hedging_policy
+        self._fallbacks = {}
+        self._instance = None
+        self._generation = None
+        self._variants = {}
+
+    @property
+    def instance(self):
+        """
+        boto3 client for service, created on first use and rebuilt in a
+        forked child. Retries are done by `retry_policy`, botocore retries
+        are disabled
+        :rtype: ClientProxy
+        """
+        generation = registry.generation
+        if self._instance is None or self._generation != generation:
+            self._instance = ClientProxy(
+                self, registry.client(self.service, **self._client_settings())
+            )
+            self._variants = {}
+            self._generation = generation
+        return self._instance
+
+    def _client_settings(self, **options):
+        from botocore.client import Config
+
+        settings = dict(self.settings)
+        config = Config(retries={'max_attempts': 0})
+        if settings.get('config'):
+            config = config.merge(settings['config'])
+        if options:
+            config = config.merge(Config(**options))
+        settings['config'] = config
+        return settings
+
+    def _deadline_client(self, deadline):
+        """
+        Pooled client with connect and read timeouts fitting in the
+        deadline, variants are shared for rounded timeouts
+        """
+        client = self.instance.client
+        config = client.meta.config
+        timeouts = (deadline.timeout(config.connect_timeout),
+                    deadline.timeout(config.read_timeout))
+        if timeouts == (config.connect_timeout, config.read_timeout):
+            return client
+        variant = self._variants.get(timeouts)
+        if variant is None:
+            variant = self._variants[timeouts] = registry.client(
+                self.service, **self._client_settings(
+                    connect_timeout=timeouts[0], read_timeout=timeouts[1]
+                )
+            )
+        return variant
+
+    def resource(self):
+        """
+        boto3 resource for service, cached per thread
+        :rtype: boto3.resources.base.ServiceResource
+        """
+        return registry.resource(self.service, **self.settings)
+
+    def lookup(self, kind, name, fetch):
+        """
+        Resolve metadata (queue url, topic arn etc.) by name.
+        Found values are read through the metadata cache, concurrent
+        lookups of the same name share one remote call and missing
+        resources are remembered for a while
+        :param kind: metadata kind ('queue_url' etc.)
+        :param name: resource name
+        :param fetch: callable without arguments, returns None if the
+        resource does not exist
+        :return: fetch result
+        """
+        key = self._lookup_key(kind, name)
+        value = cache.backend.get(key)
+        if value is None:
+            value = singleflight.group.do(
+                key, functools.partial(self._fetch, key, fetch)
+            )
+        return value
+
+    @staticmethod
+    def _fetch(key, fetch):
+        value = fetch()
+        if value is not None:
+            cache.backend.set(key, value)
+        return value
+
+    def forget(self, kind, name):
+        """
+        Drop cached value or remembered missing resource after creating
+        or deleting the resource
+        :param kind: metadata kind
+        :param name: resource name
+        """
+        key = self._lookup_key(kind, name)
+        cache.backend.delete(key)
+        singleflight.group.forget(key)
+
+    def _lookup_key(self, kind, name):
+        return (
+            self.service,
+            self.settings['region_name'],
+            self.settings.get('endpoint_url'),
+            self.settings['aws_access_key_id'],
+            kind,
+            name,
+        )
+
+    def warm_connections(self, operation_name, connections=1, **kwargs):
+        """
+        Open pooled connections by concurrent calls of a cheap operation.
+        AWS errors are ignored, the connection is open anyway
+        :param operation_name: client method name ('head_bucket' etc.)
+        :type operation_name: str
+        :param connections: concurrent calls
+        :type connections: int
+        :param kwargs: operation parameters
+        """
+        errors = []
+
+        def warm():
+            try:
+                self.call(operation_name, **kwargs)
+            except ClientError:
+                pass
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        self.instance  # pylint: disable=pointless-statement
+        threads = [threading.Thread(target=deadlines.wrap(warm))
+                   for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def register_fallback(self, operation_name, fallback):
+        """
+        Register substitute for failing operation.
+        The fallback is called as fallback(exc, **kwargs) with operation
+        parameters when the circuit is open or the call failed with a
+        retryable error, its result is returned instead of the response
+        :param operation_name: client method name ('get_object' etc.)
+        :type operation_name: str
+        :param fallback: callable returning operation response
+        """
+        self._fallbacks[operation_name] = fallback
+
+    def call(self, operation_name, **kwargs):
+        """
+        Call API operation with retries, circuit breaker and fallback
+        :param operation_name: client method name ('get_object' etc.)
+        :type operation_name: str
+        :param kwargs: operation parameters
+        :return: operation response
+        """
+        try:
+            return self._call(operation_name, kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            fallback = self._fallbacks.get(operation_name)
+            if fallback is None or not (
+                    isinstance(exc, BaseAWSClientException) or
+                    is_retryable_error(exc)):
+                raise
+            LOGGER.warning('Fallback for `%s` after %s',
+                           operation_name, exc)
+            return fallback(exc, **kwargs)
+
+    def hedged_call(self, operation_name, discard=None, **kwargs):
+        """
+        Call idempotent read operation, hedged by `hedging_policy` if set
+        :param operation_name: client method name ('head_object' etc.)
+        :type operation_name: str
+        :param discard: callable releasing response of the losing attempt
+        :param kwargs: operation parameters
+        :return: operation response
+        """
+        if self.hedging_policy is None:
+            return self.call(operation_name, **kwargs)
+        return self.hedging_policy.call(
+            (self.service, self.settings['region_name'], operation_name),
+            functools.partial(self.call, operation_name, **kwargs),
+            discard
+        )
+
+    def _call(self, operation_name, kwargs):
+        deadline = deadlines.current()
+        if deadline is None:
+            client = self.instance.client
+        else:
+            deadline.check()
+            client = self._deadline_client(deadline)
+        method = getattr(client, operation_name)
+        key = (self.service, self.settings['region_name'])
+        on_retry = None
+        if metrics.collector.enabled:
+            on_retry = functools.partial(
+                self._record_retry, client, operation_name
+            )
+        if self.circuit_breaker is None:
+            return self.retry_policy.call(
+                key, method, kwargs, self.retry_stats, on_retry, deadline
+            )
+
+        circuit = self.circuit_breaker.circuit(key)
+        circuit.before_call()
+        start = time.time()
+        try:
+            response = self.retry_policy.call(
+                key, method, kwargs, self.retry_stats, on_retry, deadline
+            )
+        except Exception as exc:
+            circuit.on_error(exc, time.time() - start)
+            raise
+        circuit.on_success(time.time() - start)
+        return response
+
+    @staticmethod
+    def _record_retry(client, operation_name, exc):
+        metrics.collector.record_retry(
+            client.meta.service_model.service_id.hyphenize(),
+            client.meta.method_to_api_mapping[operation_name]
+        )
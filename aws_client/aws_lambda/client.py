@@ -3,12 +3,11 @@ from __future__ import unicode_literals
 import hashlib
 import logging
 
-import boto3
-from botocore.client import Config
 from botocore.exceptions import ClientError
 import six
 
 from ..aws_client import BaseAWSClient
+from ..iam.client import IAMClient
 
 LOGGER = logging.getLogger(__name__)
 
@@ -22,21 +21,25 @@ class LambdaClient(BaseAWSClient):
             self,
             region_name,
             aws_access_key_id,
-            aws_secret_access_key
+            aws_secret_access_key,
+            **kwargs
     ):
         """
 
         :param region_name: AWS region name
         :param aws_access_key_id:  AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
+        from botocore.client import Config
 
+        kwargs.setdefault('config', Config(read_timeout=300))
         super(LambdaClient, self).__init__(
             service='lambda',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            config=Config(read_timeout=300)
+            **kwargs
         )
 
     def create_lambda_function(
@@ -60,15 +63,14 @@ class LambdaClient(BaseAWSClient):
         """
 
         LOGGER.info('Create lambda_function `%s`', function_name)
-        iam = boto3.resource('iam', **self.settings)
-        role = iam.Role(role_name)
+        role_arn = IAMClient(**self.settings).get_role_arn(role_name)
 
-        LOGGER.info('Role arn `%s`', role.arn)
+        LOGGER.info('Role arn `%s`', role_arn)
         with open(zip_file, 'rb') as f:
             response = self.instance.create_function(
                 FunctionName=function_name,
                 Runtime='python2.7',
-                Role=role.arn,
+                Role=role_arn,
                 Handler=handler,
                 Code=dict(
                     ZipFile=f.read()
@@ -128,10 +130,8 @@ class LambdaClient(BaseAWSClient):
             FunctionName=function_name
         )
         if role_name:
-            iam = boto3.resource('iam', **self.settings)
-            role = iam.Role(role_name)
             kwargs.update(
-                Role=role.arn
+                Role=IAMClient(**self.settings).get_role_arn(role_name)
             )
         if memory_size:
             kwargs.update(
@@ -159,6 +159,7 @@ class LambdaClient(BaseAWSClient):
         self.instance.delete_function(
             FunctionName=function_name
         )
+        self.forget('function_arn', function_name)
 
     def publish_version_alias(self, function_name, version_name, code_sha256):
         """
@@ -201,8 +202,12 @@ class LambdaClient(BaseAWSClient):
         if version:
             kwargs.update(Qualifier=version)
 
-        response = self.instance.get_function(**kwargs)
-        return response['FunctionArn']
+        return self.lookup(
+            'function_arn', ':'.join(filter(None, (function_name, version))),
+            lambda: self.instance.get_function(
+                **kwargs
+            )['Configuration']['FunctionArn']
+        )
 
     def add_api_gateway_invoke_permission(self, function_name):
         """
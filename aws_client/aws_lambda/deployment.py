@@ -1,7 +1,5 @@
 from __future__ import unicode_literals
 
-import distutils
-import distutils.sysconfig
 import hashlib
 import logging
 import os
@@ -12,10 +10,9 @@ import zipfile
 from random import choice
 from string import ascii_lowercase
 
-import boto3
 from botocore.exceptions import ClientError
-from git import Repo
 
+from ..aws_client import BaseAWSClient
 from ..aws_lambda.client import LambdaClient
 from ..s3.client import S3Client
 
@@ -94,6 +91,9 @@ class LambdaPackage(object):
 
     def _add_env_libs_and_src(self):
         LOGGER.info('Add sources and libraries from current environment')
+        import distutils.sysconfig
+        from git import Repo
+
         Repo(path=self.repository).clone(path=self.workspace)
         shutil.rmtree(os.path.join(self.workspace, '.git'))
         package_path = distutils.sysconfig.get_python_lib()
@@ -265,7 +265,7 @@ class LambdaDeployer(object):
 
     def _set_shedule(self):
         settings = self.client.settings
-        client = boto3.client('events', **settings)
+        client = BaseAWSClient('events', **settings).instance
         for function_name, function_config in self.lambda_config.items():
             expression = function_config.get('shedule_expression')
             if expression:
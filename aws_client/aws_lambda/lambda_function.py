@@ -19,7 +19,8 @@ class LambdaFunction(object):
                  region_name,
                  aws_access_key_id,
                  aws_secret_access_key,
-                 version=None):
+                 version=None,
+                 **kwargs):
         """
         :param function_name: AWS Lambda function name
         :type function_name: str
@@ -29,16 +30,39 @@ class LambdaFunction(object):
         :type aws_access_key_id: str
         :param aws_secret_access_key
         :type aws_secret_access_key: str
+        :param kwargs: additional client settings
         :rtype str
         """
         self.client = LambdaClient(
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
         self.function_name = function_name
         self.version = version
 
+    def register_fallback(self, operation_name, fallback):
+        """
+        Register substitute for failing client operation, called as
+        fallback(exc, **kwargs) when the circuit is open or the call
+        failed with a retryable error and returning operation response
+        :param operation_name: client method name ('invoke' etc.)
+        :type operation_name: str
+        :param fallback: callable
+        """
+        self.client.register_fallback(operation_name, fallback)
+
+    def warmup(self, connections=4):
+        """
+        Resolve function ARN and open pooled connections to Lambda endpoint
+        :param connections: connections to open
+        :type connections: int
+        """
+        arn = self.client.get_function_arn(self.function_name, self.version)
+        self.client.warm_connections('get_function', connections,
+                                     FunctionName=arn)
+
     def __call__(self, payload, async_call=True):
         """
         :param payload: payload object, must be json serializable
@@ -0,0 +1,239 @@
+from __future__ import unicode_literals
+
+import logging
+import time
+
+from botocore.exceptions import ClientError
+
+from .deadlines import DeadlineExceeded
+from .exceptions import BaseAWSClientException
+from .registry import registry
+from .retry import is_retryable_error
+
+LOGGER = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def is_failure(exc):
+    """
+    Errors indicating service trouble: throttling, server and connection
+    errors, timeouts included when they ran out the caller's deadline
+    :param exc: raised exception
+    :rtype: bool
+    """
+    if isinstance(exc, DeadlineExceeded):
+        exc = exc.cause
+    return exc is not None and is_retryable_error(exc)
+
+
+def is_response(exc):
+    """
+    Errors returned by the service, so the call reached it and was answered
+    :param exc: raised exception
+    :rtype: bool
+    """
+    return isinstance(exc, ClientError) and bool(
+        exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    )
+
+
+class CircuitOpenError(BaseAWSClientException):
+    """
+    Call rejected without reaching AWS because the circuit is open
+    """
+
+    def __init__(self, key):
+        super(CircuitOpenError, self).__init__(
+            'Circuit for {} is open'.format(
+                '/'.join('{}'.format(part) for part in key)
+            )
+        )
+        self.key = key
+
+
+class Circuit(object):
+    """
+    Breaker state of one service endpoint.
+
+    Outcomes are counted in `buckets` slices of the `window`, so old calls
+    expire without keeping a record per call.
+    """
+
+    def __init__(self, breaker, key):
+        self.breaker = breaker
+        self.key = key
+        self.state = CLOSED
+        self._opened_at = None
+        self._probes = 0
+        self._probe_successes = 0
+        self._buckets = {}
+        self._lock = registry.fork_safe_lock(self)
+
+    def before_call(self):
+        """
+        :raises CircuitOpenError: while open or all probes are in flight
+        """
+        breaker = self.breaker
+        with self._lock:
+            if self.state == OPEN:
+                if breaker.clock() - self._opened_at < breaker.open_timeout:
+                    raise CircuitOpenError(self.key)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes >= breaker.half_open_probes:
+                    raise CircuitOpenError(self.key)
+                self._probes += 1
+
+    def on_success(self, latency):
+        breaker = self.breaker
+        slow = (breaker.slow_call_duration is not None and
+                latency >= breaker.slow_call_duration)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if slow:
+                    self._transition(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= breaker.half_open_probes:
+                    self._transition(CLOSED)
+                return
+            self._count(failed=False, slow=slow)
+
+    def on_error(self, exc, latency):
+        """
+        Count call failure, only errors which indicate service trouble
+        (throttling, server and connection errors, timeouts) count
+        against it. Other errors count as success, except for probes
+        which got no answer from the service (deadline exceeded before
+        sending, parameter validation), they only free their slot.
+        :param exc: raised exception
+        :param latency: call duration in seconds
+        """
+        if not is_failure(exc):
+            if is_response(exc) or not self._release_probe():
+                self.on_success(latency)
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._count(failed=True, slow=False)
+
+    def _release_probe(self):
+        """
+        :return: whether a half open probe slot was freed
+        :rtype: bool
+        """
+        with self._lock:
+            if self.state != HALF_OPEN:
+                return False
+            self._probes = max(self._probes - 1, 0)
+            return True
+
+    def _count(self, failed, slow):
+        breaker = self.breaker
+        now = breaker.clock()
+        width = float(breaker.window) / breaker.buckets
+        index = int(now / width)
+        oldest = index - breaker.buckets + 1
+        for stale in [idx for idx in self._buckets if idx < oldest]:
+            del self._buckets[stale]
+        bucket = self._buckets.setdefault(index, [0, 0, 0])
+        bucket[0] += 1
+        bucket[1] += failed
+        bucket[2] += slow
+        calls = sum(item[0] for item in self._buckets.values())
+        if calls < breaker.min_calls:
+            return
+        failures = sum(item[1] for item in self._buckets.values())
+        slow_calls = sum(item[2] for item in self._buckets.values())
+        if (failures >= calls * breaker.failure_rate_threshold or
+                slow_calls >= calls * breaker.slow_call_rate_threshold):
+            self._transition(OPEN)
+
+    def _transition(self, state):
+        LOGGER.warning('Circuit %s: %s -> %s', self.key, self.state, state)
+        self.state = state
+        self._probes = 0
+        self._probe_successes = 0
+        self._buckets = {}
+        if state == OPEN:
+            self._opened_at = self.breaker.clock()
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker shared by client wrappers, with a circuit per service
+    and region.
+
+    A circuit opens when, among at least `min_calls` calls of the last
+    `window` seconds, the share of failed calls reaches
+    `failure_rate_threshold` or the share of calls slower than
+    `slow_call_duration` reaches `slow_call_rate_threshold`. While open,
+    calls fail fast with CircuitOpenError. After `open_timeout` seconds up
+    to `half_open_probes` calls are let through; the circuit closes when
+    they all succeed and opens again on the first failure.
+    """
+
+    def __init__(self,
+                 failure_rate_threshold=0.5,
+                 slow_call_duration=None,
+                 slow_call_rate_threshold=1.0,
+                 min_calls=20,
+                 window=30.0,
+                 buckets=10,
+                 open_timeout=30.0,
+                 half_open_probes=3,
+                 clock=time.time):
+        """
+        :param failure_rate_threshold: failed calls share opening circuit
+        :type failure_rate_threshold: float
+        :param slow_call_duration: seconds after which a call is slow,
+        latency is not considered if not set
+        :type slow_call_duration: float
+        :param slow_call_rate_threshold: slow calls share opening circuit
+        :type slow_call_rate_threshold: float
+        :param min_calls: calls in window needed to evaluate thresholds
+        :type min_calls: int
+        :param window: rolling window in seconds
+        :type window: float
+        :param buckets: window slices
+        :type buckets: int
+        :param open_timeout: seconds to fail fast before probing
+        :type open_timeout: float
+        :param half_open_probes: probe calls deciding to close circuit
+        :type half_open_probes: int
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.buckets = buckets
+        self.open_timeout = open_timeout
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._circuits = {}
+        self._lock = registry.fork_safe_lock(self)
+
+    def circuit(self, key):
+        """
+        :param key: (service, region)
+        :rtype: Circuit
+        """
+        with self._lock:
+            if key not in self._circuits:
+                self._circuits[key] = Circuit(self, key)
+            return self._circuits[key]
+
+    def states(self):
+        """
+        :return: {(service, region): state}
+        :rtype: dict
+        """
+        with self._lock:
+            return dict((key, circuit.state)
+                        for key, circuit in self._circuits.items())
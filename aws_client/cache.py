@@ -0,0 +1,314 @@
+from __future__ import unicode_literals
+
+import collections
+import errno
+import getpass
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+
+from .exceptions import BaseAWSClientException
+from .registry import registry
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_SIZE = 1024
+# share of FileCache entries removed per eviction, so the directory is
+# scanned once per that many new entries instead of on every write
+EVICT_FRACTION = 0.1
+
+
+def _key_string(key):
+    if isinstance(key, (tuple, list)):
+        return '|'.join('{}'.format(part) for part in key)
+    return '{}'.format(key)
+
+
+def default_directory():
+    """
+    :return: per-user cache directory in the temporary directory
+    :rtype: str
+    """
+    user = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(),
+                        'aws-client-cache-{}'.format(user))
+
+
+class UnsafeCacheDirectory(BaseAWSClientException):
+    """
+    Cache directory may be written by other users
+    """
+    pass
+
+
+def ensure_private_directory(directory):
+    """
+    Create directory accessible only by current user if missing, fail if
+    an existing one may be written by other users, they could plant
+    entries read as cached metadata
+    :param directory: path
+    :raises UnsafeCacheDirectory: not a directory owned by current user or
+    writable by group or others
+    """
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+    if not hasattr(os, 'getuid'):
+        # no POSIX ownership, temporary directory is per user
+        return
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or \
+            info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise UnsafeCacheDirectory(
+            '{} must be a directory owned by the current user and not '
+            'writable by others'.format(directory)
+        )
+
+
+class CacheStats(object):
+    """
+    Counters of a metadata cache backend
+    """
+
+    def __init__(self):
+        self._lock = registry.fork_safe_lock(self)
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                sets=self.sets,
+                evictions=self.evictions,
+            )
+
+
+class MemoryCache(object):
+    """
+    In-process metadata cache with TTL and LRU eviction
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL,
+                 clock=time.time):
+        """
+        :param max_size: entries kept before least recently used are evicted
+        :type max_size: int
+        :param ttl: default entry lifetime in seconds
+        :type ttl: float
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = registry.fork_safe_lock(self)
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        """
+        :param key: lookup key
+        :return: cached value or None
+        """
+        key = _key_string(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                # move_to_end is missing on py2 OrderedDict
+                del self._entries[key]
+                self._entries[key] = entry
+        if entry is None:
+            self.stats.add(misses=1)
+            return None
+        self.stats.add(hits=1)
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """
+        :param key: lookup key
+        :param value: JSON serializable value
+        :param ttl: entry lifetime in seconds, backend default if not set
+        """
+        key = _key_string(key)
+        expires = self._clock() + (self.ttl if ttl is None else ttl)
+        evicted = 0
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, expires)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        self.stats.add(sets=1, evictions=evicted)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(_key_string(key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries = collections.OrderedDict()
+
+
+class FileCache(object):
+    """
+    Metadata cache shared by processes on one host.
+
+    Every entry is a small JSON file in `directory` named by the key hash,
+    written to a temporary file and renamed, so readers never see a partial
+    entry and no lock is needed between processes. Reads touch the file.
+    New entries are counted, when there are more than `max_size` the
+    directory is scanned and least recently used files are removed down to
+    `max_size` less `EVICT_FRACTION`. Entries written by other processes
+    are noticed on the next scan.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE,
+                 ttl=DEFAULT_TTL, clock=time.time):
+        """
+        :param directory: cache directory, created if missing, it must
+        not be writable by other users, per-user temporary directory by
+        default
+        :type directory: str
+        :param max_size: entries kept before least recently used are evicted
+        :type max_size: int
+        :param ttl: default entry lifetime in seconds
+        :type ttl: float
+        """
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._size = None
+        ensure_private_directory(self.directory)
+
+    def _path(self, key):
+        digest = hashlib.sha1(_key_string(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    def get(self, key):
+        """
+        :param key: lookup key
+        :return: cached value or None
+        """
+        path = self._path(key)
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            entry = None
+        if entry is not None and entry['expires'] <= self._clock():
+            self._remove(path)
+            entry = None
+        if entry is None:
+            self.stats.add(misses=1)
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        self.stats.add(hits=1)
+        return entry['value']
+
+    def set(self, key, value, ttl=None):
+        """
+        :param key: lookup key
+        :param value: JSON serializable value
+        :param ttl: entry lifetime in seconds, backend default if not set
+        """
+        expires = self._clock() + (self.ttl if ttl is None else ttl)
+        if self._size is None:
+            self._size = len(self._entry_paths())
+        path = self._path(key)
+        is_new = not os.path.exists(path)
+        handle, temp_path = tempfile.mkstemp(dir=self.directory,
+                                             suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w') as entry_file:
+                json.dump(dict(key=_key_string(key), value=value,
+                               expires=expires), entry_file)
+            os.rename(temp_path, path)
+        except Exception:
+            self._remove(temp_path)
+            raise
+        if is_new:
+            self._size += 1
+        evictions = self._evict() if self._size > self.max_size else 0
+        self.stats.add(sets=1, evictions=evictions)
+
+    def delete(self, key):
+        self._remove(self._path(key))
+
+    def clear(self):
+        for path in self._entry_paths():
+            self._remove(path)
+        self._size = 0
+
+    def _entry_paths(self):
+        return [os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith('.json')]
+
+    def _evict(self):
+        paths = self._entry_paths()
+        self._size = len(paths)
+        if len(paths) <= self.max_size:
+            return 0
+        used = []
+        for path in paths:
+            try:
+                used.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        used.sort()
+        keep = self.max_size - int(self.max_size * EVICT_FRACTION)
+        evicted = used[:len(used) - keep]
+        for _, path in evicted:
+            self._remove(path)
+        self._size = len(used) - len(evicted)
+        return len(evicted)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+backend = MemoryCache()
+
+
+def configure(cache_backend):
+    """
+    Replace metadata cache backend used by all clients
+    :param cache_backend: MemoryCache, FileCache or object with the same
+    get/set/delete/clear methods and `stats`
+    """
+    global backend
+    backend = cache_backend
+
+
+def stats():
+    """
+    :return: hit/miss counters of current backend
+    :rtype: dict
+    """
+    return backend.stats.as_dict()
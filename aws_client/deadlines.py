@@ -0,0 +1,156 @@
+from __future__ import unicode_literals
+
+import contextlib
+import functools
+import threading
+import time
+
+from .exceptions import BaseAWSClientException
+
+try:
+    import contextvars
+except ImportError:  # python < 3.7
+    contextvars = None
+
+# timeouts of pooled clients are rounded down to these values, so
+# deadlines need a handful of client variants instead of one per call
+TIMEOUT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class DeadlineExceeded(BaseAWSClientException):
+    """
+    Call budget of the enclosing `deadline` block ran out
+    """
+
+    def __init__(self, message='Deadline exceeded', cause=None):
+        """
+        :param cause: error of the last attempt, e.g. a read timeout
+        """
+        super(DeadlineExceeded, self).__init__(message)
+        self.cause = cause
+
+
+class Deadline(object):
+    """
+    Absolute point in time calls must finish by
+    """
+
+    def __init__(self, expires, clock=time.time):
+        """
+        :param expires: timestamp as returned by clock
+        :type expires: float
+        """
+        self.expires = expires
+        self.clock = clock
+
+    def remaining(self):
+        """
+        :return: seconds left, negative when expired
+        :rtype: float
+        """
+        return self.expires - self.clock()
+
+    def check(self):
+        """
+        :raises DeadlineExceeded: when no time is left
+        """
+        if self.remaining() <= 0:
+            raise DeadlineExceeded('Deadline exceeded')
+
+    def timeout(self, configured=None):
+        """
+        Socket timeout fitting in remaining time
+        :param configured: timeout configured for the client
+        :return: one of TIMEOUT_BUCKETS, not greater than configured
+        :rtype: float
+        """
+        remaining = self.remaining()
+        timeout = TIMEOUT_BUCKETS[0]
+        for bucket in TIMEOUT_BUCKETS:
+            if bucket > remaining:
+                break
+            timeout = bucket
+        if configured is not None:
+            timeout = min(timeout, configured)
+        return timeout
+
+
+if contextvars is not None:
+    _current = contextvars.ContextVar('aws_client_deadline', default=None)
+
+    def current():
+        """
+        :return: deadline of the innermost `deadline` block or None
+        :rtype: Deadline
+        """
+        return _current.get()
+
+    def _set(value):
+        return _current.set(value)
+
+    def _reset(token, value):
+        _current.reset(token)
+else:
+    _local = threading.local()
+
+    def current():
+        """
+        :return: deadline of the innermost `deadline` block or None
+        :rtype: Deadline
+        """
+        return getattr(_local, 'deadline', None)
+
+    def _set(value):
+        previous = current()
+        _local.deadline = value
+        return previous
+
+    def _reset(token, value):
+        _local.deadline = token
+
+
+def wrap(func):
+    """
+    Bind current deadline to func to be run in another thread
+    :param func: callable
+    :return: callable running func under the current deadline
+    """
+    value = current()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _set(value)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _reset(token, value)
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """
+    Limit time of all client calls made in the block.
+
+        with aws_client.deadline(seconds=0.5):
+            if bucket.exist(key):
+                body, _ = bucket.get_object(key)
+
+    Calls shrink connect and read timeouts to the remaining time, stop
+    retrying when the next attempt would not fit, and raise
+    DeadlineExceeded once the time is over. Nested blocks can only
+    shorten the enclosing deadline.
+    :param seconds: time budget
+    :type seconds: float
+    :rtype: Deadline
+    """
+    value = Deadline(time.time() + seconds)
+    enclosing = current()
+    if enclosing is not None and enclosing.expires < value.expires:
+        value = enclosing
+    token = _set(value)
+    try:
+        yield value
+    finally:
+        _reset(token, value)
@@ -11,7 +11,8 @@ class ElasticBeanstalkClient(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
         :param region_name:  AWS region name
         :type region_name: str
@@ -19,12 +20,14 @@ class ElasticBeanstalkClient(BaseAWSClient):
         :type aws_access_key_id: str
         :param aws_secret_access_key: AWS credentials
         :type aws_secret_access_key: str
+        :param kwargs: additional client settings
         """
         super(ElasticBeanstalkClient, self).__init__(
             service='elasticbeanstalk',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def get_environment_state(self, app_name, env_name):
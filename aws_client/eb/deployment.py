@@ -9,7 +9,6 @@ from random import choice
 from string import ascii_lowercase
 from time import strftime
 
-from git import Repo
 
 from ..eb.client import ElasticBeanstalkClient
 from ..s3.s3bucket import S3Bucket
@@ -44,6 +43,8 @@ class EBPackage(object):
         :return:
         """
         LOGGER.info('Create deployment package')
+        from git import Repo
+
         Repo(path=self.repository).clone(path=self.workspace)
         if additional_files:
             for file_path in additional_files:
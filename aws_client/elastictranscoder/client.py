@@ -1,8 +1,5 @@
 from __future__ import unicode_literals
 
-import boto3
-
-from aws_client.sns.client import SNSClient
 from ..aws_client import BaseAWSClient
 
 
@@ -14,17 +11,20 @@ class ElasticTranscoderClient(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
         :param region_name: AWS region name
         :param aws_access_key_id: AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
         super(ElasticTranscoderClient, self).__init__(
             service='elastictranscoder',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def create_video_preset(
@@ -87,6 +87,7 @@ class ElasticTranscoderClient(BaseAWSClient):
                     'PaddingPolicy': 'NoPad'
                 }
             )
+            self.forget('preset_id', preset_name)
 
     def create_pipeline(
             self,
@@ -117,9 +118,12 @@ class ElasticTranscoderClient(BaseAWSClient):
         :return:
         """
         if not self.get_pipeline_id(pipeline_name):
-            iam = boto3.resource('iam', **self.settings)
-            role = iam.Role(role_name)
+            from ..iam.client import IAMClient
+            from ..sns.client import SNSClient
+
+            role_arn = IAMClient(**self.settings).get_role_arn(role_name)
             notifications = {}
+
             sns = SNSClient(**self.settings)
             if progressing_sns_topic:
                 notifications['Progressing'] = sns.get_topic_arn(
@@ -140,7 +144,7 @@ class ElasticTranscoderClient(BaseAWSClient):
             kwargs = dict(
                 Name=pipeline_name,
                 InputBucket=bucket_name,
-                Role=role.arn,
+                Role=role_arn,
                 ThumbnailConfig={'Bucket': bucket_name},
                 ContentConfig={'Bucket': bucket_name},
             )
@@ -148,6 +152,7 @@ class ElasticTranscoderClient(BaseAWSClient):
                 kwargs.update(Notifications=notifications)
 
             self.instance.create_pipeline(**kwargs)
+            self.forget('pipeline_id', pipeline_name)
 
     def get_pipeline_id(self, pipeline_name):
         """
@@ -155,6 +160,10 @@ class ElasticTranscoderClient(BaseAWSClient):
         :param pipeline_name: pipeline name
         :return: pipeline id
         """
+        return self.lookup('pipeline_id', pipeline_name,
+                           lambda: self._fetch_pipeline_id(pipeline_name))
+
+    def _fetch_pipeline_id(self, pipeline_name):
         response = self.instance.list_pipelines()
         ids = [
             pipeline['Id'] for pipeline in response['Pipelines']
@@ -167,6 +176,10 @@ class ElasticTranscoderClient(BaseAWSClient):
         :param preset_name: name
         :return: preset id
         """
+        return self.lookup('preset_id', preset_name,
+                           lambda: self._fetch_preset_id(preset_name))
+
+    def _fetch_preset_id(self, preset_name):
         response = self.instance.list_presets()
         ids = [
             preset['Id'] for preset in response['Presets']
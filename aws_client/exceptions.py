@@ -0,0 +1,5 @@
+class BaseAWSClientException(Exception):
+    """
+    Base AWS CLient Exception
+    """
+    pass
@@ -0,0 +1,285 @@
+from __future__ import unicode_literals
+
+import collections
+import logging
+import os
+import threading
+import time
+
+# noinspection PyUnresolvedReferences
+from six.moves import queue
+
+from . import deadlines
+from .registry import registry
+from .retry import RetryBudget
+
+LOGGER = logging.getLogger(__name__)
+
+_workers = None
+_workers_lock = threading.Lock()
+
+
+class _Workers(object):
+    """
+    Executor whose tasks never queue: a worker is claimed before a task is
+    submitted, and when none is free the caller does without.
+    """
+
+    def __init__(self, size):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(max_workers=size)
+        self._free = threading.Semaphore(size)
+
+    def claim(self):
+        """
+        :return: whether a free worker was claimed
+        :rtype: bool
+        """
+        return self._free.acquire(False)
+
+    def release(self):
+        """
+        Return claimed worker unused
+        """
+        self._free.release()
+
+    def run(self, func, *args):
+        """
+        Run func on claimed worker
+        """
+        def task():
+            try:
+                func(*args)
+            finally:
+                self._free.release()
+
+        self._executor.submit(task)
+
+
+def _get_workers():
+    global _workers
+    if _workers is None:
+        with _workers_lock:
+            if _workers is None:
+                _workers = _Workers(registry.max_pool_connections)
+    return _workers
+
+
+def _after_fork():
+    global _workers, _workers_lock
+    # executor threads do not exist in the child
+    _workers = None
+    _workers_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class HedgeStats(object):
+    """
+    Hedging counters
+    """
+
+    def __init__(self):
+        self._lock = registry.fork_safe_lock(self)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.capped = 0
+        self.saturated = 0
+
+    def add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(
+                calls=self.calls,
+                hedges=self.hedges,
+                hedge_wins=self.hedge_wins,
+                capped=self.capped,
+                saturated=self.saturated,
+            )
+
+
+class LatencyTracker(object):
+    """
+    Recent latencies of one operation, percentile recomputed every
+    `refresh` samples
+    """
+
+    def __init__(self, size=1000, refresh=50):
+        self.samples = collections.deque(maxlen=size)
+        self.refresh = refresh
+        self._percentiles = {}
+        self._since_refresh = 0
+        self._lock = registry.fork_safe_lock(self)
+
+    def add(self, latency):
+        with self._lock:
+            self.samples.append(latency)
+            self._since_refresh += 1
+            if self._since_refresh >= self.refresh:
+                self._percentiles = {}
+                self._since_refresh = 0
+
+    def percentile(self, ratio):
+        with self._lock:
+            value = self._percentiles.get(ratio)
+            if value is None and self.samples:
+                ordered = sorted(self.samples)
+                value = ordered[min(len(ordered) - 1,
+                                    int(len(ordered) * ratio))]
+                self._percentiles[ratio] = value
+            return value
+
+
+class HedgingPolicy(object):
+    """
+    Hedged requests for idempotent reads.
+
+    When the first attempt has not answered after the `percentile` latency
+    of recent calls, an identical second attempt is sent and the first
+    answer wins. Hedges are limited to `max_ratio` of calls (plus a small
+    burst), so a slow endpoint gets at most that much extra load.
+
+    Attempts run on a pool of `max_pool_connections` workers but never wait
+    in its queue: when no worker is free the call runs on the caller's
+    thread without a hedge, and a due hedge is skipped, both counted as
+    `saturated`. The delay counts from the start of the first attempt.
+    """
+
+    def __init__(self,
+                 percentile=0.95,
+                 max_ratio=0.05,
+                 burst=2,
+                 min_delay=0.005,
+                 max_delay=1.0,
+                 min_samples=20):
+        """
+        :param percentile: latency percentile to wait before hedging
+        :type percentile: float
+        :param max_ratio: hedges allowed per call
+        :type max_ratio: float
+        :param burst: hedges allowed with empty history
+        :type burst: int
+        :param min_delay: lower bound of hedge delay in seconds
+        :type min_delay: float
+        :param max_delay: upper bound of hedge delay in seconds, also
+        used until `min_samples` latencies are known
+        :type max_delay: float
+        :param min_samples: latencies needed to use the percentile
+        :type min_samples: int
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.stats = HedgeStats()
+        self._budget = RetryBudget(ratio=max_ratio, capacity=burst)
+        self._trackers = {}
+        self._lock = registry.fork_safe_lock(self)
+
+    def tracker(self, key):
+        """
+        :param key: (service, region, operation)
+        :rtype: LatencyTracker
+        """
+        with self._lock:
+            if key not in self._trackers:
+                self._trackers[key] = LatencyTracker()
+            return self._trackers[key]
+
+    def delay(self, key):
+        """
+        :param key: (service, region, operation)
+        :return: seconds to wait before hedging
+        :rtype: float
+        """
+        tracker = self.tracker(key)
+        if len(tracker.samples) < self.min_samples:
+            return self.max_delay
+        return min(self.max_delay,
+                   max(self.min_delay, tracker.percentile(self.percentile)))
+
+    def call(self, key, func, discard=None):
+        """
+        Call func, hedging it with a second call when it is slow
+        :param key: (service, region, operation)
+        :param func: callable without arguments
+        :param discard: callable invoked with the result of the losing
+        attempt, e.g. to close a response stream
+        :return: result of the first successful attempt
+        """
+        self.stats.add(calls=1)
+        self._budget.deposit()
+        tracker = self.tracker(key)
+        workers = _get_workers()
+        if not workers.claim():
+            self.stats.add(saturated=1)
+            start = time.time()
+            result = func()
+            tracker.add(time.time() - start)
+            return result
+
+        results = queue.Queue()
+        state = dict(done=False)
+        lock = threading.Lock()
+        started = queue.Queue()
+
+        def attempt(hedge):
+            start = time.time()
+            if not hedge:
+                started.put(start)
+            try:
+                result = func()
+            except Exception as exc:  # pylint: disable=broad-except
+                results.put((hedge, False, exc))
+                return
+            tracker.add(time.time() - start)
+            with lock:
+                late = state['done']
+                state['done'] = True
+            if late:
+                if discard is not None:
+                    discard(result)
+                return
+            results.put((hedge, True, result))
+
+        workers.run(deadlines.wrap(attempt), False)
+        pending = 1
+        hedge_at = started.get() + self.delay(key)
+        try:
+            outcome = results.get(timeout=max(hedge_at - time.time(), 0))
+        except queue.Empty:
+            outcome = None
+            if not workers.claim():
+                self.stats.add(saturated=1)
+            elif not self._budget.withdraw():
+                workers.release()
+                self.stats.add(capped=1)
+            else:
+                self.stats.add(hedges=1)
+                workers.run(deadlines.wrap(attempt), True)
+                pending += 1
+
+        errors = []
+        while True:
+            if outcome is None:
+                outcome = results.get()
+            hedge, success, value = outcome
+            if success:
+                if hedge:
+                    self.stats.add(hedge_wins=1)
+                return value
+            errors.append(value)
+            with lock:
+                pending -= 1
+                if pending == 0:
+                    state['done'] = True
+                    raise errors[0]
+            outcome = None
@@ -13,17 +13,20 @@ class IAMClient(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
         :param region_name: AWS region name
         :param aws_access_key_id: AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
         super(IAMClient, self).__init__(
             service='iam',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def upload_certificate(self,
@@ -53,6 +56,7 @@ class IAMClient(BaseAWSClient):
             )
         except ClientError:
             pass
+        self.forget('certificate_arn', certificate_name)
         response = None
         try:
             response = self.instance.upload_server_certificate(
@@ -74,9 +78,21 @@ class IAMClient(BaseAWSClient):
         :param certificate_name:
         :return:
         """
-        response = self.instance.get_server_certificate(
-            ServerCertificateName=certificate_name
+        return self.lookup(
+            'certificate_arn', certificate_name,
+            lambda: self.instance.get_server_certificate(
+                ServerCertificateName=certificate_name
+            )['ServerCertificate']['ServerCertificateMetadata']['Arn']
+        )
+
+    def get_role_arn(self, role_name):
+        """
+        :param role_name: IAM role name
+        :type role_name: str
+        :return: role ARN
+        :rtype: str
+        """
+        return self.lookup(
+            'role_arn', role_name,
+            lambda: self.instance.get_role(RoleName=role_name)['Role']['Arn']
         )
-        return response[
-            'ServerCertificate'
-        ]['ServerCertificateMetadata']['Arn']
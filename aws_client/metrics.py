@@ -0,0 +1,269 @@
+from __future__ import unicode_literals
+
+import bisect
+import time
+
+from .registry import registry
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+_START = 'aws_client_start'
+_REQUEST_BYTES = 'aws_client_request_bytes'
+
+
+class OperationStats(object):
+    """
+    Counters of one service operation
+    """
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.retries = 0
+        self.errors = {}
+        self.latency_buckets = [0] * (len(buckets) + 1)
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def as_dict(self, buckets):
+        cumulative = []
+        total = 0
+        for count in self.latency_buckets:
+            total += count
+            cumulative.append(total)
+        bounds = [str(bound) for bound in buckets] + ['+Inf']
+        return dict(
+            calls=self.calls,
+            retries=self.retries,
+            errors=dict(self.errors),
+            latency_sum=self.latency_sum,
+            latency_buckets=dict(zip(bounds, cumulative)),
+            request_bytes=self.request_bytes,
+            response_bytes=self.response_bytes,
+        )
+
+
+class MetricsCollector(object):
+    """
+    Per service and operation call metrics collected from botocore events.
+
+    Handlers run on every API call, so they only update counters under a
+    lock; snapshots and Prometheus text are built on demand.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: latency histogram upper bounds in seconds
+        :type buckets: tuple
+        """
+        self.buckets = tuple(buckets)
+        self.enabled = False
+        self._operations = {}
+        self._lock = registry.fork_safe_lock(self)
+
+    def register(self, client):
+        """
+        Attach event handlers to botocore client
+        :param client: botocore client
+        """
+        events = client.meta.events
+        events.register('before-call', self._before_call,
+                        unique_id='aws-client-metrics-before-call')
+        events.register('before-send', self._before_send,
+                        unique_id='aws-client-metrics-before-send')
+        events.register('after-call', self._after_call,
+                        unique_id='aws-client-metrics-after-call')
+        events.register('after-call-error', self._after_call_error,
+                        unique_id='aws-client-metrics-after-call-error')
+
+    def record_retry(self, service, operation):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stats(service, operation).retries += 1
+
+    def record(self, service, operation, latency,
+               error=None, request_bytes=0, response_bytes=0):
+        """
+        Record finished call
+        :param service: service name as used in botocore event names
+        :param operation: API operation name ('GetObject' etc.)
+        :param latency: call duration in seconds
+        :param error: AWS error code or exception name
+        :param request_bytes: request body size
+        :param response_bytes: response body size
+        """
+        index = bisect.bisect_left(self.buckets, latency)
+        with self._lock:
+            stats = self._stats(service, operation)
+            stats.calls += 1
+            stats.latency_buckets[index] += 1
+            stats.latency_sum += latency
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            if error:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def snapshot(self):
+        """
+        :return: {service: {operation: counters}}
+        :rtype: dict
+        """
+        result = {}
+        with self._lock:
+            for (service, operation), stats in self._operations.items():
+                result.setdefault(service, {})[operation] = stats.as_dict(
+                    self.buckets
+                )
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+
+    def prometheus(self, prefix='aws_client'):
+        """
+        Export metrics in Prometheus text exposition format
+        :param prefix: metric name prefix
+        :rtype: str
+        """
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, help_text))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+
+        def sample(name, labels, value):
+            lines.append('{}_{}{{{}}} {}'.format(
+                prefix, name,
+                ','.join('{}="{}"'.format(key, val) for key, val in labels),
+                value
+            ))
+
+        snapshot = sorted(
+            ((service, operation, stats)
+             for service, operations in self.snapshot().items()
+             for operation, stats in operations.items()),
+            key=lambda item: item[:2]
+        )
+        counters = (
+            ('requests_total', 'calls', 'API calls'),
+            ('retries_total', 'retries', 'API call retries'),
+            ('request_bytes_total', 'request_bytes', 'Request body bytes'),
+            ('response_bytes_total', 'response_bytes', 'Response body bytes'),
+        )
+        for name, key, help_text in counters:
+            metric(name, 'counter', help_text)
+            for service, operation, stats in snapshot:
+                sample(name, (('service', service), ('operation', operation)),
+                       stats[key])
+
+        metric('errors_total', 'counter', 'API call errors by code')
+        for service, operation, stats in snapshot:
+            for code, count in sorted(stats['errors'].items()):
+                sample('errors_total', (('service', service),
+                                        ('operation', operation),
+                                        ('code', code)), count)
+
+        metric('request_duration_seconds', 'histogram', 'API call latency')
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for service, operation, stats in snapshot:
+            labels = (('service', service), ('operation', operation))
+            for bound in bounds:
+                sample('request_duration_seconds_bucket',
+                       labels + (('le', bound),),
+                       stats['latency_buckets'][bound])
+            sample('request_duration_seconds_sum', labels,
+                   stats['latency_sum'])
+            sample('request_duration_seconds_count', labels, stats['calls'])
+        return '\n'.join(lines) + '\n'
+
+    def _stats(self, service, operation):
+        key = (service, operation)
+        stats = self._operations.get(key)
+        if stats is None:
+            stats = self._operations[key] = OperationStats(self.buckets)
+        return stats
+
+    def _before_call(self, context, **kwargs):
+        if self.enabled:
+            context[_START] = time.time()
+            context[_REQUEST_BYTES] = 0
+
+    def _before_send(self, request, **kwargs):
+        context = getattr(request, 'context', None)
+        if not self.enabled or context is None or _START not in context:
+            return
+        body = request.body
+        if body is not None and hasattr(body, '__len__'):
+            context[_REQUEST_BYTES] += len(body)
+
+    def _after_call(self, http_response, parsed, context, event_name,
+                    **kwargs):
+        start = context.pop(_START, None)
+        if start is None:
+            return
+        error = None
+        if http_response.status_code >= 300:
+            error = parsed.get('Error', {}).get('Code') or str(
+                http_response.status_code
+            )
+        _, service, operation = event_name.split('.', 2)
+        self.record(
+            service, operation, time.time() - start,
+            error=error,
+            request_bytes=context.pop(_REQUEST_BYTES, 0),
+            response_bytes=int(
+                http_response.headers.get('content-length') or 0
+            ),
+        )
+
+    def _after_call_error(self, exception, context, event_name, **kwargs):
+        start = context.pop(_START, None)
+        if start is None:
+            return
+        _, service, operation = event_name.split('.', 2)
+        self.record(
+            service, operation, time.time() - start,
+            error=exception.__class__.__name__,
+            request_bytes=context.pop(_REQUEST_BYTES, 0),
+        )
+
+
+collector = MetricsCollector()
+
+
+def enable():
+    """
+    Start collecting metrics for all pooled clients
+    :rtype: MetricsCollector
+    """
+    if not collector.enabled:
+        collector.enabled = True
+        registry.add_hook(collector.register)
+    return collector
+
+
+def disable():
+    """
+    Stop collecting metrics, handlers stay attached but do nothing
+    """
+    collector.enabled = False
+
+
+def stats():
+    """
+    :return: in-process metrics snapshot
+    :rtype: dict
+    """
+    return collector.snapshot()
+
+
+def prometheus():
+    """
+    :return: metrics in Prometheus text format
+    :rtype: str
+    """
+    return collector.prometheus()
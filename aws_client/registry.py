@@ -0,0 +1,267 @@
+from __future__ import unicode_literals
+
+import logging
+import os
+import threading
+import weakref
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+
+def _config_key(config):
+    """
+    Hashable representation of botocore config
+    :param config: botocore config or None
+    :type config: botocore.client.Config
+    :return: hashable key
+    """
+    if config is None:
+        return None
+    # pylint: disable=protected-access
+    options = getattr(config, '_user_provided_options', None)
+    if options is None:
+        return id(config)
+    return repr(sorted(options.items()))
+
+
+class ClientRegistry(object):
+    """
+    Process-wide registry of boto3 sessions and clients.
+
+    Clients are keyed by service, region, credentials, endpoint url and
+    config, so wrappers created with the same settings share one client
+    and one urllib3 connection pool. Low-level clients are thread-safe and
+    shared between threads, resources are not and are cached per thread.
+
+    Connection pools must not be shared with a forked child, so the cache
+    is dropped when the process id changes and `generation` is bumped to
+    let wrappers holding clients rebuild them.
+    """
+
+    def __init__(self, max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS):
+        """
+        :param max_pool_connections: connection pool size for every client
+        :type max_pool_connections: int
+        """
+        self.max_pool_connections = max_pool_connections
+        self._lock = threading.RLock()
+        self._sessions = {}
+        self._clients = {}
+        self._local = threading.local()
+        self._hooks = []
+        self._pid = os.getpid()
+        self._generation = 0
+        self._lock_owners = weakref.WeakSet()
+
+    @property
+    def generation(self):
+        """
+        Counter bumped when cached clients are dropped or after fork
+        :rtype: int
+        """
+        self._check_fork()
+        return self._generation
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self.after_fork()
+
+    def after_fork(self):
+        """
+        Drop clients inherited from parent process.
+        The locks of the registry and of `fork_safe_lock` owners are
+        replaced too, they may have been held by another thread of the
+        parent at fork time
+        """
+        self._lock = threading.RLock()
+        for owner in list(self._lock_owners):
+            owner._lock = threading.Lock()  # pylint: disable=protected-access
+        self._sessions = {}
+        self._clients = {}
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._generation += 1
+        LOGGER.info('Process forked, drop pooled clients')
+
+    def fork_safe_lock(self, owner):
+        """
+        Create lock for the `_lock` attribute of owner, a new lock is set
+        on owner in a forked child
+        :param owner: object keeping the lock as `_lock`
+        :rtype: threading.Lock
+        """
+        self._lock_owners.add(owner)
+        return threading.Lock()
+
+    def configure(self, max_pool_connections=None):
+        """
+        Change registry settings, cached clients are dropped
+        :param max_pool_connections: connection pool size for every client
+        :type max_pool_connections: int
+        """
+        with self._lock:
+            if max_pool_connections:
+                self.max_pool_connections = max_pool_connections
+            self.clear()
+
+    def clear(self):
+        """
+        Drop all cached sessions, clients and resources,
+        wrappers holding clients rebuild them on next call
+        """
+        with self._lock:
+            self._sessions = {}
+            self._clients = {}
+            self._local = threading.local()
+            self._generation += 1
+
+    def add_hook(self, hook):
+        """
+        Register callable applied to every client, including already
+        created ones, e.g. to attach botocore event handlers
+        :param hook: callable receiving botocore client
+        """
+        with self._lock:
+            if hook in self._hooks:
+                return
+            self._hooks.append(hook)
+            for client in self._clients.values():
+                hook(client)
+
+    def session(self,
+                region_name=None,
+                aws_access_key_id=None,
+                aws_secret_access_key=None,
+                aws_session_token=None):
+        """
+        Return shared boto3 session for credentials and region
+        :param region_name: AWS region
+        :param aws_access_key_id: AWS credentials
+        :param aws_secret_access_key: AWS credentials
+        :param aws_session_token: AWS credentials
+        :rtype: boto3.session.Session
+        """
+        self._check_fork()
+        key = (region_name, aws_access_key_id,
+               aws_secret_access_key, aws_session_token)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    import boto3.session
+                    session = boto3.session.Session(
+                        region_name=region_name,
+                        aws_access_key_id=aws_access_key_id,
+                        aws_secret_access_key=aws_secret_access_key,
+                        aws_session_token=aws_session_token,
+                    )
+                    self._sessions[key] = session
+        return session
+
+    def client(self, service,
+               region_name=None,
+               aws_access_key_id=None,
+               aws_secret_access_key=None,
+               aws_session_token=None,
+               endpoint_url=None,
+               config=None):
+        """
+        Return shared low-level client
+        :param service: AWS service ('s3', 'sqs' etc.)
+        :param region_name: AWS region
+        :param aws_access_key_id: AWS credentials
+        :param aws_secret_access_key: AWS credentials
+        :param aws_session_token: AWS credentials
+        :param endpoint_url: custom endpoint url
+        :param config: botocore config
+        :type config: botocore.client.Config
+        :rtype: botocore.client.BaseClient
+        """
+        key = (service, region_name, aws_access_key_id,
+               aws_secret_access_key, aws_session_token,
+               endpoint_url, _config_key(config))
+        self._check_fork()
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    LOGGER.info('Create pooled client for service `%s`',
+                                service)
+                    session = self.session(
+                        region_name, aws_access_key_id,
+                        aws_secret_access_key, aws_session_token
+                    )
+                    # boto3 sessions are not thread-safe, so clients are
+                    # built under the registry lock
+                    client = session.client(
+                        service,
+                        endpoint_url=endpoint_url,
+                        config=self._merge_config(config)
+                    )
+                    for hook in self._hooks:
+                        hook(client)
+                    self._clients[key] = client
+        return client
+
+    def resource(self, service,
+                 region_name=None,
+                 aws_access_key_id=None,
+                 aws_secret_access_key=None,
+                 aws_session_token=None,
+                 endpoint_url=None,
+                 config=None):
+        """
+        Return boto3 resource cached for the current thread
+        :param service: AWS service ('s3', 'sqs' etc.)
+        :rtype: boto3.resources.base.ServiceResource
+        """
+        key = (service, region_name, aws_access_key_id,
+               aws_secret_access_key, aws_session_token,
+               endpoint_url, _config_key(config))
+        self._check_fork()
+        resources = getattr(self._local, 'resources', None)
+        if resources is None:
+            resources = self._local.resources = {}
+        resource = resources.get(key)
+        if resource is None:
+            with self._lock:
+                session = self.session(
+                    region_name, aws_access_key_id,
+                    aws_secret_access_key, aws_session_token
+                )
+                resource = session.resource(
+                    service,
+                    endpoint_url=endpoint_url,
+                    config=self._merge_config(config)
+                )
+                for hook in self._hooks:
+                    hook(resource.meta.client)
+            resources[key] = resource
+        return resource
+
+    def _merge_config(self, config):
+        from botocore.client import Config
+
+        pool_config = Config(max_pool_connections=self.max_pool_connections)
+        if config is None:
+            return pool_config
+        return pool_config.merge(config)
+
+
+registry = ClientRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.after_fork)
+
+
+def configure(max_pool_connections=None):
+    """
+    Configure process-wide client registry
+    :param max_pool_connections: connection pool size for every client
+    :type max_pool_connections: int
+    """
+    registry.configure(max_pool_connections=max_pool_connections)
@@ -0,0 +1,348 @@
+from __future__ import unicode_literals
+
+import logging
+import random
+import time
+
+import six
+from botocore.exceptions import ClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+from botocore.exceptions import HTTPClientError
+
+from .deadlines import DeadlineExceeded
+from .registry import registry
+
+LOGGER = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = frozenset([
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'BandwidthLimitExceeded',
+    'RequestThrottled',
+    'SlowDown',
+    'EC2ThrottledException',
+])
+
+TRANSIENT_ERROR_CODES = frozenset([
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'PriorRequestNotComplete',
+    'InternalError',
+    'InternalFailure',
+    'ServiceUnavailable',
+])
+
+TRANSIENT_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+
+def error_code(exc):
+    """
+    :param exc: exception raised by botocore
+    :return: AWS error code or None
+    """
+    if isinstance(exc, ClientError):
+        return exc.response.get('Error', {}).get('Code')
+
+
+def is_throttling_error(exc):
+    return error_code(exc) in THROTTLING_ERROR_CODES
+
+
+def is_retryable_error(exc):
+    """
+    Throttling, transient server errors, connection errors and read
+    timeouts are retryable
+    :param exc: exception raised by botocore
+    :rtype: bool
+    """
+    if isinstance(exc, (BotocoreConnectionError, HTTPClientError)):
+        return True
+    if not isinstance(exc, ClientError):
+        return False
+    if error_code(exc) in THROTTLING_ERROR_CODES | TRANSIENT_ERROR_CODES:
+        return True
+    status = exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    return status in TRANSIENT_STATUS_CODES
+
+
+class RetryStats(object):
+    """
+    Retry counters of a client wrapper
+    """
+
+    def __init__(self):
+        self._lock = registry.fork_safe_lock(self)
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.sleeps = 0
+        self.slept = 0.0
+        self.budget_exhausted = 0
+
+    def add(self, **counters):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(
+                calls=self.calls,
+                retries=self.retries,
+                throttles=self.throttles,
+                sleeps=self.sleeps,
+                slept=self.slept,
+                budget_exhausted=self.budget_exhausted,
+            )
+
+
+class RetryBudget(object):
+    """
+    Token budget limiting retries to a share of requests.
+
+    Every request deposits `ratio` tokens, every retry withdraws one, so
+    during an outage retries can add at most `ratio` extra load on top of
+    the `capacity` burst.
+    """
+
+    def __init__(self, ratio=0.2, capacity=10):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._balance = float(capacity)
+        self._lock = registry.fork_safe_lock(self)
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def withdraw(self):
+        """
+        :return: True if retry is allowed
+        :rtype: bool
+        """
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+class AdaptiveRateLimiter(object):
+    """
+    Client-side token bucket which only limits after throttling.
+
+    On a throttling error the allowed rate drops to `beta` times the
+    measured send rate, successful calls raise it again by `increase`
+    requests per second until the limit is lifted.
+    """
+
+    def __init__(self, min_rate=0.5, beta=0.7, increase=0.5,
+                 max_rate=None, clock=time.time):
+        self.min_rate = min_rate
+        self.beta = beta
+        self.increase = increase
+        self.max_rate = max_rate
+        self.rate = None
+        self._clock = clock
+        self._tokens = 0.0
+        self._last_refill = clock()
+        self._measured_rate = 0.0
+        self._window_start = self._last_refill
+        self._window_count = 0
+        self._lock = registry.fork_safe_lock(self)
+
+    def acquire(self):
+        """
+        Take a send token, sleeping if the bucket is empty
+        :return: seconds slept
+        :rtype: float
+        """
+        with self._lock:
+            now = self._clock()
+            self._measure(now)
+            if self.rate is None:
+                return 0.0
+            self._tokens = min(
+                self.rate,
+                self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def on_throttle(self):
+        with self._lock:
+            current = self.rate or self._measured_rate or self.min_rate
+            self.rate = max(self.min_rate, current * self.beta)
+            self._tokens = min(self._tokens, 0.0)
+            LOGGER.info('Throttled, limit send rate to %.2f rps', self.rate)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate is None:
+                return
+            self.rate += self.increase
+            ceiling = self.max_rate or max(
+                self._measured_rate * 2, self.min_rate * 2
+            )
+            if self.rate > ceiling:
+                self.rate = None
+
+    def _measure(self, now):
+        self._window_count += 1
+        elapsed = now - self._window_start
+        if elapsed >= 0.5:
+            rate = self._window_count / elapsed
+            self._measured_rate = (
+                rate if not self._measured_rate
+                else 0.8 * self._measured_rate + 0.2 * rate
+            )
+            self._window_start = now
+            self._window_count = 0
+
+
+class RetryPolicy(object):
+    """
+    Retry policy shared by client wrappers.
+
+    Retries throttling, transient and connection errors with decorrelated
+    jitter backoff, limited by a retry budget and an adaptive rate limiter
+    kept per service and region.
+    """
+
+    def __init__(self,
+                 max_attempts=5,
+                 base_delay=0.05,
+                 max_delay=20.0,
+                 budget_ratio=0.2,
+                 budget_capacity=10,
+                 adaptive=True):
+        """
+        :param max_attempts: attempts per call including the first one
+        :type max_attempts: int
+        :param base_delay: minimal backoff in seconds
+        :type base_delay: float
+        :param max_delay: maximal backoff in seconds
+        :type max_delay: float
+        :param budget_ratio: retries allowed per request
+        :type budget_ratio: float
+        :param budget_capacity: retry burst allowed with empty history
+        :type budget_capacity: int
+        :param adaptive: slow the caller down after throttling errors
+        :type adaptive: bool
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_capacity = budget_capacity
+        self.adaptive = adaptive
+        self._budgets = {}
+        self._limiters = {}
+        self._lock = registry.fork_safe_lock(self)
+
+    def budget(self, key):
+        """
+        :param key: (service, region)
+        :rtype: RetryBudget
+        """
+        with self._lock:
+            if key not in self._budgets:
+                self._budgets[key] = RetryBudget(
+                    self.budget_ratio, self.budget_capacity
+                )
+            return self._budgets[key]
+
+    def limiter(self, key):
+        """
+        :param key: (service, region)
+        :rtype: AdaptiveRateLimiter
+        """
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = AdaptiveRateLimiter()
+            return self._limiters[key]
+
+    def backoff(self, previous_delay):
+        """
+        Decorrelated jitter
+        :param previous_delay: previous sleep in seconds
+        :return: next sleep in seconds
+        """
+        return min(
+            self.max_delay,
+            random.uniform(self.base_delay, previous_delay * 3)
+        )
+
+    def call(self, key, func, kwargs, stats=None, on_retry=None,
+             deadline=None):
+        """
+        Call func(**kwargs) retrying retryable errors
+        :param key: (service, region) for budget and rate limiter
+        :param func: botocore client method
+        :param kwargs: operation parameters
+        :param stats: counters to update
+        :type stats: RetryStats
+        :param on_retry: callable invoked with the error before each retry
+        :param deadline: time limit for all attempts
+        :type deadline: aws_client.deadlines.Deadline
+        :raises DeadlineExceeded: when the deadline passed or the next
+        attempt would start after it
+        """
+        stats = stats or RetryStats()
+        budget = self.budget(key)
+        limiter = self.limiter(key) if self.adaptive else None
+        delay = self.base_delay
+        attempt = 0
+        budget.deposit()
+        stats.add(calls=1)
+        while True:
+            attempt += 1
+            if deadline is not None:
+                deadline.check()
+            if limiter:
+                slept = limiter.acquire()
+                if slept:
+                    stats.add(sleeps=1, slept=slept)
+            try:
+                response = func(**kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                if not is_retryable_error(exc):
+                    raise
+                if deadline is not None and deadline.remaining() <= 0:
+                    six.raise_from(DeadlineExceeded(cause=exc), exc)
+                throttled = is_throttling_error(exc)
+                if throttled:
+                    stats.add(throttles=1)
+                    if limiter:
+                        limiter.on_throttle()
+                if attempt >= self.max_attempts:
+                    raise
+                if not budget.withdraw():
+                    stats.add(budget_exhausted=1)
+                    raise
+                delay = self.backoff(delay)
+                if deadline is not None and deadline.remaining() <= delay:
+                    six.raise_from(DeadlineExceeded(cause=exc), exc)
+                LOGGER.info('Retry `%s` in %.3fs after %s',
+                            getattr(func, '__name__', func), delay,
+                            error_code(exc) or exc.__class__.__name__)
+                stats.add(retries=1, sleeps=1, slept=delay)
+                if on_retry:
+                    on_retry(exc)
+                time.sleep(delay)
+                continue
+            if limiter:
+                limiter.on_success()
+            return response
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,316 @@
+from __future__ import unicode_literals
+
+import collections
+import itertools
+import logging
+import os
+import threading
+import time
+
+# noinspection PyUnresolvedReferences
+from six.moves import queue
+from botocore.exceptions import ClientError
+
+from .. import deadlines
+from ..retry import error_code
+from .listing import iter_objects
+
+LOGGER = logging.getLogger(__name__)
+
+# most keys accepted by one delete_objects call
+DELETE_BATCH_SIZE = 1000
+# seconds missing keys are remembered by object_sizes
+NEGATIVE_TTL = 30
+# keys of one folder listed instead of sent HEAD requests, and keys a
+# listing page must resolve to keep listing
+MIN_LISTED_KEYS = 8
+NOT_FOUND_CODES = ('404', 'NoSuchKey', 'NotFound')
+
+_DONE = object()
+
+
+class BatchResult(object):
+    """
+    Outcome of bulk operation
+    """
+
+    def __init__(self):
+        self.succeeded = 0
+        self.results = {}
+        self.errors = {}
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, succeeded=0, errors=None, results=None):
+        with self._lock:
+            self.succeeded += succeeded
+            if errors:
+                self.errors.update(errors)
+            if results:
+                self.results.update(results)
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def throughput(self):
+        """
+        :return: keys processed per second
+        :rtype: float
+        """
+        total = self.succeeded + self.failed
+        return total / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return '<BatchResult {} succeeded, {} failed, {:.3f}s>'.format(
+            self.succeeded, self.failed, self.seconds
+        )
+
+
+def chunks(items, size):
+    """
+    Split iterable into lists of up to size items, lazily
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batches(batches, func, workers):
+    """
+    Call func for every batch on `workers` threads, batches are taken from
+    the iterable as workers get free, so a streamed source is not read
+    ahead by more than `workers` batches
+    :param batches: iterable of batches
+    :param func: callable(batch)
+    :param workers: concurrent calls
+    """
+    tasks = queue.Queue(maxsize=workers)
+    errors = []
+
+    def work():
+        while True:
+            batch = tasks.get()
+            if batch is _DONE:
+                return
+            if errors:
+                continue
+            try:
+                func(batch)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+    threads = [threading.Thread(target=deadlines.wrap(work))
+               for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for batch in batches:
+            if errors:
+                break
+            tasks.put(batch)
+    finally:
+        for _ in threads:
+            tasks.put(_DONE)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def run_each(items, func, workers, key=None, name='Processed'):
+    """
+    Call func for every item on `workers` threads, collecting results and
+    errors per item instead of stopping at the first failure
+    :param items: iterable, consumed lazily
+    :param func: callable(item)
+    :param workers: concurrent calls
+    :param key: callable returning result key of item, item by default
+    :param name: verb for log message
+    :return: {key: func result} in `results`, {key: error code} in
+    `errors`
+    :rtype: BatchResult
+    """
+    result = BatchResult()
+    start = time.time()
+    key = key or (lambda item: item)
+
+    def call(item):
+        try:
+            value = func(item)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning('%s failed: %s', key(item), exc)
+            result.add(errors={
+                key(item): error_code(exc) or exc.__class__.__name__
+            })
+            return
+        result.add(succeeded=1, results={key(item): value})
+
+    run_batches(items, call, workers)
+    result.seconds = time.time() - start
+    LOGGER.info('%s %s items, %s failed, %.3fs, %.1f items/s', name,
+                result.succeeded, result.failed, result.seconds,
+                result.throughput)
+    return result
+
+
+def remove_many(client, bucket_name, keys, workers=4,
+                batch_size=DELETE_BATCH_SIZE):
+    """
+    Delete keys with delete_objects calls of `batch_size` keys
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param keys: iterable of keys, consumed lazily
+    :param workers: concurrent delete_objects calls
+    :param batch_size: keys per call, at most 1000
+    :return: deleted keys count and {key: error code} of failed keys
+    :rtype: BatchResult
+    """
+    result = BatchResult()
+    start = time.time()
+
+    def delete(batch):
+        try:
+            response = client.call(
+                'delete_objects', Bucket=bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch],
+                        'Quiet': True}
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning('Deleting %s keys from %s failed: %s',
+                           len(batch), bucket_name, exc)
+            code = error_code(exc) or exc.__class__.__name__
+            result.add(errors=dict((key, code) for key in batch))
+            return
+        errors = dict((error['Key'], error.get('Code'))
+                      for error in response.get('Errors', ()))
+        result.add(succeeded=len(batch) - len(errors), errors=errors)
+
+    run_batches(chunks(keys, batch_size), delete, workers)
+    result.seconds = time.time() - start
+    LOGGER.info('Deleted %s keys from %s, %s failed, %.3fs, %.1f keys/s',
+                result.succeeded, bucket_name, result.failed,
+                result.seconds, result.throughput)
+    return result
+
+
+def key_groups(keys, min_listed=MIN_LISTED_KEYS):
+    """
+    Group keys by folder
+    :param keys: unique keys
+    :param min_listed: keys of folder worth listing
+    :return: sorted key lists to list and keys to HEAD
+    :rtype: tuple
+    """
+    folders = collections.defaultdict(list)
+    for key in keys:
+        folders[key.rpartition('/')[0]].append(key)
+    listed = []
+    headed = []
+    for folder in folders.values():
+        if len(folder) >= min_listed:
+            listed.append(sorted(folder))
+        else:
+            headed.extend(folder)
+    return listed, headed
+
+
+def list_sizes(client, bucket_name, keys, min_listed=MIN_LISTED_KEYS,
+               page_size=1000):
+    """
+    Find sizes of keys by listing the key range they span. Listing stops
+    when a page resolves less than `min_listed` keys, keys above the last
+    listed one are then left to HEAD requests
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param keys: sorted unique keys
+    :param min_listed: keys a page must resolve to keep listing
+    :param page_size: keys per request, at most 1000
+    :return: {key: size or None} and unresolved keys
+    :rtype: tuple
+    """
+    sizes = {}
+    position = 0
+    resolved = 0
+    records = 0
+    for record in iter_objects(client, bucket_name,
+                               os.path.commonprefix([keys[0], keys[-1]]),
+                               start_after=keys[0][:-1] or None,
+                               stop_at=keys[-1], page_size=page_size):
+        # S3 lists keys in UTF-8 byte order, the same as code point order
+        while position < len(keys) and keys[position] <= record.key:
+            sizes[keys[position]] = (record.size
+                                     if keys[position] == record.key
+                                     else None)
+            position += 1
+            resolved += 1
+        records += 1
+        if records % page_size == 0:
+            if resolved < min_listed:
+                return sizes, keys[position:]
+            resolved = 0
+    for key in keys[position:]:
+        sizes[key] = None
+    return sizes, []
+
+
+def object_sizes(client, bucket_name, keys, workers=8, missing=None,
+                 negative_ttl=NEGATIVE_TTL, min_listed=MIN_LISTED_KEYS):
+    """
+    Find sizes of many objects. Keys clustered in a folder are resolved
+    by listing their key range, a request per up to 1000 keys, others with
+    concurrent HEAD requests
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param keys: iterable of keys
+    :param workers: concurrent requests
+    :param missing: cache of missing keys, consulted and updated
+    :type missing: aws_client.cache.MemoryCache
+    :param negative_ttl: seconds missing keys are cached
+    :param min_listed: keys of folder worth listing
+    :return: {key: size, None if object does not exist}
+    :rtype: dict
+    """
+    start = time.time()
+    sizes = {}
+    unknown = []
+    for key in set(keys):
+        if missing is not None and missing.get(key):
+            sizes[key] = None
+        else:
+            unknown.append(key)
+    listed, headed = key_groups(unknown, min_listed)
+    lock = threading.Lock()
+
+    def list_folder(folder):
+        found, unresolved = list_sizes(client, bucket_name, folder,
+                                       min_listed)
+        with lock:
+            sizes.update(found)
+            headed.extend(unresolved)
+
+    def head(key):
+        try:
+            size = client.hedged_call('head_object', Bucket=bucket_name,
+                                      Key=key)['ContentLength']
+        except ClientError as exc:
+            if error_code(exc) not in NOT_FOUND_CODES:
+                raise
+            size = None
+        with lock:
+            sizes[key] = size
+
+    run_batches(listed, list_folder, workers)
+    run_batches(headed, head, workers)
+    if missing is not None:
+        for key in unknown:
+            if sizes[key] is None:
+                missing.set(key, True, ttl=negative_ttl)
+    LOGGER.info('Checked %s keys on %s, %s folders listed, %s heads, %.3fs',
+                len(sizes), bucket_name, len(listed), len(headed),
+                time.time() - start)
+    return sizes
@@ -15,18 +15,21 @@ class S3Client(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
 
         :param region_name: AWS region name
         :param aws_access_key_id:  AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
         super(S3Client, self).__init__(
             service='s3',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def create_bucket(self, bucket_name):
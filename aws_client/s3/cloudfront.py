@@ -0,0 +1,162 @@
+from __future__ import unicode_literals
+
+import base64
+import fnmatch
+import logging
+from datetime import datetime
+
+LOGGER = logging.getLogger(__name__)
+
+
+def url_b64encode(data):
+    """
+    Base64 with the substitutions CloudFront requires in query strings
+    and cookies
+    """
+    return base64.b64encode(data).replace(b'+', b'-').replace(
+        b'=', b'_').replace(b'/', b'~').decode('utf-8')
+
+
+def to_datetime(timestamp):
+    return datetime.utcfromtimestamp(int(timestamp)) \
+        if timestamp is not None else None
+
+
+class CloudFrontUrlSigner(object):
+    """
+    Signs CloudFront urls and cookies of one distribution with one key.
+
+    The PEM key is parsed once, RSA key parsing costs more than signing.
+    Urls are signed with a canned policy one by one, or share one custom
+    policy with a wildcard resource, so a single signature covers e.g. a
+    whole gallery. Signed cookies grant access to a prefix without signing
+    urls at all.
+    """
+
+    def __init__(self, domain, key_id, private_key):
+        """
+        :param domain: CloudFront distribution domain
+        :type domain: str
+        :param key_id: CloudFront key pair id
+        :type key_id: str
+        :param private_key: PEM encoded RSA private key
+        :type private_key: str
+        """
+        import rsa
+        from botocore.signers import CloudFrontSigner
+
+        self.domain = domain
+        self.key_id = key_id
+        self._rsa = rsa
+        self._private_key = rsa.PrivateKey.load_pkcs1(
+            private_key.encode('utf-8')
+        )
+        self._signer = CloudFrontSigner(key_id, self._rsa_sign)
+
+    def _rsa_sign(self, message):
+        # CloudFront requires SHA-1 hash
+        return self._rsa.sign(message, self._private_key, 'SHA-1')
+
+    def url(self, key):
+        """
+        :param key: path to object on distribution
+        :return: unsigned https url
+        """
+        return 'https://{}/{}'.format(self.domain, key.lstrip('/'))
+
+    def resource(self, pattern):
+        """
+        :param pattern: path pattern, '*' matches any characters
+        :return: policy resource matching http and https urls of pattern
+        """
+        return 'http*://{}/{}'.format(self.domain, pattern.lstrip('/'))
+
+    def policy(self, resource, expires_at, starts_at=None, ip_address=None):
+        """
+        Custom policy
+        :param resource: url or wildcard resource
+        :param expires_at: unix time access ends
+        :param starts_at: unix time access begins
+        :param ip_address: 'x.x.x.x' or 'x.x.x.x/x' access is limited to
+        :return: policy JSON
+        :rtype: str
+        """
+        return self._signer.build_policy(
+            resource, to_datetime(expires_at),
+            date_greater_than=to_datetime(starts_at), ip_address=ip_address
+        )
+
+    def policy_params(self, policy):
+        """
+        :param policy: custom policy JSON
+        :return: Policy, Signature and Key-Pair-Id values
+        :rtype: list
+        """
+        policy = policy.encode('utf-8')
+        return [('Policy', url_b64encode(policy)),
+                ('Signature', url_b64encode(self._rsa_sign(policy))),
+                ('Key-Pair-Id', self.key_id)]
+
+    def sign(self, key, expires_at):
+        """
+        Sign url of key with canned policy
+        :param key: path to object on distribution
+        :param expires_at: unix time url expires
+        :return: signed url
+        :rtype: str
+        """
+        return self._signer.generate_presigned_url(
+            self.url(key), date_less_than=to_datetime(expires_at)
+        )
+
+    def sign_many(self, keys, expires_at, pattern=None):
+        """
+        Sign urls of keys, each with own canned policy, or with one custom
+        policy of `pattern` shared by all urls
+        :param keys: paths to objects on distribution
+        :type keys: list
+        :param expires_at: unix time urls expire
+        :param pattern: path pattern matching all keys, 'gallery/12/*'
+        :return: signed urls
+        :rtype: list
+        :raises ValueError: key not matching pattern, CloudFront would
+        reject its url
+        """
+        if pattern is None:
+            return [self.sign(key, expires_at) for key in keys]
+        keys = list(keys)
+        outside = [key for key in keys if not fnmatch.fnmatchcase(
+            key.lstrip('/'), pattern.lstrip('/'))]
+        if outside:
+            raise ValueError('Keys {} do not match {}'.format(
+                ', '.join(outside), pattern))
+        query = '&'.join('{}={}'.format(name, value) for name, value in
+                         self.policy_params(self.policy(
+                             self.resource(pattern), expires_at)))
+        return ['{}?{}'.format(self.url(key), query) for key in keys]
+
+    def sign_policy(self, key, policy):
+        """
+        Sign url of key with custom policy
+        :param key: path to object on distribution
+        :param policy: policy JSON, see `policy`
+        :return: signed url
+        :rtype: str
+        """
+        return self._signer.generate_presigned_url(self.url(key),
+                                                   policy=policy)
+
+    def cookies(self, prefix, expires_at, starts_at=None, ip_address=None):
+        """
+        Signed cookies granting access to all objects under prefix
+        :param prefix: key prefix
+        :param expires_at: unix time access ends
+        :param starts_at: unix time access begins
+        :param ip_address: 'x.x.x.x' or 'x.x.x.x/x' access is limited to
+        :return: {cookie name: value}
+        :rtype: dict
+        """
+        policy = self.policy(self.resource(prefix + '*'), expires_at,
+                             starts_at=starts_at, ip_address=ip_address)
+        return dict(('CloudFront-{}'.format(name), value)
+                    for name, value in self.policy_params(policy))
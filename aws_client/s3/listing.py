@@ -0,0 +1,179 @@
+from __future__ import unicode_literals
+
+import collections
+import logging
+import threading
+
+# noinspection PyUnresolvedReferences
+from six.moves import queue
+
+from .. import deadlines
+
+LOGGER = logging.getLogger(__name__)
+
+ObjectSummary = collections.namedtuple(
+    'ObjectSummary', ['key', 'size', 'last_modified', 'etag']
+)
+CommonPrefix = collections.namedtuple('CommonPrefix', ['prefix'])
+
+# characters keys usually start with after the prefix (hashes, uuids,
+# dates, names), range shards are cut at them
+SHARD_ALPHABET = (
+    '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+)
+
+_DONE = object()
+
+
+def iter_objects(client, bucket_name, prefix='', delimiter=None,
+                 start_after=None, stop_at=None, page_size=1000):
+    """
+    Page through list_objects_v2 lazily
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param prefix: key prefix
+    :param delimiter: group keys sharing prefix up to delimiter
+    :param start_after: list keys after this one
+    :param stop_at: last key to list
+    :param page_size: keys per request, at most 1000
+    :return: iterator of ObjectSummary and CommonPrefix in key order
+    """
+    kwargs = dict(Bucket=bucket_name, Prefix=prefix, MaxKeys=page_size)
+    if delimiter:
+        kwargs['Delimiter'] = delimiter
+    if start_after:
+        kwargs['StartAfter'] = start_after
+    while True:
+        response = client.call('list_objects_v2', **kwargs)
+        records = [ObjectSummary(item['Key'], item['Size'],
+                                 item['LastModified'],
+                                 item['ETag'].strip('"'))
+                   for item in response.get('Contents', ())]
+        if delimiter:
+            records.extend(CommonPrefix(item['Prefix'])
+                           for item in response.get('CommonPrefixes', ()))
+            records.sort(key=lambda record: record[0])
+        for record in records:
+            if stop_at is not None and record[0] > stop_at:
+                return
+            yield record
+        if not response.get('IsTruncated'):
+            return
+        kwargs['ContinuationToken'] = response['NextContinuationToken']
+
+
+def range_shards(prefix, start_after, shards):
+    """
+    Split keys under prefix into contiguous ranges
+    :param prefix: key prefix
+    :param start_after: list keys after this one
+    :param shards: ranges wanted
+    :return: list of (start_after, stop_at) pairs, both may be None
+    """
+    step = float(len(SHARD_ALPHABET)) / shards
+    boundaries = sorted(set(
+        prefix + SHARD_ALPHABET[int(round(step * idx))]
+        for idx in range(1, shards)
+    ))
+    ranges = []
+    lower = start_after
+    for boundary in boundaries + [None]:
+        if boundary is not None and lower is not None and boundary <= lower:
+            continue
+        ranges.append((lower, boundary))
+        lower = boundary
+    return ranges
+
+
+def iter_objects_parallel(client, bucket_name, prefix='', delimiter=None,
+                          start_after=None, workers=8, page_size=1000):
+    """
+    List all keys under prefix with `workers` concurrent listings.
+
+    With a delimiter, the common prefixes one level below `prefix` are
+    listed first and each becomes a shard. Otherwise the keyspace is cut
+    into ranges at SHARD_ALPHABET characters. Records are yielded as pages
+    arrive, so they are not in key order.
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param prefix: key prefix
+    :param delimiter: key hierarchy separator to shard by
+    :param start_after: list keys after this one
+    :param workers: concurrent listings
+    :param page_size: keys per request, at most 1000
+    :return: iterator of ObjectSummary
+    """
+    shards = queue.Queue()
+    results = queue.Queue(maxsize=workers * 2)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def list_shard(shard_prefix, lower, upper):
+        page = []
+        for record in iter_objects(client, bucket_name, shard_prefix,
+                                   start_after=lower, stop_at=upper,
+                                   page_size=page_size):
+            if stopped.is_set():
+                return
+            page.append(record)
+            if len(page) >= page_size:
+                put(page)
+                page = []
+        if page:
+            put(page)
+
+    def work():
+        while not stopped.is_set():
+            try:
+                shard = shards.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                list_shard(*shard)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.warning('Listing of %s/%s failed: %s',
+                               bucket_name, shard[0], exc)
+                put(exc)
+                stopped.set()
+        put(_DONE)
+
+    top_level = []
+    if delimiter:
+        for record in iter_objects(client, bucket_name, prefix, delimiter,
+                                   start_after, page_size=page_size):
+            if isinstance(record, CommonPrefix):
+                shards.put((record.prefix, start_after, None))
+            else:
+                top_level.append(record)
+    else:
+        # more shards than workers to even out unequal ranges
+        for lower, upper in range_shards(prefix, start_after, workers * 4):
+            shards.put((prefix, lower, upper))
+
+    threads = [threading.Thread(target=deadlines.wrap(work))
+               for _ in range(min(workers, shards.qsize()))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    running = len(threads)
+    try:
+        for record in top_level:
+            yield record
+        while running:
+            item = results.get()
+            if item is _DONE:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                for record in item:
+                    yield record
+    finally:
+        stopped.set()
@@ -0,0 +1,275 @@
+from __future__ import unicode_literals
+
+import base64
+import hashlib
+import hmac
+import logging
+import time
+
+# noinspection PyUnresolvedReferences
+from six.moves.urllib import parse
+
+from ..cache import MemoryCache
+
+LOGGER = logging.getLogger(__name__)
+
+# key presigned once through botocore to learn endpoint, addressing style
+# and signature version of the client
+TEMPLATE_KEY = 'aws-client-url-template'
+SIGV4_ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+DEFAULT_URL_CACHE_SIZE = 10000
+DEFAULT_GRANULARITY = 60 * 60
+
+
+def quote(value, safe='-_.~'):
+    return parse.quote(value.encode('utf-8'), safe=safe)
+
+
+def encode_query(params):
+    return '&'.join('{}={}'.format(quote(name), quote(value))
+                    for name, value in params)
+
+
+class UrlTemplate(object):
+    """
+    Endpoint, path layout and signature version of presigned GET urls of
+    one bucket, as botocore builds them
+    """
+
+    def __init__(self, client, bucket_name):
+        """
+        :param client: boto3 S3 client
+        :param bucket_name: bucket's name
+        """
+        url = parse.urlsplit(client.generate_presigned_url(
+            'get_object', Params={'Bucket': bucket_name, 'Key': TEMPLATE_KEY},
+            ExpiresIn=60
+        ))
+        query = dict(parse.parse_qsl(url.query))
+        self.scheme = url.scheme
+        self.host = url.netloc
+        self.prefix = url.path[:-len(TEMPLATE_KEY)]
+        self.auth_prefix = self.prefix
+        if not self.prefix.startswith('/{}/'.format(bucket_name)):
+            # virtual hosted style, bucket is only in the host
+            self.auth_prefix = '/{}{}'.format(bucket_name, self.prefix)
+        if 'X-Amz-Algorithm' in query:
+            self.version = 'v4'
+            self.region = query['X-Amz-Credential'].split('/')[2]
+        elif 'Signature' in query:
+            self.version = 'v2'
+            self.region = None
+        else:
+            self.version = None
+            self.region = None
+
+
+class UrlSigner(object):
+    """
+    Presigns GET urls of bucket objects locally.
+
+    The botocore request pipeline (parameter validation, endpoint rules,
+    events) is run once for a template url; urls of keys are then signed
+    with the same SigV2 or SigV4 query authentication botocore would use,
+    from one credentials snapshot. Unsigned clients fall back to botocore.
+    """
+
+    def __init__(self, client, bucket_name, template=None, clock=None):
+        """
+        :param client: boto3 S3 client
+        :param bucket_name: bucket's name
+        :param template: UrlTemplate of bucket, built if not given
+        :param clock: time source, time.time by default
+        """
+        self.client = client
+        self.bucket_name = bucket_name
+        self.template = template or UrlTemplate(client, bucket_name)
+        # looked up on every call, so frozen time applies
+        self.clock = clock or (lambda: time.time())
+        # pylint: disable=protected-access
+        credentials = client._request_signer._credentials
+        self.credentials = (credentials.get_frozen_credentials()
+                            if credentials is not None else None)
+        self._signing_keys = {}
+
+    def sign(self, key, expires_in, content_type=None):
+        """
+        :param key: path to object on bucket
+        :type key: str
+        :param expires_in: seconds url is valid
+        :type expires_in: int
+        :param content_type: Content-Type the request must be sent with
+        :type content_type: str
+        :return: presigned url
+        :rtype: str
+        """
+        template = self.template
+        if self.credentials is None or template.version is None:
+            return self._botocore_url(key, expires_in, content_type)
+        path = quote(key, safe='/~')
+        if template.version == 'v2':
+            return self._sign_v2(path, expires_in, content_type)
+        return self._sign_v4(path, expires_in, content_type)
+
+    def _sign_v2(self, path, expires_in, content_type):
+        template = self.template
+        credentials = self.credentials
+        expires = str(int(self.clock() + int(expires_in)))
+        custom = ''
+        if credentials.token:
+            custom = 'x-amz-security-token:{}\n'.format(credentials.token)
+        string_to_sign = 'GET\n\n{}\n{}\n{}{}{}'.format(
+            content_type or '', expires, custom, template.auth_prefix, path
+        )
+        signature = base64.b64encode(hmac.new(
+            credentials.secret_key.encode('utf-8'),
+            string_to_sign.encode('utf-8'), hashlib.sha1
+        ).digest()).decode('utf-8')
+        params = [('AWSAccessKeyId', credentials.access_key),
+                  ('Signature', signature)]
+        if content_type:
+            params.append(('content-type', content_type))
+        if credentials.token:
+            params.append(('x-amz-security-token', credentials.token))
+        params.append(('Expires', expires))
+        return '{}://{}{}{}?{}'.format(template.scheme, template.host,
+                                       template.prefix, path,
+                                       encode_query(params))
+
+    def _sign_v4(self, path, expires_in, content_type):
+        template = self.template
+        credentials = self.credentials
+        now = time.gmtime(self.clock())
+        timestamp = time.strftime('%Y%m%dT%H%M%SZ', now)
+        date = timestamp[:8]
+        scope = '{}/{}/s3/aws4_request'.format(date, template.region)
+        headers = [('host', template.host)]
+        if content_type:
+            headers.insert(0, ('content-type', content_type))
+        signed_headers = ';'.join(name for name, _ in headers)
+        params = [
+            ('X-Amz-Algorithm', SIGV4_ALGORITHM),
+            ('X-Amz-Credential', '{}/{}'.format(credentials.access_key,
+                                                scope)),
+            ('X-Amz-Date', timestamp),
+            ('X-Amz-Expires', str(int(expires_in))),
+            ('X-Amz-SignedHeaders', signed_headers),
+        ]
+        if credentials.token:
+            params.append(('X-Amz-Security-Token', credentials.token))
+        canonical_request = '\n'.join([
+            'GET',
+            template.prefix + path,
+            '&'.join(sorted('{}={}'.format(quote(name), quote(value))
+                            for name, value in params)),
+            ''.join('{}:{}\n'.format(name, value.strip())
+                    for name, value in headers),
+            signed_headers,
+            UNSIGNED_PAYLOAD,
+        ])
+        string_to_sign = '\n'.join([
+            SIGV4_ALGORITHM, timestamp, scope,
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest(),
+        ])
+        signature = hmac.new(self._signing_key(date), string_to_sign.encode(
+            'utf-8'), hashlib.sha256).hexdigest()
+        return '{}://{}{}{}?{}&X-Amz-Signature={}'.format(
+            template.scheme, template.host, template.prefix, path,
+            encode_query(params), signature
+        )
+
+    def _signing_key(self, date):
+        signing_key = self._signing_keys.get(date)
+        if signing_key is None:
+            signing_key = ('AWS4' + self.credentials.secret_key).encode(
+                'utf-8')
+            for part in (date, self.template.region, 's3', 'aws4_request'):
+                signing_key = hmac.new(signing_key, part.encode('utf-8'),
+                                       hashlib.sha256).digest()
+            self._signing_keys = {date: signing_key}
+        return signing_key
+
+    def _botocore_url(self, key, expires_in, content_type):
+        # unsigned urls do not depend on request headers
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket_name, 'Key': key},
+            ExpiresIn=expires_in
+        )
+
+
+class UrlCache(object):
+    """
+    LRU cache of presigned urls.
+
+    Urls are signed at the start of `granularity` seconds long time
+    buckets, so a key signed again within one bucket gets the same url, in
+    any process, and browsers and CDNs keep objects cached by url. A cached
+    url is returned while more than `min_remaining` of its validity is
+    left. Buckets of short-lived urls are shortened to keep to it.
+    """
+
+    def __init__(self, max_size=DEFAULT_URL_CACHE_SIZE, min_remaining=0.5,
+                 granularity=DEFAULT_GRANULARITY, clock=None):
+        """
+        :param max_size: urls kept before least recently used are evicted
+        :type max_size: int
+        :param min_remaining: share of url validity that must be left to
+        return it from cache, between 0 and 1
+        :type min_remaining: float
+        :param granularity: seconds of time bucket
+        :type granularity: int
+        :param clock: time source, time.time by default
+        """
+        if not 0 <= min_remaining < 1:
+            raise ValueError('min_remaining must be in [0, 1)')
+        self.min_remaining = min_remaining
+        self.granularity = granularity
+        self.clock = clock or (lambda: time.time())
+        self.urls = MemoryCache(max_size=max_size,
+                                clock=lambda: self.clock())
+
+    @property
+    def stats(self):
+        """
+        :return: hits, misses, sets and evictions
+        :rtype: dict
+        """
+        return self.urls.stats.as_dict()
+
+    def signing_time(self, expires_in):
+        """
+        :param expires_in: seconds url is valid
+        :return: start of current time bucket, urls are signed as of it
+        :rtype: int
+        """
+        granularity = min(self.granularity,
+                          int(expires_in * (1 - self.min_remaining)))
+        now = int(self.clock())
+        if granularity <= 1:
+            return now
+        return now - now % granularity
+
+    def get(self, key):
+        """
+        :param key: signing parameters
+        :type key: tuple
+        :return: url or None
+        """
+        return self.urls.get(key)
+
+    def set(self, key, url, signed_at, expires_in):
+        """
+        :param key: signing parameters
+        :type key: tuple
+        :param url: presigned url
+        :param signed_at: signing time of url
+        :param expires_in: seconds url is valid since signing time
+        """
+        ttl = signed_at + expires_in * (1 - self.min_remaining) - \
+            self.clock()
+        if ttl > 0:
+            self.urls.set(key, url, ttl=ttl)
+
+    def clear(self):
+        self.urls.clear()
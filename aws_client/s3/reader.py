@@ -0,0 +1,175 @@
+from __future__ import unicode_literals
+
+import collections
+import io
+import logging
+import os
+
+import six
+from botocore.exceptions import ClientError
+
+from ..retry import error_code
+from .transfer import MB, TransferError
+
+LOGGER = logging.getLogger(__name__)
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Seekable read-only file object over S3 object.
+
+    Data is fetched with ranged GETs in blocks kept in a LRU cache. While
+    reads are sequential the read-ahead doubles up to `max_read_ahead`
+    blocks per request, a seek elsewhere resets it, so random access
+    (zip directories, container indexes) fetches little more than it
+    reads. Like a file it must not be shared between threads.
+    """
+
+    def __init__(self,
+                 client,
+                 bucket_name,
+                 key,
+                 block_size=MB,
+                 cache_blocks=16,
+                 max_read_ahead=8):
+        """
+        :param client: S3Client
+        :param bucket_name: bucket's name
+        :param key: path to object on bucket
+        :param block_size: bytes fetched and cached together
+        :type block_size: int
+        :param cache_blocks: blocks kept in cache
+        :type cache_blocks: int
+        :param max_read_ahead: most blocks fetched by one request
+        :type max_read_ahead: int
+        """
+        super(S3ObjectReader, self).__init__()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.name = key
+        self.block_size = block_size
+        self.cache_blocks = max(cache_blocks, max_read_ahead)
+        self.max_read_ahead = max_read_ahead
+        head = client.call('head_object', Bucket=bucket_name, Key=key)
+        self.size = head['ContentLength']
+        self.etag = head['ETag']
+        self.requests = 0
+        self.bytes_fetched = 0
+        self.bytes_read = 0
+        self._position = 0
+        self._blocks = collections.OrderedDict()
+        self._last_block = None
+        self._read_ahead = 1
+
+    @property
+    def stats(self):
+        """
+        :return: requests made, bytes fetched and bytes read by caller
+        :rtype: dict
+        """
+        return dict(requests=self.requests,
+                    bytes_fetched=self.bytes_fetched,
+                    bytes_read=self.bytes_read)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        self._checkClosed()
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._checkClosed()
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError('Invalid whence {}'.format(whence))
+        if position < 0:
+            raise ValueError('Negative seek position {}'.format(position))
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        self._checkClosed()
+        view = memoryview(buffer)
+        end = min(self._position + len(view), self.size)
+        filled = 0
+        while self._position < end:
+            index, offset = divmod(self._position, self.block_size)
+            block = self._block(index)
+            count = min(len(block) - offset, end - self._position)
+            view[filled:filled + count] = block[offset:offset + count]
+            filled += count
+            self._position += count
+        self.bytes_read += filled
+        return filled
+
+    def readall(self):
+        self._checkClosed()
+        data = bytearray(max(0, self.size - self._position))
+        return bytes(data[:self.readinto(data)])
+
+    def close(self):
+        self._blocks.clear()
+        super(S3ObjectReader, self).close()
+
+    def _block(self, index):
+        block = self._blocks.get(index)
+        if block is not None:
+            # most recently used last
+            self._blocks[index] = self._blocks.pop(index)
+        else:
+            if self._last_block is not None and \
+                    index == self._last_block + 1:
+                self._read_ahead = min(self._read_ahead * 2,
+                                       self.max_read_ahead)
+            else:
+                self._read_ahead = 1
+            self._fetch(index, self._read_ahead)
+            block = self._blocks[index]
+        self._last_block = index
+        return block
+
+    def _fetch(self, index, count):
+        last = (self.size - 1) // self.block_size
+        stop = min(index + count, last + 1)
+        # do not fetch again blocks still cached
+        for candidate in range(index + 1, stop):
+            if candidate in self._blocks:
+                stop = candidate
+                break
+        start = index * self.block_size
+        end = min(stop * self.block_size, self.size)
+        try:
+            response = self.client.call(
+                'get_object', Bucket=self.bucket_name, Key=self.key,
+                IfMatch=self.etag,
+                Range='bytes={}-{}'.format(start, end - 1)
+            )
+        except ClientError as exc:
+            if error_code(exc) == 'PreconditionFailed':
+                six.raise_from(TransferError(
+                    '{} changed while open'.format(self.key)), exc)
+            raise
+        body = response['Body']
+        try:
+            data = body.read()
+        finally:
+            body.close()
+        if response['ETag'] != self.etag or len(data) != end - start:
+            raise TransferError('{} changed while open'.format(self.key))
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        for number in range(index, stop):
+            offset = (number - index) * self.block_size
+            self._blocks[number] = data[offset:offset + self.block_size]
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
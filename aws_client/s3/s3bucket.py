@@ -1,18 +1,21 @@
 from __future__ import unicode_literals
 
-from datetime import datetime, timedelta
+import time
 
 # noinspection PyUnresolvedReferences
 from six.moves.urllib import parse
-import boto
-import boto3
-import rsa
 import six
 from botocore.exceptions import ClientError
-from botocore.signers import CloudFrontSigner
 
+from ..cache import MemoryCache
+from ..registry import registry
+from ..s3 import batch, listing, presign, transfer
+from ..s3.reader import S3ObjectReader
 from ..s3.client import S3Client
 
+# missing keys remembered by `sizes` and `exist_many`
+MISSING_KEYS_CACHE_SIZE = 100000
+
 
 def ensure_unicode(obj):
     if isinstance(obj, six.binary_type):
@@ -36,65 +39,214 @@ class S3Bucket(object):
             region_name,
             aws_access_key_id,
             aws_secret_access_key,
+            transfer_config=None,
+            url_cache=None,
+            **kwargs
     ):
         """
         :param bucket_name: bucket's name
+        :param transfer_config: default upload settings
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :param url_cache: cache of presigned and CloudFront urls, may be
+        shared by buckets
+        :type url_cache: aws_client.s3.presign.UrlCache
+        :param kwargs: additional client settings, pass
+        `hedging_policy=HedgingPolicy()` to hedge `get_object`, `exist`
+        and `get_file_size`
         """
         self.bucket_name = bucket_name
+        self.transfer_config = transfer_config
+        self.url_cache = url_cache
+        self._url_template = None
+        self._url_template_generation = None
+        self._cloudfront_signers = {}
+        self._missing_keys = MemoryCache(max_size=MISSING_KEYS_CACHE_SIZE,
+                                         ttl=batch.NEGATIVE_TTL)
         self.client = S3Client(
             region_name,
             aws_access_key_id,
-            aws_secret_access_key)
+            aws_secret_access_key,
+            **kwargs)
+        self._instance = None
+        self._generation = None
 
-        self.instance = boto3.resource(
-            's3', **self.client.settings
-        ).Bucket(bucket_name)
+    @property
+    def instance(self):
+        """
+        boto3 Bucket resource, loaded on first use.
+        Bucket operations go through the low-level client and do not need it
+        :rtype: boto3.resources.base.ServiceResource
+        """
+        generation = registry.generation
+        if self._instance is None or self._generation != generation:
+            self._instance = self.client.resource().Bucket(self.bucket_name)
+            self._generation = generation
+        return self._instance
+
+    def register_fallback(self, operation_name, fallback):
+        """
+        Register substitute for failing client operation, called as
+        fallback(exc, **kwargs) when the circuit is open or the call
+        failed with a retryable error and returning operation response
+        :param operation_name: client method name ('get_object' etc.)
+        :type operation_name: str
+        :param fallback: callable
+        """
+        self.client.register_fallback(operation_name, fallback)
+
+    def warmup(self, connections=4):
+        """
+        Open pooled connections to the bucket endpoint
+        :param connections: connections to open
+        :type connections: int
+        """
+        self.client.warm_connections(
+            'head_bucket', connections, Bucket=self.bucket_name
+        )
 
     def list_objects(self, prefix=''):
         """
-        List objects on bucket
+        List objects on bucket, first 1000 keys only,
+        use `iter_objects` to list all
         :param prefix:  key prefix
         :type prefix: str
-        :return:
+        :return: list_objects_v2 response
         """
         return self.client.instance.list_objects_v2(
             Bucket=self.bucket_name, Prefix=prefix
         )
 
-    def copy(self, source, destination):
+    def iter_objects(self, prefix='', delimiter=None, start_after=None,
+                     workers=1):
+        """
+        Iterate over all objects on bucket, pages are requested lazily.
+
+            for obj in bucket.iter_objects('media/', workers=16):
+                total += obj.size
+
+        With `workers` > 1 the keyspace is split into shards listed
+        concurrently, by the common prefixes under `delimiter` if it is
+        set and by key ranges otherwise. All keys under prefix are then
+        yielded as ObjectSummary records in no particular order.
+        :param prefix: key prefix
+        :type prefix: str
+        :param delimiter: group keys sharing prefix up to delimiter into
+        CommonPrefix records, or shard by it with `workers` > 1
+        :type delimiter: str
+        :param start_after: list keys after this one
+        :type start_after: str
+        :param workers: concurrent listings
+        :type workers: int
+        :return: iterator of ObjectSummary(key, size, last_modified, etag)
+        and CommonPrefix(prefix) records
+        """
+        if workers > 1:
+            return listing.iter_objects_parallel(
+                self.client, self.bucket_name, prefix, delimiter,
+                start_after, workers=workers
+            )
+        return listing.iter_objects(
+            self.client, self.bucket_name, prefix, delimiter, start_after
+        )
+
+    def copy(self, source, destination, transfer_config=None,
+             return_url=True, size=None):
         """
-        Copy object on bucket
+        Copy object on bucket, large objects with concurrent part copies
         :param source: path to source on bucket
         :type source: str
         :param destination: path to destination on bucket
         :type destination: str
-        :return:
+        :param transfer_config: multipart threshold, part size and
+        concurrency, bucket's by default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :param return_url: sign url for destination
+        :type return_url: bool
+        :param size: source length if known, saves a HEAD request of small
+        objects
+        :type size: int
+        :return: presigned url for destination or None
         """
-        kwargs = dict(
-            Bucket=self.bucket_name,
-            CopySource="{}/{}".format(self.bucket_name, source),
-            Key=destination,
-        )
-        self.client.instance.copy_object(**kwargs)
-        return self.generate_url(destination)
+        return self.outer_copy(self.bucket_name, source, destination,
+                               transfer_config=transfer_config,
+                               return_url=return_url, size=size)
 
-    def outer_copy(self, source_bucket, source, destination):
+    def outer_copy(self, source_bucket, source, destination,
+                   transfer_config=None, return_url=False, size=None):
         """
-        Copy from another S3 bucket
+        Copy from another S3 bucket, large objects with concurrent part
+        copies
         :param source_bucket: source bucket's name
         :type source_bucket: str
         :param source: path  to object on source bucket
         :type source: str
         :param destination:  path to destination on self bucket
         :type destination: str
-        :return:
+        :param transfer_config: multipart threshold, part size and
+        concurrency, bucket's by default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :param return_url: sign url for destination
+        :type return_url: bool
+        :param size: source length if known, saves a HEAD request of small
+        objects
+        :type size: int
+        :return: presigned url for destination or None
         """
-        kwargs = dict(
-            Bucket=self.bucket_name,
-            CopySource="{}/{}".format(source_bucket, source),
-            Key=destination,
-        )
-        self.client.instance.copy_object(**kwargs)
+        transfer.copy(self.client, source_bucket, source, self.bucket_name,
+                      destination, transfer_config or self.transfer_config,
+                      size=size)
+        self._missing_keys.delete(destination)
+        if return_url:
+            return self.generate_url(destination)
+
+    def copy_many(self, pairs, source_bucket=None, workers=8,
+                  transfer_config=None, return_urls=False):
+        """
+        Run many copies concurrently
+
+            bucket.copy_many((obj.key, 'backup/' + obj.key, obj.size)
+                             for obj in bucket.iter_objects('media/'))
+
+        :param pairs: iterable of (source, destination) paths, or of
+        (source, destination, size) when source lengths are known, small
+        objects are then copied without a HEAD request
+        :param source_bucket: source bucket's name, self bucket by default
+        :type source_bucket: str
+        :param workers: concurrent copies
+        :type workers: int
+        :param transfer_config: settings of every copy, bucket's by default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :param return_urls: sign urls for destinations
+        :type return_urls: bool
+        :return: {destination: url or None} in `results` and
+        {destination: error code} in `errors`
+        :rtype: aws_client.s3.batch.BatchResult
+        """
+        source_bucket = source_bucket or self.bucket_name
+
+        def copy(pair):
+            source, destination = pair[:2]
+            return self.outer_copy(source_bucket, source, destination,
+                                   transfer_config=transfer_config,
+                                   return_url=return_urls,
+                                   size=pair[2] if len(pair) > 2 else None)
+
+        return batch.run_each(pairs, copy, workers,
+                              key=lambda pair: pair[1], name='Copied')
+
+    def url_signer(self):
+        """
+        Presigner of bucket urls with current credentials
+        :rtype: aws_client.s3.presign.UrlSigner
+        """
+        generation = registry.generation
+        if self._url_template is None or \
+                self._url_template_generation != generation:
+            self._url_template = presign.UrlTemplate(self.client.instance,
+                                                     self.bucket_name)
+            self._url_template_generation = generation
+        return presign.UrlSigner(self.client.instance, self.bucket_name,
+                                 template=self._url_template)
 
     def generate_url(self, key,
                      url_expiration_time=60 * 60 * 24 * 90,
@@ -112,36 +264,71 @@ class S3Bucket(object):
         :return: url
         :rtype str
         """
-        if key is None:
-            return
-
-        key = ensure_unicode(key)
+        return self.generate_urls([key], url_expiration_time,
+                                  force_http_url, content_type)[0]
+
+    def generate_urls(self, keys,
+                      url_expiration_time=60 * 60 * 24 * 90,
+                      force_http_url=False,
+                      content_type=None,
+                      ):
+        """
+        Generate presigned urls for many objects with one signer and
+        credentials snapshot, much faster than generate_url per key.
+        With `url_cache` urls are signed as of the start of its time
+        bucket and reused while enough of their validity is left
+        :param keys: paths to objects on bucket
+        :type keys: list
+        :param url_expiration_time: time until urls expire in seconds
+        :type url_expiration_time: int
+        :param content_type: content-type requests must be sent with
+        :type content_type: str
+        :return: urls, None for None keys
+        :rtype: list
+        """
+        signer = self.url_signer()
+        cache = self.url_cache
+        if cache is not None:
+            signed_at = cache.signing_time(url_expiration_time)
+            signer.clock = lambda: signed_at
+            access_key = (signer.credentials.access_key
+                          if signer.credentials is not None else None)
+        urls = []
+        for key in keys:
+            if key is None:
+                urls.append(None)
+                continue
+            key = ensure_unicode(key).lstrip('/')
+            if cache is None:
+                url = signer.sign(key, url_expiration_time, content_type)
+            else:
+                # object key last, parts are joined with '|'
+                cache_key = ('s3', self.bucket_name, access_key,
+                             url_expiration_time, content_type or '', key)
+                url = cache.get(cache_key)
+                if url is None:
+                    url = signer.sign(key, url_expiration_time, content_type)
+                    cache.set(cache_key, url, signed_at, url_expiration_time)
+            if force_http_url:
+                url = url.replace('https://', 'http://')
+            urls.append(url)
+        return urls
 
-        if not content_type:
-            key = key.lstrip('/')
-            params = {'Bucket': self.bucket_name, 'Key': key}
-            presigned_url = self.client.instance.generate_presigned_url(
-                'get_object',
-                Params=params,
-                ExpiresIn=url_expiration_time
-            )
+    def cloudfront_signer(self, cloudfront_domain, cloudfront_key_id,
+                          cloudfront_private_key):
+        """
+        Signer of distribution urls and cookies, the key is parsed once
+        :rtype: aws_client.s3.cloudfront.CloudFrontUrlSigner
+        """
+        signer_key = (cloudfront_domain, cloudfront_key_id,
+                      cloudfront_private_key)
+        signer = self._cloudfront_signers.get(signer_key)
+        if signer is None:
+            from ..s3.cloudfront import CloudFrontUrlSigner
 
-            if force_http_url:
-                presigned_url = presigned_url.replace('https://', 'http://')
-        else:
-            # workaround for https://github.com/boto/boto3/issues/610
-            conn = boto.connect_s3(
-                self.client.settings['aws_access_key_id'],
-                self.client.settings['aws_secret_access_key'],
-            )
-            presigned_url = conn.generate_url(
-                expires_in=url_expiration_time,
-                method='GET',
-                bucket=self.bucket_name,
-                key=key,
-                headers={'Content-Type': content_type},
-            )
-        return presigned_url
+            signer = CloudFrontUrlSigner(*signer_key)
+            self._cloudfront_signers[signer_key] = signer
+        return signer
 
     def generate_cloudfront_url(self,
                                 key,
@@ -152,72 +339,146 @@ class S3Bucket(object):
                                 force_http_url=False
                                 ):
         """
-        Generate presigned url for object on bucket
+        Generate presigned url for object on bucket, from `url_cache` if
+        it is set
         :param url_expiration_time: time until url expires in seconds
         :type url_expiration_time: int
         :param key:  path to object on bucket
         :return: url
         :rtype str
         """
-        if key is None:
-            return
-
-        key = ensure_unicode(key)
-
-        key = key.lstrip('/')
-
-        url = 'https://{}/{}'.format(cloudfront_domain, key)
-
-        def rsa_signer(message):
-            private_key = cloudfront_private_key
-            return rsa.sign(
-                message,
-                rsa.PrivateKey.load_pkcs1(private_key.encode('utf8')),
-                'SHA-1'
-            )  # CloudFront requires SHA-1 hash
+        return self.generate_cloudfront_urls(
+            [key], cloudfront_domain, cloudfront_key_id,
+            cloudfront_private_key, url_expiration_time, force_http_url
+        )[0]
+
+    def generate_cloudfront_urls(self,
+                                 keys,
+                                 cloudfront_domain,
+                                 cloudfront_key_id,
+                                 cloudfront_private_key,
+                                 url_expiration_time=60 * 60 * 24 * 90,
+                                 force_http_url=False,
+                                 pattern=None
+                                 ):
+        """
+        Generate CloudFront urls for many objects. With `pattern` all urls
+        share one signed custom policy, so one RSA signature covers e.g.
+        a gallery:
 
-        cloudfront_signer = CloudFrontSigner(cloudfront_key_id,
-                                             rsa_signer)
-        expiry_datetime = (
-            datetime.utcnow() +
-            timedelta(seconds=url_expiration_time)
-        )
-        presigned_url = cloudfront_signer.generate_presigned_url(
-            url, date_less_than=expiry_datetime
-        )
+            bucket.generate_cloudfront_urls(keys, domain, key_id, pem,
+                                            pattern='gallery/12/*')
 
+        :param keys: paths to objects on bucket
+        :type keys: list
+        :param url_expiration_time: time until urls expire in seconds
+        :type url_expiration_time: int
+        :param pattern: path pattern matching all keys, '*' is a wildcard
+        :type pattern: str
+        :return: urls, None for None keys
+        :rtype: list
+        """
+        signer = self.cloudfront_signer(cloudfront_domain, cloudfront_key_id,
+                                        cloudfront_private_key)
+        cache = self.url_cache
+        signed_at = (cache.signing_time(url_expiration_time)
+                     if cache is not None else time.time())
+        expires_at = signed_at + url_expiration_time
+        keys = [ensure_unicode(key).lstrip('/') if key is not None else None
+                for key in keys]
+        if pattern is not None:
+            signed = iter(signer.sign_many(
+                [key for key in keys if key is not None], expires_at,
+                pattern=pattern
+            ))
+            urls = [next(signed) if key is not None else None
+                    for key in keys]
+        else:
+            urls = []
+            for key in keys:
+                if key is None:
+                    urls.append(None)
+                    continue
+                if cache is None:
+                    urls.append(signer.sign(key, expires_at))
+                    continue
+                # object key last, parts are joined with '|'
+                cache_key = ('cloudfront', cloudfront_domain,
+                             cloudfront_key_id, url_expiration_time, key)
+                url = cache.get(cache_key)
+                if url is None:
+                    url = signer.sign(key, expires_at)
+                    cache.set(cache_key, url, signed_at, url_expiration_time)
+                urls.append(url)
         if force_http_url:
-            presigned_url = presigned_url.replace('https://', 'http://')
-        return presigned_url
-
-    def upload_from_path(self, filepath, key):
+            urls = [url.replace('https://', 'http://') if url else url
+                    for url in urls]
+        return urls
+
+    def generate_cloudfront_cookies(self,
+                                    prefix,
+                                    cloudfront_domain,
+                                    cloudfront_key_id,
+                                    cloudfront_private_key,
+                                    url_expiration_time=60 * 60 * 24,
+                                    ip_address=None
+                                    ):
         """
-        Upload file on bucket from local storage
+        Generate signed cookies granting access to all objects under
+        prefix through the distribution, set them on the distribution
+        domain and request unsigned urls
+        :param prefix: key prefix
+        :type prefix: str
+        :param url_expiration_time: time until access ends in seconds
+        :type url_expiration_time: int
+        :param ip_address: 'x.x.x.x' or 'x.x.x.x/x' access is limited to
+        :type ip_address: str
+        :return: {cookie name: value}
+        :rtype: dict
+        """
+        signer = self.cloudfront_signer(cloudfront_domain, cloudfront_key_id,
+                                        cloudfront_private_key)
+        cache = self.url_cache
+        signed_at = (cache.signing_time(url_expiration_time)
+                     if cache is not None else time.time())
+        return signer.cookies(ensure_unicode(prefix).lstrip('/'),
+                              signed_at + url_expiration_time,
+                              ip_address=ip_address)
+
+    def upload_from_path(self, filepath, key, transfer_config=None):
+        """
+        Upload file on bucket from local storage, in concurrent parts
+        when it is larger than the multipart threshold
         :param filepath: path to file on local storage
         :type filepath: str
         :param key: path to object on bucket
         :type key: str
+        :param transfer_config: upload settings, bucket's by default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
         :return: presigned url for object
         :rtype str
         """
-        self.instance.upload_file(filepath, key)
+        with open(filepath, 'rb') as fileobj:
+            transfer.upload(self.client, self.bucket_name, key, fileobj,
+                            transfer_config or self.transfer_config)
+        self._missing_keys.delete(key)
         return self.generate_url(key)
 
-    def upload_from_string(self, payload, key):
+    def upload_from_string(self, payload, key, transfer_config=None):
         """
-        Create object on bucket and put payload data or stream data to it
+        Create object on bucket and put payload data or stream data to it,
+        in concurrent parts when it is larger than the multipart threshold
         :param payload: byte string or file object
         :param key: path to object on bucket
         :type key: str
+        :param transfer_config: upload settings, bucket's by default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
         :return: presigned url for object
         :rtype str
         """
-        kwargs = dict(
-            Body=payload,
-            Bucket=self.bucket_name,
-            Key=key,
-        )
-        self.instance.put_object(**kwargs)
+        transfer.upload(self.client, self.bucket_name, key, payload,
+                        transfer_config or self.transfer_config)
+        self._missing_keys.delete(key)
         return self.generate_url(key)
 
     def exist(self, key):
@@ -229,7 +490,8 @@ class S3Bucket(object):
         :rtype : bool
         """
         try:
-            self.client.instance.head_object(
+            self.client.hedged_call(
+                'head_object',
                 Bucket=self.bucket_name,
                 Key=key
             )
@@ -237,6 +499,35 @@ class S3Bucket(object):
         except ClientError:
             return False
 
+    def exist_many(self, keys, workers=8):
+        """
+        Check if keys exist on bucket, see `sizes`
+        :param keys: iterable of paths to objects on bucket
+        :param workers: concurrent requests
+        :type workers: int
+        :return: {key: True if object exists}
+        :rtype: dict
+        """
+        return dict((key, size is not None)
+                    for key, size in self.sizes(keys, workers).items())
+
+    def sizes(self, keys, workers=8):
+        """
+        Return sizes of many objects without a HEAD request per key.
+        Keys clustered in a folder are resolved by listing their key range,
+        others with concurrent HEAD requests. Missing keys are remembered
+        for `batch.NEGATIVE_TTL` seconds, or until uploaded through this
+        bucket object
+        :param keys: iterable of paths to objects on bucket
+        :param workers: concurrent requests
+        :type workers: int
+        :return: {key: length in bytes, None if object does not exist}
+        :rtype: dict
+        """
+        return batch.object_sizes(self.client, self.bucket_name, keys,
+                                  workers=workers,
+                                  missing=self._missing_keys)
+
     def get_object(self, key):
         """
         Return stream(file object) and content-length
@@ -245,12 +536,84 @@ class S3Bucket(object):
         :return: stream, content-length
         :rtype: tuple
         """
-        response = self.client.instance.get_object(
+        response = self.client.hedged_call(
+            'get_object',
+            discard=lambda late: late['Body'].close(),
             Bucket=self.bucket_name,
             Key=key
         )
         return response['Body'], response['ContentLength']
 
+    def download_into(self, key, buffer, transfer_config=None):
+        """
+        Download object into writable buffer with no intermediate copies,
+        in concurrent byte ranges when it is larger than the multipart
+        threshold. Length and ETag of every range are verified.
+
+            buffer = bytearray(bucket.get_file_size(key))
+            bucket.download_into(key, buffer)
+
+        :param key: path to object on bucket
+        :type key: str
+        :param buffer: bytearray, mmap or other writable buffer at least
+        as long as the object
+        :param transfer_config: part size and concurrency, bucket's by
+        default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :return: transfer summary
+        :rtype: aws_client.s3.transfer.TransferStats
+        """
+        return transfer.download_into(
+            self.client, self.bucket_name, key, buffer,
+            transfer_config or self.transfer_config
+        )
+
+    def download_to_path(self, key, filepath, transfer_config=None):
+        """
+        Download object to local file preallocated to object size, ranges
+        are fetched concurrently and written in place through mmap
+        :param key: path to object on bucket
+        :type key: str
+        :param filepath: path to file on local storage
+        :type filepath: str
+        :param transfer_config: part size and concurrency, bucket's by
+        default
+        :type transfer_config: aws_client.s3.transfer.TransferConfig
+        :return: transfer summary
+        :rtype: aws_client.s3.transfer.TransferStats
+        """
+        return transfer.download_to_path(
+            self.client, self.bucket_name, key, filepath,
+            transfer_config or self.transfer_config
+        )
+
+    def open(self, key, block_size=1024 * 1024, cache_blocks=16,
+             max_read_ahead=8):
+        """
+        Open object for random access without downloading it.
+
+            with bucket.open('archive.zip') as reader:
+                with zipfile.ZipFile(reader) as archive:
+                    data = archive.read('manifest.json')
+
+        :param key: path to object on bucket
+        :type key: str
+        :param block_size: bytes fetched and cached together
+        :type block_size: int
+        :param cache_blocks: blocks kept in LRU cache
+        :type cache_blocks: int
+        :param max_read_ahead: most blocks fetched by one request while
+        reading sequentially
+        :type max_read_ahead: int
+        :return: seekable raw file object, `stats` shows requests, bytes
+        fetched and bytes read
+        :rtype: aws_client.s3.reader.S3ObjectReader
+        """
+        return S3ObjectReader(self.client, self.bucket_name, key,
+                              block_size=block_size,
+                              cache_blocks=cache_blocks,
+                              max_read_ahead=max_read_ahead)
+
     def remove(self, key):
         """
         Remove object from bucket
@@ -259,6 +622,37 @@ class S3Bucket(object):
         """
         self.client.instance.delete_object(Bucket=self.bucket_name, Key=key)
 
+    def remove_many(self, keys, workers=4):
+        """
+        Remove objects with delete_objects calls of 1000 keys, run on
+        `workers` threads
+        :param keys: iterable of paths to objects on bucket, consumed lazily
+        :param workers: concurrent delete_objects calls
+        :type workers: int
+        :return: deleted count, {key: error code} of failed keys, duration
+        and throughput
+        :rtype: aws_client.s3.batch.BatchResult
+        """
+        return batch.remove_many(self.client, self.bucket_name, keys,
+                                 workers=workers)
+
+    def remove_prefix(self, prefix, workers=4):
+        """
+        Remove all objects under prefix, listed keys are deleted in
+        batches while listing goes on
+        :param prefix: key prefix, must not be empty
+        :type prefix: str
+        :param workers: concurrent delete_objects calls
+        :type workers: int
+        :rtype: aws_client.s3.batch.BatchResult
+        """
+        if not prefix:
+            raise ValueError('Refusing to remove every object of bucket')
+        return self.remove_many(
+            (record.key for record in self.iter_objects(prefix)),
+            workers=workers
+        )
+
     @staticmethod
     def reduce_url(url):
         """
@@ -307,7 +701,8 @@ class S3Bucket(object):
         :param key:  path to object on bucket
         :return: length in bytes
         """
-        response = self.client.instance.head_object(
+        response = self.client.hedged_call(
+            'head_object',
             Bucket=self.bucket_name,
             Key=key)
         return response.get('ContentLength', 0)
@@ -0,0 +1,556 @@
+from __future__ import unicode_literals
+
+import contextlib
+import io
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+import six
+from botocore.exceptions import ClientError, IncompleteReadError
+
+from .. import deadlines
+from ..exceptions import BaseAWSClientException
+from ..retry import error_code
+
+try:
+    from botocore.exceptions import ResponseStreamingError
+except ImportError:  # botocore < 1.29
+    ResponseStreamingError = IncompleteReadError
+
+LOGGER = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+MAX_PARTS = 10000
+# smallest part S3 accepts, but for the last one
+MIN_PART_SIZE = 5 * MB
+# object settings create_multipart_upload does not take from copy source
+COPIED_HEADERS = ('ContentType', 'ContentEncoding', 'ContentDisposition',
+                  'ContentLanguage', 'CacheControl', 'Metadata')
+# attempts to fetch a byte range when the response stream breaks
+RANGE_ATTEMPTS = 3
+
+# mkstemp creates files readable by owner only, downloaded files get the
+# mode open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class TransferError(BaseAWSClientException):
+    """
+    Downloaded object does not match its length or ETag
+    """
+
+
+class TransferConfig(object):
+    """
+    Upload and download settings of S3Bucket
+    """
+
+    def __init__(self,
+                 multipart_threshold=8 * MB,
+                 part_size=8 * MB,
+                 max_concurrency=10,
+                 progress_callback=None,
+                 on_complete=None):
+        """
+        :param multipart_threshold: payloads of this size and larger are
+        transferred in parts
+        :type multipart_threshold: int
+        :param part_size: part size in bytes, also size of downloaded byte
+        ranges, at least MIN_PART_SIZE as S3 requires for all uploaded
+        parts but the last, raised when the payload would need more than
+        10000 parts
+        :type part_size: int
+        :param max_concurrency: parts transferred at once, also bounds
+        upload memory to max_concurrency * part_size
+        :type max_concurrency: int
+        :param progress_callback: called with number of bytes of each
+        transferred part, from transferring threads
+        :param on_complete: called with TransferStats of finished transfer
+        :raises ValueError: part_size below MIN_PART_SIZE or
+        max_concurrency below 1
+        """
+        if part_size < MIN_PART_SIZE:
+            raise ValueError('part_size must be at least {} bytes'.format(
+                MIN_PART_SIZE))
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.progress_callback = progress_callback
+        self.on_complete = on_complete
+
+
+DEFAULT_TRANSFER_CONFIG = TransferConfig()
+
+
+class TransferStats(object):
+    """
+    Finished transfer summary
+    """
+
+    def __init__(self, key, size, parts, seconds):
+        self.key = key
+        self.size = size
+        self.parts = parts
+        self.seconds = seconds
+
+    @property
+    def throughput(self):
+        """
+        :return: bytes per second
+        :rtype: float
+        """
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return '<TransferStats {}: {} bytes, {} parts, {:.3f}s>'.format(
+            self.key, self.size, self.parts, self.seconds
+        )
+
+
+def read_full(fileobj, size):
+    """
+    Read up to size bytes, streams may return less per read call
+    :rtype: bytes
+    """
+    chunks = []
+    while size > 0:
+        chunk = fileobj.read(size)
+        if not chunk:
+            break
+        if isinstance(chunk, six.text_type):
+            chunk = chunk.encode('utf-8')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class PartReader(object):
+    """
+    Reads consecutive parts of a stream for concurrent uploaders
+    """
+
+    def __init__(self, fileobj, part_size, head=b''):
+        self.fileobj = fileobj
+        self.part_size = part_size
+        self.head = head
+        self.number = 0
+        self._lock = threading.Lock()
+
+    def next_part(self):
+        """
+        :return: (part number, data) or None when the stream is exhausted
+        :rtype: tuple
+        """
+        with self._lock:
+            data = self.head[:self.part_size]
+            self.head = self.head[self.part_size:]
+            if len(data) < self.part_size:
+                data += read_full(self.fileobj, self.part_size - len(data))
+            if not data and self.number:
+                return None
+            self.number += 1
+            return self.number, data
+
+
+def upload(client, bucket_name, key, source, config=None):
+    """
+    Upload bytes or file object, in concurrent parts when it is larger
+    than the multipart threshold. Parts are retried one by one, a failed
+    upload is aborted.
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param key: path to object on bucket
+    :param source: byte string or file object
+    :param config: TransferConfig
+    :rtype: TransferStats
+    """
+    config = config or DEFAULT_TRANSFER_CONFIG
+    start = time.time()
+    if isinstance(source, six.text_type):
+        source = source.encode('utf-8')
+    if isinstance(source, (six.binary_type, bytearray)):
+        size = len(source)
+        fileobj = io.BytesIO(source)
+    else:
+        size = stream_size(source)
+        fileobj = source
+
+    head = b''
+    body = None
+    if size is None:
+        # unknown length, decide by the first threshold bytes
+        head = read_full(fileobj, config.multipart_threshold)
+        if len(head) < config.multipart_threshold:
+            size = len(head)
+            body = head
+    elif size < config.multipart_threshold:
+        body = source if fileobj is not source else fileobj.read()
+
+    if body is not None:
+        client.call('put_object', Bucket=bucket_name, Key=key, Body=body)
+        if config.progress_callback is not None:
+            config.progress_callback(size)
+        parts = 1
+    else:
+        part_size = config.part_size
+        if size is not None:
+            part_size = max(part_size, -(-size // MAX_PARTS))
+        reader = PartReader(fileobj, part_size, head)
+        parts, size = upload_parts(client, bucket_name, key, reader, config)
+
+    stats = TransferStats(key, size, parts, time.time() - start)
+    LOGGER.info('Uploaded %s/%s, %s bytes in %s parts, %.3fs, %.1f MB/s',
+                bucket_name, key, stats.size, stats.parts, stats.seconds,
+                stats.throughput / MB)
+    if config.on_complete is not None:
+        config.on_complete(stats)
+    return stats
+
+
+def stream_size(fileobj):
+    """
+    :return: bytes left in seekable stream, None for other streams
+    :rtype: int
+    """
+    try:
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        end = fileobj.tell()
+        fileobj.seek(position)
+    except (AttributeError, IOError, OSError):
+        return None
+    return end - position
+
+
+def upload_parts(client, bucket_name, key, reader, config):
+    """
+    Multipart upload of parts from reader by `max_concurrency` threads
+    :return: parts and bytes uploaded
+    :rtype: tuple
+    """
+    def send(upload_id, number, data):
+        response = client.call(
+            'upload_part', Bucket=bucket_name, Key=key,
+            UploadId=upload_id, PartNumber=number, Body=data
+        )
+        return response['ETag'], len(data)
+
+    return multipart(client, bucket_name, key, reader.next_part, send,
+                     config)
+
+
+def multipart(client, bucket_name, key, next_part, send, config,
+              **create_kwargs):
+    """
+    Run multipart upload with parts sent by `max_concurrency` threads,
+    abort it on failure
+    :param next_part: callable returning (part number, part) or None
+    :param send: callable(upload id, part number, part) uploading the
+    part and returning its ETag and size
+    :param config: TransferConfig
+    :param create_kwargs: create_multipart_upload parameters
+    :return: parts and bytes sent
+    :rtype: tuple
+    """
+    upload_id = client.call(
+        'create_multipart_upload', Bucket=bucket_name, Key=key,
+        **create_kwargs
+    )['UploadId']
+    etags = {}
+    sizes = []
+    errors = []
+
+    def work():
+        while not errors:
+            try:
+                part = next_part()
+                if part is None:
+                    return
+                number, payload = part
+                etag, size = send(upload_id, number, payload)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+                return
+            etags[number] = etag
+            sizes.append(size)
+            if config.progress_callback is not None:
+                config.progress_callback(size)
+
+    threads = [threading.Thread(target=deadlines.wrap(work))
+               for _ in range(max(1, config.max_concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        LOGGER.warning('Multipart upload of %s/%s failed, aborting: %s',
+                       bucket_name, key, errors[0])
+        try:
+            client.call('abort_multipart_upload', Bucket=bucket_name,
+                        Key=key, UploadId=upload_id)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning('Abort of %s/%s failed: %s',
+                           bucket_name, key, exc)
+        raise errors[0]
+
+    client.call(
+        'complete_multipart_upload', Bucket=bucket_name, Key=key,
+        UploadId=upload_id,
+        MultipartUpload={'Parts': [
+            {'PartNumber': number, 'ETag': etags[number]}
+            for number in sorted(etags)
+        ]}
+    )
+    return len(etags), sum(sizes)
+
+
+def copy(client, source_bucket, source_key, bucket_name, key, config=None,
+         size=None):
+    """
+    Copy object on S3 side, objects of multipart threshold size and larger
+    with concurrent upload_part_copy calls, which also copies objects over
+    the 5 GB copy_object limit. Content type, metadata and other object
+    headers are carried over.
+    :param client: S3Client
+    :param source_bucket: source bucket's name
+    :param source_key: path to source object
+    :param bucket_name: destination bucket's name
+    :param key: path to destination object
+    :param config: TransferConfig
+    :param size: source length if already known, e.g. from listing, objects
+    below the multipart threshold are then copied without a HEAD request
+    :type size: int
+    :rtype: TransferStats
+    """
+    config = config or DEFAULT_TRANSFER_CONFIG
+    start = time.time()
+    source = {'Bucket': source_bucket, 'Key': source_key}
+    head = None
+    if size is None or size >= config.multipart_threshold:
+        head = client.call('head_object', **source)
+        size = head['ContentLength']
+    if size < config.multipart_threshold:
+        client.call('copy_object', Bucket=bucket_name, Key=key,
+                    CopySource=source)
+        if config.progress_callback is not None:
+            config.progress_callback(size)
+        parts = 1
+    else:
+        part_size = max(config.part_size, -(-size // MAX_PARTS))
+        ranges = enumerate(
+            ((offset, min(offset + part_size, size) - 1)
+             for offset in range(0, size, part_size)), 1
+        )
+        lock = threading.Lock()
+
+        def next_part():
+            with lock:
+                return next(ranges, None)
+
+        def send(upload_id, number, byte_range):
+            response = client.call(
+                'upload_part_copy', Bucket=bucket_name, Key=key,
+                UploadId=upload_id, PartNumber=number, CopySource=source,
+                CopySourceIfMatch=head['ETag'],
+                CopySourceRange='bytes={}-{}'.format(*byte_range)
+            )
+            return (response['CopyPartResult']['ETag'],
+                    byte_range[1] - byte_range[0] + 1)
+
+        create_kwargs = dict(
+            (name, head[name]) for name in COPIED_HEADERS if head.get(name)
+        )
+        parts, size = multipart(client, bucket_name, key, next_part, send,
+                                config, **create_kwargs)
+
+    stats = TransferStats(key, size, parts, time.time() - start)
+    LOGGER.info('Copied %s/%s to %s/%s, %s bytes in %s parts, %.3fs',
+                source_bucket, source_key, bucket_name, key, stats.size,
+                stats.parts, stats.seconds)
+    if config.on_complete is not None:
+        config.on_complete(stats)
+    return stats
+
+
+def read_into(body, view):
+    """
+    Fill memoryview from response stream
+    :param body: botocore StreamingBody
+    :param view: writable memoryview
+    :return: bytes read, less than len(view) if the stream ended
+    :rtype: int
+    """
+    filled = 0
+    readinto = getattr(body, 'readinto', None)
+    while filled < len(view):
+        if readinto is not None:
+            count = readinto(view[filled:])
+        else:  # botocore < 1.31
+            chunk = body.read(len(view) - filled)
+            count = len(chunk)
+            view[filled:filled + count] = chunk
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def download_into(client, bucket_name, key, buffer, config=None,
+                  head=None):
+    """
+    Download object into writable buffer (bytearray, mmap etc.), objects
+    larger than the multipart threshold in concurrent byte ranges. Ranges
+    are read straight into the buffer and checked against the object
+    length and ETag, a range is fetched again when its stream breaks.
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param key: path to object on bucket
+    :param buffer: writable buffer at least as long as the object
+    :param config: TransferConfig
+    :param head: head_object response if already requested
+    :rtype: TransferStats
+    :raises TransferError: object changed during download
+    """
+    config = config or DEFAULT_TRANSFER_CONFIG
+    start = time.time()
+    if head is None:
+        head = client.call('head_object', Bucket=bucket_name, Key=key)
+    size = head['ContentLength']
+    etag = head['ETag']
+    view = memoryview(buffer)
+    if len(view) < size:
+        raise ValueError('Buffer of {} bytes is too small for {} bytes of '
+                         '{}'.format(len(view), size, key))
+    if size < config.multipart_threshold:
+        ranges = [(0, size)]
+    else:
+        ranges = [(offset, min(offset + config.part_size, size))
+                  for offset in range(0, size, config.part_size)]
+    download_ranges(client, bucket_name, key, etag, view, ranges, config)
+
+    stats = TransferStats(key, size, len(ranges), time.time() - start)
+    LOGGER.info('Downloaded %s/%s, %s bytes in %s parts, %.3fs, %.1f MB/s',
+                bucket_name, key, stats.size, stats.parts, stats.seconds,
+                stats.throughput / MB)
+    if config.on_complete is not None:
+        config.on_complete(stats)
+    return stats
+
+
+def download_to_path(client, bucket_name, key, path, config=None):
+    """
+    Download object into file preallocated to object size and mapped to
+    memory, ranges are written to their place in the file as they arrive.
+    The file is written to a unique temporary file next to path and renamed
+    when complete, so concurrent downloads to one path do not collide.
+    :param client: S3Client
+    :param bucket_name: bucket's name
+    :param key: path to object on bucket
+    :param path: path to file on local storage
+    :param config: TransferConfig
+    :rtype: TransferStats
+    :raises TransferError: object changed during download
+    """
+    head = client.call('head_object', Bucket=bucket_name, Key=key)
+    size = head['ContentLength']
+    handle, partial = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.',
+        prefix='.{}.'.format(os.path.basename(path)), suffix='.part'
+    )
+    try:
+        with os.fdopen(handle, 'wb+') as fileobj:
+            if size:
+                fileobj.truncate(size)
+                with contextlib.closing(
+                        mmap.mmap(fileobj.fileno(), size)) as buffer:
+                    stats = download_into(client, bucket_name, key, buffer,
+                                          config, head=head)
+                    buffer.flush()
+            else:
+                stats = download_into(client, bucket_name, key,
+                                      bytearray(), config, head=head)
+        os.chmod(partial, 0o666 & ~_UMASK)
+        os.rename(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return stats
+
+
+def download_ranges(client, bucket_name, key, etag, view, ranges, config):
+    """
+    Fetch byte ranges into view by `max_concurrency` threads
+    :param etag: expected ETag of every range
+    :param ranges: list of (start, end) offsets, end excluded
+    """
+    pending = list(reversed(ranges))
+    errors = []
+    lock = threading.Lock()
+
+    def fetch(start, end):
+        kwargs = dict(Bucket=bucket_name, Key=key, IfMatch=etag)
+        if end > start:
+            kwargs['Range'] = 'bytes={}-{}'.format(start, end - 1)
+        for attempt in range(1, RANGE_ATTEMPTS + 1):
+            body = None
+            try:
+                response = client.call('get_object', **kwargs)
+                body = response['Body']
+                if response['ETag'] != etag:
+                    raise TransferError('{} changed during download'.format(
+                        key))
+                filled = read_into(body, view[start:end])
+                if filled != end - start or body.read(1):
+                    raise TransferError(
+                        'Range {}-{} of {} has unexpected length'.format(
+                            start, end, key)
+                    )
+                return
+            except ClientError as exc:
+                # client.call has already retried it under its retry policy
+                # and budget
+                if error_code(exc) == 'PreconditionFailed':
+                    six.raise_from(TransferError(
+                        '{} changed during download'.format(key)), exc)
+                raise
+            except (IncompleteReadError, ResponseStreamingError) as exc:
+                if attempt == RANGE_ATTEMPTS:
+                    raise
+                LOGGER.warning('Range %s-%s of %s/%s broke, fetching '
+                               'again: %s', start, end, bucket_name, key, exc)
+            finally:
+                if body is not None:
+                    body.close()
+
+    def work():
+        while not errors:
+            with lock:
+                if not pending:
+                    return
+                start, end = pending.pop()
+            try:
+                fetch(start, end)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+                return
+            if config.progress_callback is not None:
+                config.progress_callback(end - start)
+
+    threads = [threading.Thread(target=deadlines.wrap(work))
+               for _ in range(max(1, min(config.max_concurrency,
+                                         len(ranges))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,136 @@
+from __future__ import unicode_literals
+
+import collections
+import logging
+import os
+import threading
+import time
+
+from . import deadlines
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_NEGATIVE_TTL = 10.0
+DEFAULT_MAX_MISSING = 1024
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent identical lookups.
+
+    The first caller of `do` for a key runs the lookup, callers arriving
+    while it is in flight wait for it and get the same result or exception,
+    or DeadlineExceeded when their own deadline runs out first.
+    A None result means the resource does not exist and is remembered for
+    `negative_ttl` seconds, so a missing queue or API is not looked up by
+    every call, at most `max_missing` of them. Positive results are not
+    kept, callers cache them.
+    """
+
+    def __init__(self, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 max_missing=DEFAULT_MAX_MISSING, clock=time.time):
+        """
+        :param negative_ttl: seconds to remember missing resources
+        :type negative_ttl: float
+        :param max_missing: missing resources remembered before the oldest
+        are dropped
+        :type max_missing: int
+        """
+        self.negative_ttl = negative_ttl
+        self.max_missing = max_missing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._missing = collections.OrderedDict()
+
+    def do(self, key, func):
+        """
+        Run func once for all concurrent callers with the same key
+        :param key: hashable lookup key
+        :param func: callable without arguments, None result is cached
+        as missing resource
+        :return: func result
+        :raises DeadlineExceeded: waiting for the lookup of another caller
+        outlasted the current deadline
+        """
+        with self._lock:
+            expires = self._missing.get(key)
+            if expires is not None:
+                if expires > self._clock():
+                    return None
+                del self._missing[key]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            deadline = deadlines.current()
+            if deadline is None:
+                call.done.wait()
+            elif not call.done.wait(max(deadline.remaining(), 0)):
+                raise deadlines.DeadlineExceeded()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as exc:  # pylint: disable=broad-except
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and call.result is None:
+                    self._remember_missing(key)
+            if call.waiters:
+                LOGGER.debug('Shared lookup `%s` with %d callers',
+                             key, call.waiters)
+            call.done.set()
+        return call.result
+
+    def _remember_missing(self, key):
+        now = self._clock()
+        self._missing.pop(key, None)
+        self._missing[key] = now + self.negative_ttl
+        # all entries live negative_ttl, so the oldest expire first
+        while self._missing:
+            oldest = next(iter(self._missing))
+            if self._missing[oldest] > now and \
+                    len(self._missing) <= self.max_missing:
+                break
+            del self._missing[oldest]
+
+    def forget(self, key):
+        """
+        Drop remembered missing resource, e.g. after creating it
+        :param key: lookup key
+        """
+        with self._lock:
+            self._missing.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._missing = collections.OrderedDict()
+
+    def after_fork(self):
+        # leaders of inherited calls do not exist in the child
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._missing = collections.OrderedDict()
+
+
+group = SingleFlight()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=group.after_fork)
@@ -1,6 +1,5 @@
 import json
 
-from aws_client.aws_lambda.client import LambdaClient
 from ..aws_client import BaseAWSClient
 
 
@@ -10,18 +9,20 @@ class SNSClient(BaseAWSClient):
     def __init__(self,
                  region_name,
                  aws_access_key_id,
-                 aws_secret_access_key):
+                 aws_secret_access_key,
+                 **kwargs):
         """
         :param region_name: AWS region name
         :param aws_access_key_id:  AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
-        self.__arns = {}
         super(SNSClient, self).__init__(
             service='sns',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
+            **kwargs
         )
 
     def get_topic_arn(self, topic_name):
@@ -30,20 +31,30 @@ class SNSClient(BaseAWSClient):
         :param topic_name: SNS topic name
         :return:
         """
-        if topic_name not in self.__arns:
-            response = self.instance.list_topics()
-            exist = False
-            if 'Topics' in response:
-                for topic in response['Topics']:
-                    if topic['TopicArn'].split(':')[-1] == topic_name:
-                        self.__arns[topic_name] = topic['TopicArn']
-                        exist = True
-                        break
-            if not exist:
-                response = self.instance.create_topic(Name=topic_name)
-                self.__arns[topic_name] = response['TopicArn']
+        return self.lookup('topic_arn', topic_name,
+                           lambda: self._fetch_topic_arn(topic_name))
 
-        return self.__arns.get(topic_name)
+    def _fetch_topic_arn(self, topic_name):
+        response = self.instance.list_topics()
+        for topic in response.get('Topics', []):
+            if topic['TopicArn'].split(':')[-1] == topic_name:
+                return topic['TopicArn']
+        return self.instance.create_topic(Name=topic_name)['TopicArn']
+
+    def warmup(self, topic_names=(), connections=4):
+        """
+        Resolve topic ARNs and open pooled connections to SNS endpoint
+        :param topic_names: topics to resolve
+        :type topic_names: list
+        :param connections: connections to open
+        :type connections: int
+        """
+        arns = [self.get_topic_arn(name) for name in topic_names]
+        if arns:
+            self.warm_connections('get_topic_attributes', connections,
+                                  TopicArn=arns[0])
+        else:
+            self.warm_connections('list_topics', connections)
 
     def publish(self, topic_name, message, protocol):
         """
@@ -69,6 +80,8 @@ class SNSClient(BaseAWSClient):
         :type function_name: str
         :return:
         """
+        from ..aws_lambda.client import LambdaClient
+
         lambda_client = LambdaClient(**self.settings)
         self.instance.subscribe(
             TopicArn=self.get_topic_arn(topic_name),
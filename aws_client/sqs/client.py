@@ -5,6 +5,12 @@ import json
 from botocore.exceptions import ClientError
 
 from ..aws_client import BaseAWSClient
+from ..retry import error_code
+
+MISSING_QUEUE_ERROR_CODES = frozenset([
+    'AWS.SimpleQueueService.NonExistentQueue',
+    'QueueDoesNotExist',
+])
 
 
 class SQSClient(BaseAWSClient):
@@ -14,20 +20,22 @@ class SQSClient(BaseAWSClient):
                  region_name,
                  aws_access_key_id,
                  aws_secret_access_key,
-                 endpoint_url=None
+                 endpoint_url=None,
+                 **kwargs
                  ):
         """
         :param region_name: AWS region name
         :param aws_access_key_id:  AWS credentials
         :param aws_secret_access_key: AWS credentials
+        :param kwargs: additional client settings
         """
-        self.__urls = {}
         settings = dict(
             service='sqs',
             region_name=region_name,
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
         )
+        settings.update(kwargs)
         if endpoint_url:
             settings.update(
                 endpoint_url=endpoint_url
@@ -86,6 +94,7 @@ class SQSClient(BaseAWSClient):
                     ))
                 )
             self.instance.create_queue(**kwargs)
+        self.forget('queue_url', queue_name)
 
     def get_queue_url(self, queue_name):
         """
@@ -94,19 +103,25 @@ class SQSClient(BaseAWSClient):
         :return: queue url
         :rtype str
         """
-        if queue_name not in self.__urls or not self.__urls[queue_name]:
-            try:
-                self.__urls[queue_name] = self.instance.get_queue_url(
-                    QueueName=queue_name
-                ).get('QueueUrl')
-            except ClientError:
-                self.__urls[queue_name] = None
-            # workaround https://github.com/boto/boto3/issues/630
-            if self.__urls[queue_name]:
-                self.__urls[queue_name] = self.__urls[queue_name].replace(
-                    "queue.amazonaws.com",
-                    "sqs.{}.amazonaws.com".format(
-                        self.settings['region_name']
-                    )
-                )
-        return self.__urls.get(queue_name)
+        try:
+            return self.lookup('queue_url', queue_name,
+                               lambda: self._fetch_queue_url(queue_name))
+        except ClientError:
+            return None
+
+    def _fetch_queue_url(self, queue_name):
+        try:
+            url = self.instance.get_queue_url(
+                QueueName=queue_name
+            ).get('QueueUrl')
+        except ClientError as exc:
+            if error_code(exc) in MISSING_QUEUE_ERROR_CODES:
+                return None
+            raise
+        # workaround https://github.com/boto/boto3/issues/630
+        if url:
+            url = url.replace(
+                "queue.amazonaws.com",
+                "sqs.{}.amazonaws.com".format(self.settings['region_name'])
+            )
+        return url
@@ -2,9 +2,9 @@ from __future__ import unicode_literals
 
 import json
 
-import boto3
 import six
 
+from ..registry import registry
 from ..sqs.client import SQSClient
 
 
@@ -14,10 +14,18 @@ class SQSQueue(object):
                  aws_access_key_id,
                  aws_secret_access_key,
                  auto_creation=False,
-                 endpoint_url=None
+                 endpoint_url=None,
+                 use_resource=True,
+                 **kwargs
                  ):
         """
+        Queue url is resolved (and the queue created if `auto_creation`)
+        on first operation, the constructor does no network calls.
         :param queue_name:
+        :param use_resource: return boto3 Message resources from
+        `receive_messages`, otherwise plain message dicts from client API
+        :type use_resource: bool
+        :param kwargs: additional client settings
         """
         settings = {'region_name': region_name,
                     'aws_access_key_id': aws_access_key_id,
@@ -27,17 +35,66 @@ class SQSQueue(object):
             settings.update(
                 endpoint_url=endpoint_url
             )
+        settings.update(kwargs)
         self.client = SQSClient(**settings)
-        self.queue_url = self.client.get_queue_url(queue_name)
-        if not self.queue_url and auto_creation:
-            self.client.create_queue(queue_name)
-            self.queue_url = self.client.get_queue_url(queue_name)
-        if hasattr(self.client, 'settings'):
-            self.instance = boto3.resource(
-                'sqs', **self.client.settings
-            ).Queue(self.queue_url)
-        else:
-            self.instance = boto3.resource('sqs').Queue(self.queue_url)
+        self.queue_name = queue_name
+        self.auto_creation = auto_creation
+        self.use_resource = use_resource
+        self._queue_url = None
+        self._instance = None
+        self._generation = None
+
+    @property
+    def queue_url(self):
+        """
+        Queue url, resolved on first access
+        :rtype: str
+        """
+        if self._queue_url is None:
+            queue_url = self.client.get_queue_url(self.queue_name)
+            if not queue_url and self.auto_creation:
+                self.client.create_queue(self.queue_name)
+                queue_url = self.client.get_queue_url(self.queue_name)
+            self._queue_url = queue_url
+        return self._queue_url
+
+    @queue_url.setter
+    def queue_url(self, queue_url):
+        self._queue_url = queue_url
+        self._instance = None
+
+    @property
+    def instance(self):
+        """
+        boto3 Queue resource, loaded on first use
+        """
+        generation = registry.generation
+        if self._instance is None or self._generation != generation:
+            self._instance = self.client.resource().Queue(self.queue_url)
+            self._generation = generation
+        return self._instance
+
+    def register_fallback(self, operation_name, fallback):
+        """
+        Register substitute for failing client operation, called as
+        fallback(exc, **kwargs) when the circuit is open or the call
+        failed with a retryable error and returning operation response
+        :param operation_name: client method name ('receive_message' etc.)
+        :type operation_name: str
+        :param fallback: callable
+        """
+        self.client.register_fallback(operation_name, fallback)
+
+    def warmup(self, connections=4):
+        """
+        Resolve queue url and open pooled connections to the queue endpoint
+        :param connections: connections to open
+        :type connections: int
+        """
+        self.client.warm_connections(
+            'get_queue_attributes', connections,
+            QueueUrl=self.queue_url, AttributeNames=['QueueArn']
+        )
 
     def get_queue_url(self):
         """
@@ -50,12 +107,15 @@ class SQSQueue(object):
         """
         Delete all messages from queue
         """
-        self.instance.purge()
+        self.client.instance.purge_queue(QueueUrl=self.queue_url)
 
     def receive_messages(self, count=None, wait_timeout=None):
         """
+        Receive messages through the client pipeline, so deadlines, retries,
+        the circuit breaker and fallbacks of `receive_message` apply
         :param count: must be in range from 1 to 10
-        :return: list of Message Object
+        :return: list of Message Object or message dicts
+        if queue created with `use_resource=False`
         :rtype list
         """
         kwargs = dict(
@@ -65,9 +125,19 @@ class SQSQueue(object):
             kwargs.update(
                 WaitTimeSeconds=wait_timeout
             )
-        return self.instance.receive_messages(
-            **kwargs
-        )
+        messages = self.client.call(
+            'receive_message', QueueUrl=self.queue_url, **kwargs
+        ).get('Messages', [])
+        if self.use_resource:
+            return [self._message(data) for data in messages]
+        return messages
+
+    def _message(self, data):
+        # loaded the way boto3 Queue.receive_messages builds them
+        message = self.client.resource().Message(self.queue_url,
+                                                 data['ReceiptHandle'])
+        message.meta.data = data
+        return message
 
     def send_messages(self, message, delay_timeout=None):
         """
@@ -88,7 +158,9 @@ class SQSQueue(object):
 
         if delay_timeout:
             [entry.update(DelaySeconds=delay_timeout) for entry in entries]
-        self.instance.send_messages(Entries=entries)
+        self.client.instance.send_message_batch(
+            QueueUrl=self.queue_url, Entries=entries
+        )
 
     def delete_messages(self, receipt_handles):
         """
@@ -99,7 +171,8 @@ class SQSQueue(object):
         """
         if not isinstance(receipt_handles, list):
             receipt_handles = [receipt_handles, ]
-        self.instance.delete_messages(
+        self.client.instance.delete_message_batch(
+            QueueUrl=self.queue_url,
             Entries=[
                 dict(
                     ReceiptHandle=handle,
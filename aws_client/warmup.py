@@ -0,0 +1,95 @@
+from __future__ import unicode_literals
+
+import functools
+import logging
+import threading
+import time
+
+from . import deadlines
+
+LOGGER = logging.getLogger(__name__)
+
+
+def warmup(region_name,
+           aws_access_key_id,
+           aws_secret_access_key,
+           queues=(),
+           topics=(),
+           buckets=(),
+           functions=(),
+           connections=4,
+           **kwargs):
+    """
+    Bring a worker to steady-state latency before it takes traffic.
+
+        from aws_client.warmup import warmup
+
+        warmup(region, key_id, secret,
+               queues=['tasks'], topics=['events'], buckets=['media'],
+               functions=['resize'])
+
+    Targets are warmed in parallel: queue urls, topic and function ARNs
+    are resolved into the metadata cache and `connections` pooled
+    connections per endpoint are opened. Failures are logged and reported,
+    they do not stop warming of other targets.
+    :param queues: SQS queue names
+    :type queues: list
+    :param topics: SNS topic names
+    :type topics: list
+    :param buckets: S3 bucket names
+    :type buckets: list
+    :param functions: Lambda function names
+    :type functions: list
+    :param connections: connections to open per endpoint
+    :type connections: int
+    :param kwargs: additional client settings
+    :return: {(kind, name): seconds spent or raised exception}
+    :rtype: dict
+    """
+    from .aws_lambda.lambda_function import LambdaFunction
+    from .s3.s3bucket import S3Bucket
+    from .sns.client import SNSClient
+    from .sqs.queue import SQSQueue
+
+    credentials = (region_name, aws_access_key_id, aws_secret_access_key)
+    targets = []
+    for name in queues:
+        targets.append(('queue', name, SQSQueue(
+            name, *credentials, use_resource=False, **kwargs
+        ).warmup))
+    for name in buckets:
+        targets.append(('bucket', name, S3Bucket(
+            name, *credentials, **kwargs
+        ).warmup))
+    for name in functions:
+        targets.append(('function', name, LambdaFunction(
+            name, *credentials, **kwargs
+        ).warmup))
+    if topics:
+        client = SNSClient(*credentials, **kwargs)
+        for name in topics:
+            targets.append(('topic', name, functools.partial(
+                client.warmup, [name]
+            )))
+
+    results = {}
+    lock = threading.Lock()
+
+    def warm(kind, name, func):
+        start = time.time()
+        try:
+            func(connections=connections)
+            result = time.time() - start
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.warning('Warmup of %s %s failed: %s', kind, name, exc)
+            result = exc
+        with lock:
+            results[(kind, name)] = result
+
+    threads = [threading.Thread(target=deadlines.wrap(warm), args=target)
+               for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Import-time benchmark for aws_client modules.
+
+Every module is imported in a fresh interpreter with ``python -X importtime``
+and the cumulative import time is reported in microseconds as JSON:
+
+    python benchmarks/import_time.py --repeat 5 --output import_time.json
+
+Pass ``--baseline`` with a previous result to fail when a module became
+slower than ``--tolerance`` allows.
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULES = (
+    'aws_client',
+    'aws_client.aws_client',
+    'aws_client.s3.s3bucket',
+    'aws_client.sqs.queue',
+    'aws_client.sns.client',
+    'aws_client.aws_lambda.lambda_function',
+    'aws_client.aws_lambda.deployment',
+    'aws_client.api_gateway.deployment',
+    'aws_client.eb.deployment',
+    'aws_client.elastictranscoder.client',
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module):
+    """
+    Import module in a fresh interpreter
+    :param module: dotted module name
+    :type module: str
+    :return: cumulative import time in microseconds and heaviest imports
+    :rtype: tuple
+    """
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    _, stderr = process.communicate()
+    if process.returncode:
+        raise RuntimeError(stderr.decode('utf-8'))
+    timings = {}
+    for line in stderr.decode('utf-8').splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        try:
+            timings[name.strip()] = int(cumulative)
+        except ValueError:
+            continue
+    heaviest = sorted(
+        ((name, value) for name, value in timings.items()
+         if not name.startswith('aws_client')),
+        key=lambda item: item[1], reverse=True
+    )[:5]
+    return timings.get(module, 0), heaviest
+
+
+def run(modules, repeat):
+    results = {}
+    for module in modules:
+        samples = []
+        heaviest = []
+        for _ in range(repeat):
+            total, heaviest = measure(module)
+            samples.append(total)
+        results[module] = dict(
+            best_us=min(samples),
+            median_us=sorted(samples)[len(samples) // 2],
+            heaviest_dependencies=dict(heaviest),
+        )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = {}
+    for module, result in results.items():
+        previous = baseline.get(module)
+        if not previous:
+            continue
+        limit = previous['best_us'] * (1 + tolerance)
+        if result['best_us'] > limit:
+            regressions[module] = dict(
+                baseline_us=previous['best_us'],
+                current_us=result['best_us'],
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('modules', nargs='*', default=list(MODULES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write JSON results to file')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown ratio against baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.repeat)
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(payload)
+    print(payload)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(
+                results, json.load(baseline_file), args.tolerance
+            )
+        if regressions:
+            print(json.dumps(dict(regressions=regressions), indent=2),
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import sys
 from collections import namedtuple
 
 from setuptools import find_packages, setup
@@ -27,9 +28,14 @@ reqs = parse_requirements('requirements.txt')
 packages = find_packages(
     exclude=[
         '*.tests', '*.tests.*', 'tests.*', 'tests',
-        '*.test', '*.test.*', 'test.*', 'test', 'examples'
+        '*.test', '*.test.*', 'test.*', 'test', 'examples',
+        'benchmarks', 'benchmarks.*'
     ]
 )
+if sys.version_info < (3, 7):
+    # asyncio facade uses async generators and asyncio.run
+    packages = [package for package in packages
+                if not package.startswith('aws_client.aio')]
 
 setup(
     name='aws_client',
@@ -49,5 +55,6 @@ setup(
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
         'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
     ],
 )
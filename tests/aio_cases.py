@@ -0,0 +1,119 @@
+from __future__ import unicode_literals
+
+import asyncio
+import threading
+
+from mock import patch
+
+from aws_client.aio import S3Bucket, SQSQueue, executor
+from aws_client.s3.listing import ObjectSummary
+from tests.base_test import BaseTest
+
+QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/1234567890/test-queue'
+
+
+def object_item(key):
+    return {'Key': key, 'Size': 10, 'LastModified': None, 'ETag': '"etag"'}
+
+
+def make_api_call(client, operation_name, kwargs):
+    if operation_name == 'ListObjectsV2':
+        if 'ContinuationToken' not in kwargs:
+            return {'Contents': [object_item('a'), object_item('b')],
+                    'IsTruncated': True, 'NextContinuationToken': 'next'}
+        return {'Contents': [object_item('c')], 'IsTruncated': False}
+    if operation_name == 'GetQueueUrl':
+        return {'QueueUrl': QUEUE_URL}
+    if operation_name == 'ReceiveMessage':
+        return {'Messages': [{'MessageId': '1', 'ReceiptHandle': 'h',
+                              'Body': '{}'}]}
+    if operation_name == 'HeadObject':
+        return {'ContentLength': 10}
+    return {}
+
+
+@patch('botocore.client.BaseClient._make_api_call', new=make_api_call)
+class AsyncWrappersTest(BaseTest):
+    def test_bucket(self):
+        bucket = S3Bucket('test-bucket', self.region_name,
+                          self.aws_access_key_id,
+                          self.aws_secret_access_key,
+                          timeout=5)
+
+        async def scenario():
+            objects = [obj async for obj in bucket.iter_objects()]
+            self.assertEqual(objects[0], ObjectSummary('a', 10, None, 'etag'))
+            keys = [obj.key for obj in objects]
+            sizes = await asyncio.gather(
+                *[bucket.get_file_size(key) for key in keys]
+            )
+            return keys, sizes
+
+        keys, sizes = asyncio.run(scenario())
+        self.assertEqual(keys, ['a', 'b', 'c'])
+        self.assertEqual(sizes, [10, 10, 10])
+
+    def test_queue_messages(self):
+        queue = SQSQueue('test-queue', self.region_name,
+                         self.aws_access_key_id,
+                         self.aws_secret_access_key)
+
+        async def scenario():
+            received = []
+            async for message in queue.messages(wait_timeout=1):
+                received.append(message)
+                if len(received) == 3:
+                    break
+            await queue.delete_messages(
+                [message['ReceiptHandle'] for message in received]
+            )
+            return received
+
+        self.assertEqual(len(asyncio.run(scenario())), 3)
+
+
+class LongPollingTest(BaseTest):
+    def setUp(self):
+        executor.shutdown()
+        executor.configure(max_workers=2)
+        self.released = threading.Event()
+        self.polling = threading.Semaphore(0)
+
+    def tearDown(self):
+        self.released.set()
+        executor.shutdown()
+        executor.configure(max_workers=executor.DEFAULT_MAX_WORKERS)
+
+    def make_api_call(self, operation_name, kwargs):
+        if operation_name == 'ReceiveMessage':
+            self.polling.release()
+            self.released.wait(10)
+            return {}
+        return make_api_call(None, operation_name, kwargs)
+
+    def test_send_while_pollers_wait(self):
+        test = self
+
+        def api_call(client, operation_name, kwargs):
+            return test.make_api_call(operation_name, kwargs)
+
+        queue = SQSQueue('test-queue', self.region_name,
+                         self.aws_access_key_id,
+                         self.aws_secret_access_key)
+
+        async def scenario():
+            pollers = [asyncio.ensure_future(
+                queue.receive_messages(10, wait_timeout=20))
+                for _ in range(4)]
+            # both workers of the request pool could be taken by now
+            for _ in range(2):
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.polling.acquire
+                )
+            await asyncio.wait_for(queue.send_messages({'test': 1}), 5)
+            self.released.set()
+            return await asyncio.gather(*pollers)
+
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=api_call):
+            self.assertEqual(asyncio.run(scenario()), [[]] * 4)
@@ -0,0 +1,995 @@
+"""
+In-process stand-in for S3, SQS, SNS and Lambda.
+
+Speaks enough of the wire protocols (S3 REST-XML, SQS JSON and query,
+SNS query, Lambda REST-JSON) for the wrappers to run unchanged against
+`endpoint_url`:
+
+    with LocalAWS() as aws:
+        aws.create_bucket('test-bucket')
+        bucket = S3Bucket('test-bucket', 'us-east-1', 'key', 'secret',
+                          endpoint_url=aws.endpoint_url)
+
+The service of a request is taken from its SigV4 credential scope, so one
+server answers for all services. State is kept in memory and guarded by a
+single lock, responses are written with one send to keep latency low
+enough for throughput benchmarks.
+"""
+from __future__ import unicode_literals
+
+import binascii
+import hashlib
+import json
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ElementTree
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+# noinspection PyUnresolvedReferences
+from six.moves import BaseHTTPServer, socketserver
+# noinspection PyUnresolvedReferences
+from six.moves.urllib import parse
+
+S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+SNS_NAMESPACE = 'http://sns.amazonaws.com/doc/2010-03-31/'
+SQS_NAMESPACE = 'http://queue.amazonaws.com/doc/2012-11-05/'
+
+
+def isoformat(timestamp):
+    return time.strftime(
+        '%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(timestamp)
+    )
+
+
+def md5_hex(data):
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    return hashlib.md5(data).hexdigest()
+
+
+def xml_tags(**values):
+    return ''.join(
+        '<{0}>{1}</{0}>'.format(name, escape('{}'.format(value)))
+        for name, value in values.items() if value is not None
+    )
+
+
+class Request(object):
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    @property
+    def service(self):
+        authorization = self.headers.get('Authorization', '')
+        credential = self.query.get('X-Amz-Credential', '')
+        if 'Credential=' in authorization:
+            credential = authorization.split('Credential=')[1].split(',')[0]
+        scope = credential.split('/')
+        return scope[3] if len(scope) > 3 else 's3'
+
+
+class Response(object):
+    def __init__(self, status=200, body=b'', headers=None,
+                 content_type='text/xml'):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.headers.setdefault('Content-Type', content_type)
+
+
+class ServiceError(Exception):
+    def __init__(self, code, message='', status=400):
+        super(ServiceError, self).__init__(message or code)
+        self.code = code
+        self.message = message or code
+        self.status = status
+
+
+class S3Object(object):
+    def __init__(self, body, content_type=None, etag=None):
+        self.body = body
+        self.content_type = content_type or 'binary/octet-stream'
+        self.etag = etag or '"{}"'.format(md5_hex(body))
+        self.last_modified = time.time()
+
+
+class S3Service(object):
+    """
+    Buckets, objects and multipart uploads
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.buckets = {}
+        self.uploads = {}
+
+    def handle(self, request):
+        try:
+            return self.dispatch(request)
+        except ServiceError as exc:
+            body = '' if request.method == 'HEAD' else (
+                '<?xml version="1.0" encoding="UTF-8"?><Error>{}</Error>'
+                .format(xml_tags(Code=exc.code, Message=exc.message))
+            )
+            return Response(exc.status, body)
+
+    def dispatch(self, request):
+        path = parse.unquote(request.path).lstrip('/')
+        bucket_name, _, key = path.partition('/')
+        query = request.query
+        method = request.method
+        if not key:
+            if method == 'PUT':
+                self.buckets.setdefault(bucket_name, {})
+                return Response(200)
+            bucket = self.bucket(bucket_name)
+            if method == 'HEAD':
+                return Response(200)
+            if method == 'GET':
+                return self.list_objects(bucket_name, bucket, query)
+            if method == 'POST' and 'delete' in query:
+                return self.delete_objects(bucket, request.body)
+            if method == 'DELETE':
+                del self.buckets[bucket_name]
+                return Response(204)
+            raise ServiceError('NotImplemented', status=501)
+
+        bucket = self.bucket(bucket_name)
+        if method == 'POST' and 'uploads' in query:
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = dict(
+                bucket=bucket_name, key=key, parts={},
+                content_type=request.headers.get('Content-Type'),
+            )
+            return Response(200, '<InitiateMultipartUploadResult>{}'
+                                 '</InitiateMultipartUploadResult>'.format(
+                xml_tags(Bucket=bucket_name, Key=key, UploadId=upload_id)
+            ))
+        if method == 'POST' and 'uploadId' in query:
+            return self.complete_upload(bucket, key, query['uploadId'],
+                                        request.body)
+        if method == 'DELETE' and 'uploadId' in query:
+            self.uploads.pop(query['uploadId'], None)
+            return Response(204)
+        if method == 'PUT' and 'partNumber' in query:
+            return self.upload_part(request, query)
+        if method == 'PUT' and 'acl' in query:
+            self.get(bucket, key)
+            return Response(200)
+        if method == 'PUT':
+            if 'x-amz-copy-source' in request.headers:
+                source = self.copy_source(request)
+                with self.backend.lock:
+                    bucket[key] = S3Object(source.body, source.content_type)
+                    obj = bucket[key]
+                return Response(200, '<CopyObjectResult>{}'
+                                     '</CopyObjectResult>'.format(
+                    xml_tags(ETag=obj.etag,
+                             LastModified=isoformat(obj.last_modified))
+                ))
+            with self.backend.lock:
+                bucket[key] = obj = S3Object(
+                    request.body, request.headers.get('Content-Type')
+                )
+            return Response(200, headers={'ETag': obj.etag})
+        if method in ('GET', 'HEAD'):
+            return self.get_object(request, self.get(bucket, key))
+        if method == 'DELETE':
+            with self.backend.lock:
+                bucket.pop(key, None)
+            return Response(204)
+        raise ServiceError('NotImplemented', status=501)
+
+    def bucket(self, name):
+        try:
+            return self.buckets[name]
+        except KeyError:
+            raise ServiceError('NoSuchBucket', status=404)
+
+    @staticmethod
+    def get(bucket, key):
+        try:
+            return bucket[key]
+        except KeyError:
+            raise ServiceError('NoSuchKey', 'The specified key does not '
+                                            'exist.', status=404)
+
+    @staticmethod
+    def parse_range(header, size):
+        start, _, end = header.split('=', 1)[1].partition('-')
+        if not start:
+            start, end = max(0, size - int(end)), size - 1
+        else:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            raise ServiceError('InvalidRange', status=416)
+        return start, end
+
+    def get_object(self, request, obj):
+        headers = {
+            'ETag': obj.etag,
+            'Last-Modified': formatdate(obj.last_modified, usegmt=True),
+            'Accept-Ranges': 'bytes',
+        }
+        body = obj.body
+        status = 200
+        if 'Range' in request.headers:
+            start, end = self.parse_range(request.headers['Range'],
+                                          len(obj.body))
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+                start, end, len(obj.body)
+            )
+            body = obj.body[start:end + 1]
+            status = 206
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(body))
+            body = b''
+        return Response(status, body, headers, content_type=obj.content_type)
+
+    def list_objects(self, bucket_name, bucket, query):
+        prefix = query.get('prefix', '')
+        delimiter = query.get('delimiter')
+        max_keys = int(query.get('max-keys', 1000))
+        start_after = query.get('continuation-token') or query.get(
+            'start-after', ''
+        )
+        with self.backend.lock:
+            keys = sorted(key for key in bucket
+                          if key.startswith(prefix) and key > start_after)
+            contents = []
+            prefixes = []
+            truncated = False
+            last = None
+            for key in keys:
+                if delimiter:
+                    idx = key.find(delimiter, len(prefix))
+                    if idx >= 0:
+                        common = key[:idx + len(delimiter)]
+                        if prefixes and prefixes[-1] == common:
+                            continue
+                        if len(contents) + len(prefixes) >= max_keys:
+                            truncated = True
+                            break
+                        prefixes.append(common)
+                        last = key
+                        continue
+                if len(contents) + len(prefixes) >= max_keys:
+                    truncated = True
+                    break
+                contents.append((key, bucket[key]))
+                last = key
+            if truncated and prefixes and last.startswith(prefixes[-1]):
+                # continue after the whole common prefix
+                last = prefixes[-1] + '￿'
+        parts = [xml_tags(Name=bucket_name, Prefix=prefix,
+                          Delimiter=delimiter, MaxKeys=max_keys,
+                          KeyCount=len(contents) + len(prefixes),
+                          IsTruncated='true' if truncated else 'false',
+                          ContinuationToken=query.get('continuation-token'),
+                          NextContinuationToken=last if truncated else None,
+                          StartAfter=query.get('start-after'))]
+        for key, obj in contents:
+            parts.append('<Contents>{}</Contents>'.format(xml_tags(
+                Key=key, LastModified=isoformat(obj.last_modified),
+                ETag=obj.etag, Size=len(obj.body), StorageClass='STANDARD'
+            )))
+        for common in prefixes:
+            parts.append('<CommonPrefixes>{}</CommonPrefixes>'.format(
+                xml_tags(Prefix=common)
+            ))
+        return Response(200, '<ListBucketResult xmlns="{}">{}'
+                             '</ListBucketResult>'.format(S3_NAMESPACE,
+                                                          ''.join(parts)))
+
+    def delete_objects(self, bucket, body):
+        root = ElementTree.fromstring(body)
+        keys = [element.text for element in root.iter()
+                if element.tag.endswith('Key')]
+        quiet = any(element.text == 'true' for element in root.iter()
+                    if element.tag.endswith('Quiet'))
+        with self.backend.lock:
+            for key in keys:
+                bucket.pop(key, None)
+        deleted = '' if quiet else ''.join(
+            '<Deleted>{}</Deleted>'.format(xml_tags(Key=key)) for key in keys
+        )
+        return Response(200, '<DeleteResult xmlns="{}">{}</DeleteResult>'
+                        .format(S3_NAMESPACE, deleted))
+
+    def copy_source(self, request):
+        source = parse.unquote(
+            request.headers['x-amz-copy-source']
+        ).lstrip('/')
+        source = source.split('?versionId=')[0]
+        bucket_name, _, key = source.partition('/')
+        return self.get(self.bucket(bucket_name), key)
+
+    def upload_part(self, request, query):
+        upload = self.uploads.get(query['uploadId'])
+        if upload is None:
+            raise ServiceError('NoSuchUpload', status=404)
+        if 'x-amz-copy-source' in request.headers:
+            body = self.copy_source(request).body
+            if 'x-amz-copy-source-range' in request.headers:
+                start, end = self.parse_range(
+                    request.headers['x-amz-copy-source-range'], len(body)
+                )
+                body = body[start:end + 1]
+            etag = '"{}"'.format(md5_hex(body))
+            upload['parts'][int(query['partNumber'])] = (body, etag)
+            return Response(200, '<CopyPartResult>{}</CopyPartResult>'.format(
+                xml_tags(ETag=etag, LastModified=isoformat(time.time()))
+            ))
+        etag = '"{}"'.format(md5_hex(request.body))
+        upload['parts'][int(query['partNumber'])] = (request.body, etag)
+        return Response(200, headers={'ETag': etag})
+
+    def complete_upload(self, bucket, key, upload_id, body):
+        upload = self.uploads.pop(upload_id, None)
+        if upload is None:
+            raise ServiceError('NoSuchUpload', status=404)
+        root = ElementTree.fromstring(body)
+        numbers = [int(element.text) for element in root.iter()
+                   if element.tag.endswith('PartNumber')]
+        try:
+            parts = [upload['parts'][number] for number in numbers]
+        except KeyError:
+            raise ServiceError('InvalidPart')
+        digest = hashlib.md5(b''.join(
+            binascii.unhexlify(etag.strip('"')) for _, etag in parts
+        )).hexdigest()
+        etag = '"{}-{}"'.format(digest, len(parts))
+        with self.backend.lock:
+            bucket[key] = S3Object(b''.join(data for data, _ in parts),
+                                   upload['content_type'], etag)
+        return Response(200, '<CompleteMultipartUploadResult>{}'
+                             '</CompleteMultipartUploadResult>'.format(
+            xml_tags(Bucket=upload['bucket'], Key=key, ETag=etag)
+        ))
+
+
+class SQSQueueState(object):
+    def __init__(self, name, url, arn, attributes):
+        self.name = name
+        self.url = url
+        self.arn = arn
+        self.attributes = dict(VisibilityTimeout='30', DelaySeconds='0')
+        self.attributes.update(attributes or {})
+        self.messages = []
+        self.receipts = {}
+
+
+class SQSService(object):
+    """
+    Queues with delays, visibility timeouts and long polling
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.queues = {}
+        self.condition = threading.Condition(backend.lock)
+        self.calls = []
+
+    def handle(self, request):
+        target = request.headers.get('X-Amz-Target')
+        if target:
+            action = target.split('.')[-1]
+            params = json.loads(request.body.decode('utf-8') or '{}')
+        else:
+            params = dict(parse.parse_qsl(request.body.decode('utf-8')))
+            action = params.pop('Action', '')
+            params = self.from_query(params)
+        self.calls.append(action)
+        try:
+            result = getattr(self, action.lower())(params)
+        except ServiceError as exc:
+            return self.error(exc, bool(target))
+        except AttributeError:
+            return self.error(ServiceError('InvalidAction'), bool(target))
+        if target:
+            return Response(200, json.dumps(result),
+                            content_type='application/x-amz-json-1.0')
+        return Response(200, self.to_query_xml(action, result))
+
+    # wire formats
+
+    @staticmethod
+    def from_query(params):
+        result = {}
+        for name, value in params.items():
+            parts = name.split('.')
+            if parts[0].endswith('Entry'):
+                entries = result.setdefault('Entries', {})
+                entries.setdefault(int(parts[1]), {})[parts[2]] = value
+            elif parts[0] in ('AttributeName', 'MessageAttributeName',
+                              'MessageSystemAttributeName'):
+                result.setdefault(parts[0] + 's', []).append(value)
+            elif parts[0] == 'Attribute' and len(parts) == 3:
+                result.setdefault('_attributes', {}).setdefault(
+                    parts[1], {}
+                )[parts[2]] = value
+            else:
+                result[name] = value
+        if 'Entries' in result:
+            result['Entries'] = [result['Entries'][idx]
+                                 for idx in sorted(result['Entries'])]
+        if '_attributes' in result:
+            result['Attributes'] = dict(
+                (item['Name'], item['Value'])
+                for item in result.pop('_attributes').values()
+            )
+        return result
+
+    @staticmethod
+    def to_query_xml(action, result):
+        def attributes(values):
+            return ''.join(
+                '<Attribute>{}</Attribute>'.format(
+                    xml_tags(Name=name, Value=value)
+                ) for name, value in values.items()
+            )
+
+        body = []
+        for name, value in result.items():
+            if name == 'Attributes':
+                body.append(attributes(value))
+            elif name == 'QueueUrls':
+                body.extend(xml_tags(QueueUrl=url) for url in value)
+            elif name == 'Messages':
+                for message in value:
+                    body.append('<Message>{}{}</Message>'.format(
+                        xml_tags(**dict((key, val) for key, val
+                                        in message.items()
+                                        if key != 'Attributes')),
+                        attributes(message.get('Attributes', {}))
+                    ))
+            elif name in ('Successful', 'Failed'):
+                tag = '{}{}ResultEntry'.format(
+                    action, '' if name == 'Successful' else 'Error'
+                ) if name == 'Successful' else 'BatchResultErrorEntry'
+                body.extend('<{0}>{1}</{0}>'.format(tag, xml_tags(**entry))
+                            for entry in value)
+            else:
+                body.append(xml_tags(**{name: value}))
+        return ('<{0}Response xmlns="{1}"><{0}Result>{2}</{0}Result>'
+                '<ResponseMetadata><RequestId>{3}</RequestId>'
+                '</ResponseMetadata></{0}Response>').format(
+            action, SQS_NAMESPACE, ''.join(body), uuid.uuid4())
+
+    @staticmethod
+    def error(exc, json_protocol):
+        if json_protocol:
+            return Response(
+                exc.status,
+                json.dumps({'__type': 'com.amazonaws.sqs#' + exc.code,
+                            'message': exc.message}),
+                headers={'x-amzn-query-error': '{};Sender'.format(exc.code)},
+                content_type='application/x-amz-json-1.0'
+            )
+        return Response(exc.status, (
+            '<ErrorResponse xmlns="{}"><Error><Type>Sender</Type>{}</Error>'
+            '<RequestId>{}</RequestId></ErrorResponse>'
+        ).format(SQS_NAMESPACE,
+                 xml_tags(Code=exc.code, Message=exc.message),
+                 uuid.uuid4()))
+
+    # operations
+
+    def queue(self, params):
+        name = params.get('QueueUrl', '').rstrip('/').split('/')[-1]
+        try:
+            return self.queues[name]
+        except KeyError:
+            raise ServiceError('AWS.SimpleQueueService.NonExistentQueue',
+                               'The specified queue does not exist.')
+
+    def create_queue(self, name, attributes=None):
+        with self.backend.lock:
+            if name not in self.queues:
+                self.queues[name] = SQSQueueState(
+                    name,
+                    '{}/{}/{}'.format(self.backend.endpoint_url,
+                                      self.backend.account_id, name),
+                    'arn:aws:sqs:{}:{}:{}'.format(self.backend.region_name,
+                                                  self.backend.account_id,
+                                                  name),
+                    attributes,
+                )
+            return self.queues[name]
+
+    def createqueue(self, params):
+        return dict(QueueUrl=self.create_queue(
+            params['QueueName'], params.get('Attributes')
+        ).url)
+
+    def getqueueurl(self, params):
+        with self.backend.lock:
+            if params['QueueName'] not in self.queues:
+                raise ServiceError('AWS.SimpleQueueService.NonExistentQueue',
+                                   'The specified queue does not exist.')
+            return dict(QueueUrl=self.queues[params['QueueName']].url)
+
+    def listqueues(self, params):
+        prefix = params.get('QueueNamePrefix', '')
+        with self.backend.lock:
+            return dict(QueueUrls=[queue.url for name, queue
+                                   in sorted(self.queues.items())
+                                   if name.startswith(prefix)])
+
+    def deletequeue(self, params):
+        with self.backend.lock:
+            self.queues.pop(self.queue(params).name, None)
+        return {}
+
+    def purgequeue(self, params):
+        with self.backend.lock:
+            queue = self.queue(params)
+            queue.messages = []
+            queue.receipts = {}
+        return {}
+
+    def getqueueattributes(self, params):
+        now = time.time()
+        with self.backend.lock:
+            queue = self.queue(params)
+            visible = sum(1 for message in queue.messages
+                          if message['visible_at'] <= now)
+            attributes = dict(queue.attributes)
+            attributes.update(
+                QueueArn=queue.arn,
+                ApproximateNumberOfMessages=str(visible),
+                ApproximateNumberOfMessagesNotVisible=str(
+                    len(queue.messages) - visible
+                ),
+            )
+        names = params.get('AttributeNames') or ['All']
+        if 'All' not in names:
+            attributes = dict((name, value)
+                              for name, value in attributes.items()
+                              if name in names)
+        return dict(Attributes=attributes)
+
+    def enqueue(self, queue, body, delay=None):
+        if delay is None:
+            delay = queue.attributes.get('DelaySeconds', 0)
+        message_id = str(uuid.uuid4())
+        queue.messages.append(dict(
+            id=message_id, body=body, md5=md5_hex(body),
+            visible_at=time.time() + float(delay), receive_count=0,
+            sent=int(time.time() * 1000),
+        ))
+        self.condition.notify_all()
+        return message_id
+
+    def sendmessage(self, params):
+        with self.backend.lock:
+            message_id = self.enqueue(self.queue(params),
+                                      params['MessageBody'],
+                                      params.get('DelaySeconds'))
+        return dict(MessageId=message_id,
+                    MD5OfMessageBody=md5_hex(params['MessageBody']))
+
+    def sendmessagebatch(self, params):
+        successful = []
+        with self.backend.lock:
+            queue = self.queue(params)
+            for entry in params['Entries']:
+                successful.append(dict(
+                    Id=entry['Id'],
+                    MessageId=self.enqueue(queue, entry['MessageBody'],
+                                           entry.get('DelaySeconds')),
+                    MD5OfMessageBody=md5_hex(entry['MessageBody']),
+                ))
+        return dict(Successful=successful, Failed=[])
+
+    def receivemessage(self, params):
+        count = int(params.get('MaxNumberOfMessages', 1))
+        wait = min(float(params.get('WaitTimeSeconds', 0)),
+                   self.backend.max_wait_time)
+        deadline = time.time() + wait
+        with self.backend.lock:
+            queue = self.queue(params)
+            timeout = float(params.get(
+                'VisibilityTimeout', queue.attributes['VisibilityTimeout']
+            ))
+            while True:
+                now = time.time()
+                messages = [message for message in queue.messages
+                            if message['visible_at'] <= now][:count]
+                if messages or now >= deadline:
+                    break
+                pending = [message['visible_at'] for message in queue.messages
+                           if message['visible_at'] > now]
+                self.condition.wait(min([deadline] + pending) - now)
+            result = []
+            for message in messages:
+                handle = uuid.uuid4().hex
+                queue.receipts[handle] = message['id']
+                message['visible_at'] = now + timeout
+                message['receive_count'] += 1
+                result.append(dict(
+                    MessageId=message['id'], ReceiptHandle=handle,
+                    MD5OfBody=message['md5'], Body=message['body'],
+                    Attributes=dict(
+                        SentTimestamp=str(message['sent']),
+                        ApproximateReceiveCount=str(
+                            message['receive_count']
+                        ),
+                    ),
+                ))
+        return dict(Messages=result) if result else {}
+
+    def remove(self, queue, handle):
+        message_id = queue.receipts.pop(handle, None)
+        queue.messages = [message for message in queue.messages
+                          if message['id'] != message_id]
+
+    def deletemessage(self, params):
+        with self.backend.lock:
+            self.remove(self.queue(params), params['ReceiptHandle'])
+        return {}
+
+    def deletemessagebatch(self, params):
+        with self.backend.lock:
+            queue = self.queue(params)
+            for entry in params['Entries']:
+                self.remove(queue, entry['ReceiptHandle'])
+        return dict(Successful=[dict(Id=entry['Id'])
+                                for entry in params['Entries']], Failed=[])
+
+    def changemessagevisibility(self, params):
+        with self.backend.lock:
+            queue = self.queue(params)
+            message_id = queue.receipts.get(params['ReceiptHandle'])
+            for message in queue.messages:
+                if message['id'] == message_id:
+                    message['visible_at'] = (
+                        time.time() + float(params['VisibilityTimeout'])
+                    )
+            self.condition.notify_all()
+        return {}
+
+
+class SNSService(object):
+    """
+    Topics delivering to SQS and Lambda subscriptions
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.topics = {}
+        self.calls = []
+
+    def handle(self, request):
+        params = dict(parse.parse_qsl(request.body.decode('utf-8')))
+        action = params.pop('Action', '')
+        self.calls.append(action)
+        try:
+            result = getattr(self, action.lower())(params)
+        except (ServiceError, AttributeError) as exc:
+            code = getattr(exc, 'code', 'InvalidAction')
+            return Response(getattr(exc, 'status', 400), (
+                '<ErrorResponse xmlns="{}"><Error><Type>Sender</Type>{}'
+                '</Error></ErrorResponse>'
+            ).format(SNS_NAMESPACE, xml_tags(Code=code, Message=code)))
+        return Response(200, (
+            '<{0}Response xmlns="{1}"><{0}Result>{2}</{0}Result>'
+            '<ResponseMetadata><RequestId>{3}</RequestId></ResponseMetadata>'
+            '</{0}Response>'
+        ).format(action, SNS_NAMESPACE, result, uuid.uuid4()))
+
+    def topic(self, arn):
+        try:
+            return self.topics[arn]
+        except KeyError:
+            raise ServiceError('NotFound', status=404)
+
+    def createtopic(self, params):
+        arn = 'arn:aws:sns:{}:{}:{}'.format(
+            self.backend.region_name, self.backend.account_id,
+            params['Name']
+        )
+        with self.backend.lock:
+            self.topics.setdefault(arn, [])
+        return xml_tags(TopicArn=arn)
+
+    def listtopics(self, params):
+        with self.backend.lock:
+            arns = sorted(self.topics)
+        return '<Topics>{}</Topics>'.format(''.join(
+            '<member>{}</member>'.format(xml_tags(TopicArn=arn))
+            for arn in arns
+        ))
+
+    def gettopicattributes(self, params):
+        with self.backend.lock:
+            subscriptions = self.topic(params['TopicArn'])
+            attributes = dict(
+                TopicArn=params['TopicArn'],
+                SubscriptionsConfirmed=len(subscriptions),
+            )
+        return '<Attributes>{}</Attributes>'.format(''.join(
+            '<entry>{}</entry>'.format(xml_tags(key=name, value=value))
+            for name, value in sorted(attributes.items())
+        ))
+
+    def deletetopic(self, params):
+        with self.backend.lock:
+            self.topics.pop(params['TopicArn'], None)
+        return ''
+
+    def subscribe(self, params):
+        arn = '{}:{}'.format(params['TopicArn'], uuid.uuid4())
+        with self.backend.lock:
+            self.topic(params['TopicArn']).append(
+                (params['Protocol'], params['Endpoint'])
+            )
+        return xml_tags(SubscriptionArn=arn)
+
+    def publish(self, params):
+        message_id = str(uuid.uuid4())
+        with self.backend.lock:
+            subscriptions = list(self.topic(params['TopicArn']))
+        for protocol, endpoint in subscriptions:
+            message = params['Message']
+            if params.get('MessageStructure') == 'json':
+                structure = json.loads(message)
+                message = structure.get(protocol, structure.get('default'))
+            notification = dict(
+                Type='Notification', MessageId=message_id,
+                TopicArn=params['TopicArn'], Message=message,
+                Timestamp=isoformat(time.time()),
+            )
+            if protocol == 'sqs':
+                name = endpoint.split(':')[-1]
+                with self.backend.lock:
+                    queue = self.backend.sqs.queues.get(name)
+                    if queue:
+                        self.backend.sqs.enqueue(queue,
+                                                 json.dumps(notification))
+            elif protocol == 'lambda':
+                self.backend.aws_lambda.invoke_handler(
+                    endpoint.split(':')[6],
+                    {'Records': [{'EventSource': 'aws:sns',
+                                  'Sns': notification}]}
+                )
+        return xml_tags(MessageId=message_id)
+
+
+class LambdaService(object):
+    """
+    Functions backed by python callables
+    """
+    prefix = '/2015-03-31/functions'
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.functions = {}
+        self.invocations = []
+
+    def function_arn(self, name):
+        return 'arn:aws:lambda:{}:{}:function:{}'.format(
+            self.backend.region_name, self.backend.account_id, name
+        )
+
+    def handler(self, name):
+        name = name.split(':function:')[-1].split(':')[0]
+        try:
+            return name, self.functions[name]
+        except KeyError:
+            raise ServiceError(
+                'ResourceNotFoundException',
+                'Function not found: {}'.format(self.function_arn(name)),
+                status=404
+            )
+
+    def invoke_handler(self, name, event):
+        name, handler = self.handler(name)
+        with self.backend.lock:
+            self.invocations.append((name, event))
+        return handler(event, None)
+
+    def handle(self, request):
+        path = parse.unquote(request.path)
+        if not path.startswith(self.prefix):
+            return self.error(ServiceError('UnknownOperationException',
+                                           status=404))
+        name = path[len(self.prefix):].strip('/').split('/')[0]
+        try:
+            if request.method == 'POST' and path.endswith('/invocations'):
+                return self.invoke(request, name)
+            if request.method == 'GET' and name:
+                name, _ = self.handler(name)
+                configuration = dict(FunctionName=name,
+                                     FunctionArn=self.function_arn(name),
+                                     Runtime='python3.9',
+                                     Version='$LATEST')
+                return Response(200, json.dumps(dict(
+                    Configuration=configuration, Code={}
+                )), content_type='application/json')
+        except ServiceError as exc:
+            return self.error(exc)
+        return self.error(ServiceError('UnknownOperationException',
+                                       status=404))
+
+    def invoke(self, request, name):
+        event = json.loads(request.body.decode('utf-8') or 'null')
+        invocation_type = request.headers.get('X-Amz-Invocation-Type',
+                                              'RequestResponse')
+        try:
+            result = self.invoke_handler(name, event)
+        except ServiceError:
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            return Response(200, json.dumps(dict(
+                errorMessage=str(exc), errorType=exc.__class__.__name__
+            )), headers={'X-Amz-Function-Error': 'Unhandled'},
+                content_type='application/json')
+        if invocation_type == 'Event':
+            return Response(202, content_type='application/json')
+        return Response(200, json.dumps(result),
+                        headers={'X-Amz-Executed-Version': '$LATEST'},
+                        content_type='application/json')
+
+    @staticmethod
+    def error(exc):
+        return Response(exc.status,
+                        json.dumps(dict(Type='User', Message=exc.message)),
+                        headers={'x-amzn-ErrorType': exc.code},
+                        content_type='application/json')
+
+
+class LocalAWSHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def handle_request(self):
+        url = parse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        request = Request(
+            self.command, url.path,
+            dict(parse.parse_qsl(url.query, keep_blank_values=True)),
+            self.headers, body
+        )
+        try:
+            response = self.server.backend.handle(request)
+        except Exception as exc:  # pylint: disable=broad-except
+            response = Response(500, '{}: {}'.format(
+                exc.__class__.__name__, exc
+            ), content_type='text/plain')
+        head = ['HTTP/1.1 {} {}'.format(response.status,
+                                        self.responses.get(
+                                            response.status, ('',))[0]),
+                'x-amz-request-id: {}'.format(uuid.uuid4().hex)]
+        headers = dict(response.headers)
+        headers.setdefault('Content-Length', str(len(response.body)))
+        head.extend('{}: {}'.format(name, value)
+                    for name, value in headers.items())
+        self.wfile.write(
+            ('\r\n'.join(head) + '\r\n\r\n').encode('utf-8') + response.body
+        )
+
+    do_GET = do_PUT = do_POST = do_DELETE = do_HEAD = handle_request
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                          BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalAWS(object):
+    """
+    In-process S3, SQS, SNS and Lambda endpoint
+    """
+
+    def __init__(self, host='127.0.0.1', port=0,
+                 region_name='us-east-1', account_id='123456789012',
+                 max_wait_time=20):
+        """
+        :param host: interface to listen on
+        :param port: port, random free port by default
+        :param region_name: region used in ARNs
+        :param account_id: account used in ARNs and queue urls
+        :param max_wait_time: cap for SQS long polling in seconds
+        """
+        self.region_name = region_name
+        self.account_id = account_id
+        self.max_wait_time = max_wait_time
+        self.lock = threading.RLock()
+        self.s3 = S3Service(self)
+        self.sqs = SQSService(self)
+        self.sns = SNSService(self)
+        self.aws_lambda = LambdaService(self)
+        # callable(request) returning seconds to delay the response
+        self.latency = None
+        self.server = ThreadingHTTPServer((host, port), LocalAWSHandler)
+        self.server.backend = self
+        self.thread = None
+
+    @property
+    def endpoint_url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, request):
+        if self.latency is not None:
+            time.sleep(self.latency(request) or 0)
+        service = {
+            's3': self.s3,
+            'sqs': self.sqs,
+            'sns': self.sns,
+            'lambda': self.aws_lambda,
+        }.get(request.service)
+        if service is None:
+            return Response(400, 'Unsupported service')
+        return service.handle(request)
+
+    # state helpers for tests and benchmarks
+
+    def create_bucket(self, name):
+        with self.lock:
+            self.s3.buckets.setdefault(name, {})
+
+    def put_object(self, bucket_name, key, body):
+        with self.lock:
+            self.s3.buckets.setdefault(bucket_name, {})[key] = S3Object(body)
+
+    def create_queue(self, name, **attributes):
+        return self.sqs.create_queue(name, dict(
+            (key, str(value)) for key, value in attributes.items()
+        )).url
+
+    def create_topic(self, name):
+        arn = 'arn:aws:sns:{}:{}:{}'.format(self.region_name,
+                                            self.account_id, name)
+        with self.lock:
+            self.sns.topics.setdefault(arn, [])
+        return arn
+
+    def subscribe_queue(self, topic_name, queue_name):
+        arn = self.create_topic(topic_name)
+        with self.lock:
+            self.sns.topics[arn].append(
+                ('sqs', self.sqs.create_queue(queue_name).arn)
+            )
+
+    def add_function(self, name, handler=None):
+        """
+        Register Lambda function
+        :param name: function name
+        :param handler: callable(event, context), echoes event by default
+        """
+        self.aws_lambda.functions[name] = handler or (
+            lambda event, context: event
+        )
+        return self.aws_lambda.function_arn(name)
@@ -7,7 +7,7 @@ import string
 
 # noinspection PyUnresolvedReferences
 from six.moves import StringIO
-import botocore
+import botocore.client
 from botocore.exceptions import ClientError
 
 from tests.base_test import BaseTest
@@ -0,0 +1,10 @@
+from __future__ import unicode_literals
+
+import sys
+
+# aws_client.aio needs Python 3.7+, the cases do not even compile on older
+# interpreters
+if sys.version_info >= (3, 7):
+    from tests.aio_cases import (  # noqa: F401
+        AsyncWrappersTest, LongPollingTest
+    )
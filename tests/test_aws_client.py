@@ -0,0 +1,668 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from botocore.exceptions import ClientError, ReadTimeoutError
+from mock import patch
+
+import aws_client
+from aws_client import cache, deadlines, hedging, singleflight
+from aws_client.aws_client import BaseAWSClient
+from aws_client.breaker import CircuitBreaker, CircuitOpenError
+from aws_client.cache import FileCache, MemoryCache, UnsafeCacheDirectory
+from aws_client.hedging import HedgingPolicy
+from aws_client.registry import ClientRegistry, registry
+from aws_client.retry import AdaptiveRateLimiter, RetryPolicy
+from aws_client.s3.s3bucket import S3Bucket
+from aws_client.singleflight import SingleFlight
+from aws_client.sns.client import SNSClient
+from aws_client.sqs.client import SQSClient
+from aws_client.sqs.queue import SQSQueue
+from aws_client.warmup import warmup
+from tests.base_test import BaseTest
+from tests.local_aws import LocalAWS
+
+
+class RegistryTest(BaseTest):
+    def test_clients_are_shared(self):
+        first = BaseAWSClient('s3', self.region_name,
+                              self.aws_access_key_id,
+                              self.aws_secret_access_key)
+        second = BaseAWSClient('s3', self.region_name,
+                               self.aws_access_key_id,
+                               self.aws_secret_access_key)
+        other_region = BaseAWSClient('s3', 'eu-west-1',
+                                     self.aws_access_key_id,
+                                     self.aws_secret_access_key)
+        self.assertIs(first.instance.client, second.instance.client)
+        self.assertIsNot(first.instance.client, other_region.instance.client)
+
+    def test_bucket_reuses_client(self):
+        first = S3Bucket('first-bucket', self.region_name,
+                         self.aws_access_key_id,
+                         self.aws_secret_access_key)
+        second = S3Bucket('second-bucket', self.region_name,
+                          self.aws_access_key_id,
+                          self.aws_secret_access_key)
+        self.assertIs(first.client.instance.client,
+                      second.client.instance.client)
+
+    def test_max_pool_connections(self):
+        pool = ClientRegistry(max_pool_connections=7)
+        client = pool.client('sqs', region_name=self.region_name,
+                             aws_access_key_id=self.aws_access_key_id,
+                             aws_secret_access_key=self.aws_secret_access_key)
+        self.assertEqual(client.meta.config.max_pool_connections, 7)
+        pool.configure(max_pool_connections=3)
+        client = pool.client('sqs', region_name=self.region_name,
+                             aws_access_key_id=self.aws_access_key_id,
+                             aws_secret_access_key=self.aws_secret_access_key)
+        self.assertEqual(client.meta.config.max_pool_connections, 3)
+
+    def test_instance_is_lazy(self):
+        client = BaseAWSClient('sqs', self.region_name,
+                               self.aws_access_key_id,
+                               self.aws_secret_access_key)
+        self.assertIsNone(client._instance)
+        self.assertIs(client.instance, client.instance)
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        script = (
+            'import sys; import aws_client.sqs.queue, aws_client.sns.client, '
+            'aws_client.s3.s3bucket, aws_client.aws_lambda.deployment; '
+            'print(",".join(m for m in ("boto", "boto3", "rsa", "git") '
+            'if m in sys.modules))'
+        )
+        output = subprocess.check_output([sys.executable, '-c', script])
+        self.assertEqual(output.strip(), b'')
+
+    def tearDown(self):
+        registry.clear()
+
+
+def throttling_error(operation_name):
+    return ClientError(
+        {'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}},
+        operation_name
+    )
+
+
+class RetryTest(BaseTest):
+    def make_client(self, policy):
+        return BaseAWSClient('sns', self.region_name,
+                             self.aws_access_key_id,
+                             self.aws_secret_access_key,
+                             retry_policy=policy)
+
+    def test_throttling_is_retried(self):
+        responses = [throttling_error('ListTopics'),
+                     throttling_error('ListTopics'),
+                     {'Topics': []}]
+
+        def make_api_call(client, operation_name, kwargs):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        client = self.make_client(RetryPolicy(base_delay=0.001,
+                                              max_delay=0.002,
+                                              adaptive=False))
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            self.assertEqual(client.instance.list_topics(), {'Topics': []})
+        stats = client.retry_stats.as_dict()
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['throttles'], 2)
+        self.assertEqual(stats['sleeps'], 2)
+
+    def test_retry_budget(self):
+        def make_api_call(client, operation_name, kwargs):
+            raise throttling_error(operation_name)
+
+        client = self.make_client(RetryPolicy(max_attempts=10,
+                                              base_delay=0.001,
+                                              max_delay=0.001,
+                                              budget_capacity=3,
+                                              adaptive=False))
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            self.assertRaises(ClientError, client.instance.list_topics)
+        stats = client.retry_stats.as_dict()
+        self.assertEqual(stats['retries'], 3)
+        self.assertEqual(stats['budget_exhausted'], 1)
+
+    def test_not_retryable_error(self):
+        def make_api_call(client, operation_name, kwargs):
+            raise ClientError({'Error': {'Code': 'NotFound'}}, operation_name)
+
+        client = self.make_client(RetryPolicy(adaptive=False))
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            self.assertRaises(ClientError, client.instance.list_topics)
+        self.assertEqual(client.retry_stats.as_dict()['retries'], 0)
+
+    def test_rate_limiter(self):
+        now = [0.0]
+        limiter = AdaptiveRateLimiter(min_rate=1, clock=lambda: now[0])
+        self.assertEqual(limiter.acquire(), 0)
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 1)
+        with patch('time.sleep') as sleep:
+            self.assertGreater(limiter.acquire(), 0)
+            self.assertTrue(sleep.called)
+        for _ in range(10):
+            limiter.on_success()
+        self.assertIsNone(limiter.rate)
+
+    def tearDown(self):
+        registry.clear()
+
+
+class CircuitBreakerTest(BaseTest):
+    def setUp(self):
+        self.now = [1000.0]
+        self.responses = []
+        self.calls = []
+        self.breaker = CircuitBreaker(min_calls=4, open_timeout=10,
+                                      half_open_probes=2,
+                                      clock=lambda: self.now[0])
+        policy = RetryPolicy(max_attempts=1, adaptive=False)
+        self.client = BaseAWSClient('sns', self.region_name,
+                                    self.aws_access_key_id,
+                                    self.aws_secret_access_key,
+                                    retry_policy=policy,
+                                    circuit_breaker=self.breaker)
+
+    def make_api_call(self, client, operation_name, kwargs):
+        self.calls.append(operation_name)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def list_topics(self):
+        test = self
+
+        def make_api_call(client, operation_name, kwargs):
+            return test.make_api_call(client, operation_name, kwargs)
+
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            return self.client.instance.list_topics()
+
+    def test_open_half_open_close(self):
+        key = ('sns', self.region_name)
+        self.responses = [{}, {}] + [throttling_error('ListTopics')] * 2
+        for _ in range(2):
+            self.list_topics()
+        for _ in range(2):
+            self.assertRaises(ClientError, self.list_topics)
+        self.assertEqual(self.breaker.states(), {key: 'open'})
+
+        self.assertRaises(CircuitOpenError, self.list_topics)
+        self.assertEqual(len(self.calls), 4)
+
+        self.now[0] += 11
+        self.responses = [{}, {}]
+        self.list_topics()
+        self.assertEqual(self.breaker.states(), {key: 'half_open'})
+        self.list_topics()
+        self.assertEqual(self.breaker.states(), {key: 'closed'})
+
+    def test_circuit_without_region(self):
+        # clients of global endpoints are created with region_name=None
+        circuit = self.breaker.circuit(('s3', None))
+        for _ in range(4):
+            circuit.before_call()
+            circuit.on_error(throttling_error('ListBuckets'), 0.1)
+        with self.assertRaises(CircuitOpenError) as context:
+            circuit.before_call()
+        self.assertEqual(str(context.exception), 'Circuit for s3/None is open')
+        self.assertEqual(context.exception.key, ('s3', None))
+
+    def test_unanswered_probes_do_not_close_circuit(self):
+        key = ('sns', self.region_name)
+        circuit = self.breaker.circuit(key)
+        for _ in range(4):
+            circuit.before_call()
+            circuit.on_error(throttling_error('ListTopics'), 0.1)
+        self.now[0] += 11
+        for _ in range(3):
+            circuit.before_call()
+            circuit.on_error(aws_client.DeadlineExceeded(), 0)
+            circuit.before_call()
+            circuit.on_error(ValueError('invalid parameter'), 0)
+        self.assertEqual(self.breaker.states(), {key: 'half_open'})
+
+        not_found = ClientError(
+            {'Error': {'Code': 'NotFound', 'Message': 'Not found'},
+             'ResponseMetadata': {'HTTPStatusCode': 404}}, 'GetTopicAttributes'
+        )
+        for _ in range(2):
+            circuit.before_call()
+            circuit.on_error(not_found, 0.1)
+        self.assertEqual(self.breaker.states(), {key: 'closed'})
+
+    def test_deadline_failures_open_circuit(self):
+        def timeout(client, operation_name, kwargs):
+            self.calls.append(operation_name)
+            # the read timeout fires when the deadline runs out
+            time.sleep(deadlines.current().remaining() + 0.01)
+            raise ReadTimeoutError(endpoint_url='https://sns')
+
+        with patch('botocore.client.BaseClient._make_api_call', new=timeout):
+            for _ in range(4):
+                with aws_client.deadline(seconds=0.5):
+                    self.assertRaises(aws_client.DeadlineExceeded,
+                                      self.client.instance.list_topics)
+        self.assertEqual(self.breaker.states(),
+                         {('sns', self.region_name): 'open'})
+        self.assertRaises(CircuitOpenError, self.list_topics)
+        self.assertEqual(len(self.calls), 4)
+
+    def test_fallback(self):
+        self.client.register_fallback(
+            'list_topics', lambda exc, **kwargs: {'Topics': ['cached']}
+        )
+        self.responses = [throttling_error('ListTopics')] * 4
+        for _ in range(5):
+            self.assertEqual(self.list_topics(), {'Topics': ['cached']})
+        self.assertEqual(len(self.calls), 4)
+
+
+class MetricsTest(BaseTest):
+    def test_operation_metrics(self):
+        from aws_client import metrics
+
+        collector = metrics.enable()
+        collector.reset()
+        client = BaseAWSClient('sqs', self.region_name,
+                               self.aws_access_key_id,
+                               self.aws_secret_access_key,
+                               endpoint_url='http://127.0.0.1:1',
+                               retry_policy=RetryPolicy(max_attempts=1))
+        try:
+            self.assertRaises(Exception, client.instance.list_queues)
+        finally:
+            metrics.disable()
+        stats = metrics.stats()['sqs']['ListQueues']
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['errors'], {'EndpointConnectionError': 1})
+        self.assertEqual(stats['latency_buckets']['+Inf'], 1)
+        text = metrics.prometheus()
+        self.assertIn(
+            'aws_client_requests_total{service="sqs",operation="ListQueues"} 1',
+            text
+        )
+        self.assertIn('aws_client_request_duration_seconds_bucket', text)
+
+    def tearDown(self):
+        registry.clear()
+
+
+class SingleFlightTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.settings = dict(
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def lookup(self, result):
+        self.calls.append(1)
+        self.started.set()
+        self.release.wait(5)
+        return result
+
+    def test_concurrent_lookups_share_call(self):
+        group = SingleFlight()
+        results = []
+
+        def worker():
+            results.append(group.do('key', lambda: self.lookup('value')))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        threads[0].start()
+        self.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, ['value'] * 10)
+
+    def test_waiters_keep_their_deadline(self):
+        group = SingleFlight()
+        thread = threading.Thread(
+            target=group.do, args=('key', lambda: self.lookup('value'))
+        )
+        thread.start()
+        self.started.wait(5)
+        start = time.time()
+        with aws_client.deadline(seconds=0.1):
+            self.assertRaises(aws_client.DeadlineExceeded, group.do, 'key',
+                              lambda: self.lookup('other'))
+        self.assertLess(time.time() - start, 1)
+        self.release.set()
+        thread.join()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_missing_resource_is_remembered(self):
+        group = SingleFlight(negative_ttl=60)
+        self.release.set()
+        self.assertIsNone(group.do('key', lambda: self.lookup(None)))
+        self.assertIsNone(group.do('key', lambda: self.lookup('value')))
+        self.assertEqual(len(self.calls), 1)
+        group.forget('key')
+        self.assertEqual(group.do('key', lambda: self.lookup('value')),
+                         'value')
+
+    def test_missing_resources_are_bounded(self):
+        clock = [0.0]
+        group = SingleFlight(negative_ttl=10, max_missing=3,
+                             clock=lambda: clock[0])
+        for idx in range(5):
+            group.do(idx, lambda: None)
+        self.assertEqual(list(group._missing), [2, 3, 4])
+        clock[0] = 20
+        group.do('late', lambda: None)
+        # expired entries are purged on insert
+        self.assertEqual(list(group._missing), ['late'])
+
+    def test_missing_queue_then_created(self):
+        clients = [SQSClient(**self.settings) for _ in range(5)]
+        for client in clients:
+            self.assertIsNone(client.get_queue_url('test-queue'))
+        clients[0].create_queue('test-queue')
+        self.assertTrue(clients[1].get_queue_url('test-queue'))
+        self.assertEqual(self.aws.sqs.calls.count('GetQueueUrl'), 2)
+
+    def tearDown(self):
+        self.aws.stop()
+        cache.backend.clear()
+        singleflight.group.clear()
+        registry.clear()
+
+
+class MetadataCacheTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_queue('test-queue')
+        self.settings = dict(
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+        self.directory = tempfile.mkdtemp()
+        self.now = [1000.0]
+
+    def clock(self):
+        return self.now[0]
+
+    def test_memory_cache_ttl_and_lru(self):
+        backend = MemoryCache(max_size=2, ttl=10, clock=self.clock)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        self.assertEqual(backend.get('a'), 1)
+        backend.set('c', 3)
+        self.assertIsNone(backend.get('b'))
+        self.now[0] += 11
+        self.assertIsNone(backend.get('a'))
+        self.assertEqual(backend.stats.as_dict(), dict(
+            hits=1, misses=2, sets=3, evictions=1
+        ))
+
+    def test_file_cache_is_shared(self):
+        first = FileCache(self.directory, ttl=10, clock=self.clock)
+        second = FileCache(self.directory, ttl=10, clock=self.clock)
+        first.set(('sqs', 'queue_url', 'test-queue'), 'url')
+        self.assertEqual(second.get(('sqs', 'queue_url', 'test-queue')),
+                         'url')
+        self.now[0] += 11
+        self.assertIsNone(second.get(('sqs', 'queue_url', 'test-queue')))
+
+    def test_file_cache_evicts_in_batches(self):
+        backend = FileCache(self.directory, max_size=20, clock=self.clock)
+        scans = []
+        listdir = os.listdir
+
+        def counting_listdir(path):
+            scans.append(path)
+            return listdir(path)
+
+        with patch('os.listdir', new=counting_listdir):
+            for index in range(40):
+                backend.set(index, index)
+                self.now[0] += 1
+                backend.set(index, index)
+        self.assertEqual(len(listdir(self.directory)), 19)
+        # first count, then a scan every third new entry, rewrites of an
+        # entry are not counted
+        self.assertEqual(len(scans), 8)
+        self.assertEqual(backend.stats.as_dict()['evictions'], 21)
+        self.assertIsNone(backend.get(0))
+        self.assertEqual(backend.get(39), 39)
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), 'requires POSIX')
+    def test_file_cache_directory_is_private(self):
+        default = FileCache()
+        self.assertIn(str(os.getuid()), default.directory)
+        self.assertEqual(os.stat(default.directory).st_mode & 0o077, 0)
+        os.chmod(self.directory, 0o777)
+        with self.assertRaises(UnsafeCacheDirectory):
+            FileCache(self.directory)
+
+    def test_lookups_read_through_cache(self):
+        cache.configure(FileCache(self.directory))
+        url = SQSClient(**self.settings).get_queue_url('test-queue')
+        arn = SNSClient(**self.settings).get_topic_arn('test-topic')
+        self.assertEqual(SQSClient(**self.settings).get_queue_url(
+            'test-queue'
+        ), url)
+        self.assertEqual(SNSClient(**self.settings).get_topic_arn(
+            'test-topic'
+        ), arn)
+        self.assertEqual(self.aws.sqs.calls, ['GetQueueUrl'])
+        self.assertEqual(self.aws.sns.calls, ['ListTopics', 'CreateTopic'])
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def tearDown(self):
+        cache.configure(MemoryCache())
+        self.aws.stop()
+        shutil.rmtree(self.directory)
+        singleflight.group.clear()
+        registry.clear()
+
+
+class DeadlineTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        self.bucket = S3Bucket('test-bucket', self.region_name,
+                               self.aws_access_key_id,
+                               self.aws_secret_access_key,
+                               endpoint_url=self.aws.endpoint_url)
+
+    def test_timeouts_shrink_to_deadline(self):
+        self.aws.put_object('test-bucket', 'key', b'data')
+        self.assertIsNotNone(self.bucket.client.instance)
+        with aws_client.deadline(seconds=0.7):
+            self.assertTrue(self.bucket.exist('key'))
+            variants = list(self.bucket.client._variants.values())
+        self.assertEqual(len(variants), 1)
+        self.assertEqual(variants[0].meta.config.read_timeout, 0.5)
+        self.assertEqual(variants[0].meta.config.connect_timeout, 0.5)
+
+    def test_deadline_exceeded(self):
+        with aws_client.deadline(seconds=0.05):
+            time.sleep(0.06)
+            self.assertRaises(aws_client.DeadlineExceeded,
+                              self.bucket.exist, 'key')
+
+    def test_deadline_applies_to_receive_messages(self):
+        self.aws.create_queue('test-queue')
+        queue = SQSQueue('test-queue', self.region_name,
+                         self.aws_access_key_id, self.aws_secret_access_key,
+                         endpoint_url=self.aws.endpoint_url)
+        queue.get_queue_url()
+        self.aws.latency = lambda request: 1.0
+        start = time.time()
+        with aws_client.deadline(seconds=0.2):
+            self.assertRaises(aws_client.DeadlineExceeded,
+                              queue.receive_messages)
+        self.assertLess(time.time() - start, 0.8)
+
+    def test_no_retry_past_deadline(self):
+        policy = RetryPolicy(base_delay=1.0, adaptive=False)
+        calls = []
+
+        def throttled(**kwargs):
+            calls.append(kwargs)
+            raise throttling_error('ListTopics')
+
+        with aws_client.deadline(seconds=0.5) as deadline:
+            self.assertRaises(aws_client.DeadlineExceeded, policy.call,
+                              ('sns', self.region_name), throttled, {},
+                              deadline=deadline)
+        self.assertEqual(len(calls), 1)
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+
+
+class HedgingTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.put_object('test-bucket', 'key', b'data')
+        self.policy = HedgingPolicy(max_delay=0.05, max_ratio=0.5, burst=1)
+        self.bucket = S3Bucket('test-bucket', self.region_name,
+                               self.aws_access_key_id,
+                               self.aws_secret_access_key,
+                               endpoint_url=self.aws.endpoint_url,
+                               hedging_policy=self.policy)
+        self.requests = []
+
+    def latency(self, request):
+        self.requests.append(request.method)
+        return 1.0 if len(self.requests) == 1 else 0
+
+    def test_slow_read_is_hedged(self):
+        self.assertTrue(self.bucket.client.call(
+            'head_object', Bucket='test-bucket', Key='key'
+        ))
+        self.aws.latency = self.latency
+        start = time.time()
+        body, length = self.bucket.get_object('key')
+        self.assertEqual((body.read(), length), (b'data', 4))
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(self.policy.stats.as_dict(), dict(
+            calls=1, hedges=1, hedge_wins=1, capped=0, saturated=0
+        ))
+
+    def test_hedges_are_capped(self):
+        self.aws.latency = lambda request: 0.1
+        for _ in range(4):
+            self.assertTrue(self.bucket.exist('key'))
+        stats = self.policy.stats.as_dict()
+        self.assertEqual(stats['calls'], 4)
+        self.assertEqual(stats['hedges'] + stats['capped'], 4)
+        self.assertLessEqual(stats['hedges'], 3)
+
+    def test_busy_workers_are_not_waited_for(self):
+        hedging._workers = hedging._Workers(1)
+        policy = HedgingPolicy(max_delay=0.01, burst=10)
+
+        def slow():
+            time.sleep(0.1)
+            return threading.current_thread()
+
+        # the primary holds the only worker, the hedge is skipped
+        self.assertIsNot(policy.call('key', slow), threading.current_thread())
+        self.assertTrue(hedging._workers.claim())
+        # no worker free, the call runs on the caller's thread
+        self.assertIs(policy.call('key', slow), threading.current_thread())
+        hedging._workers.release()
+        self.assertEqual(policy.stats.as_dict(), dict(
+            calls=2, hedges=0, hedge_wins=0, capped=0, saturated=2
+        ))
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+        hedging._workers = None
+
+
+class WarmupTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        self.aws.create_queue('test-queue')
+        self.aws.create_topic('test-topic')
+        self.aws.add_function('test-function')
+        self.settings = dict(
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+        self.requests = []
+        self.aws.latency = self.latency
+
+    def latency(self, request):
+        self.requests.append(request.service)
+        return 0.05
+
+    def test_warmup_resolves_metadata_and_opens_connections(self):
+        results = warmup(queues=['test-queue'],
+                         topics=['test-topic'],
+                         buckets=['test-bucket'],
+                         functions=['test-function'],
+                         connections=3,
+                         **self.settings)
+        self.assertEqual(sorted(results), [
+            ('bucket', 'test-bucket'), ('function', 'test-function'),
+            ('queue', 'test-queue'), ('topic', 'test-topic'),
+        ])
+        for value in results.values():
+            self.assertIsInstance(value, float)
+        self.assertEqual(self.requests.count('s3'), 3)
+        self.assertEqual(self.aws.sqs.calls.count('GetQueueAttributes'), 3)
+        self.assertEqual(self.aws.sns.calls.count('GetTopicAttributes'), 3)
+
+        del self.requests[:]
+        SQSClient(**self.settings).get_queue_url('test-queue')
+        SNSClient(**self.settings).get_topic_arn('test-topic')
+        self.assertEqual(self.requests, [])
+
+    def test_failed_target_is_reported(self):
+        results = warmup(buckets=['test-bucket', 'missing-bucket'],
+                         connections=1, **self.settings)
+        self.assertIsInstance(results[('bucket', 'test-bucket')], float)
+        self.assertIsInstance(results[('bucket', 'missing-bucket')], float)
+        results = warmup(queues=['missing-queue'], connections=1,
+                         **self.settings)
+        self.assertIsInstance(results[('queue', 'missing-queue')],
+                              Exception)
+
+    def tearDown(self):
+        self.aws.stop()
+        singleflight.group.clear()
+        cache.configure(MemoryCache())
+        registry.clear()
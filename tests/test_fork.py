@@ -0,0 +1,95 @@
+from __future__ import unicode_literals
+
+import os
+import signal
+import unittest
+
+from botocore.client import Config
+
+from aws_client.cache import MemoryCache
+from aws_client.registry import registry
+from aws_client.retry import RetryPolicy
+from aws_client.s3.s3bucket import S3Bucket
+from tests.base_test import BaseTest
+from tests.local_aws import LocalAWS
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'requires fork')
+class ForkTest(BaseTest):
+    workers = 8
+    requests_per_worker = 100
+
+    def setUp(self):
+        self.aws = LocalAWS().start()
+        self.aws.create_bucket('test-bucket')
+        self.bucket = S3Bucket(
+            'test-bucket', self.region_name,
+            self.aws_access_key_id, self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+            config=Config(s3={'addressing_style': 'path'}),
+        )
+
+    def get(self, key):
+        body, _ = self.bucket.get_object(key)
+        return body.read().decode('utf-8')
+
+    def worker(self, parent_client):
+        if self.bucket.client.instance.client is parent_client:
+            return 2
+        # every object holds its own key, so a response read from a
+        # connection shared with another process would not match
+        for idx in range(self.requests_per_worker):
+            key = 'worker-{}/{}'.format(os.getpid(), idx)
+            self.bucket.upload_from_string(key, key)
+            if self.get(key) != key:
+                return 1
+        return 0
+
+    def test_forked_workers_rebuild_clients(self):
+        self.bucket.upload_from_string('parent', 'parent')
+        self.assertEqual(self.get('parent'), 'parent')
+        parent_client = self.bucket.client.instance.client
+
+        pids = []
+        for _ in range(self.workers):
+            pid = os.fork()
+            if not pid:
+                code = 3
+                try:
+                    code = self.worker(parent_client)
+                finally:
+                    os._exit(code)
+            pids.append(pid)
+
+        self.assertEqual(self.get('parent'), 'parent')
+        self.assertIs(self.bucket.client.instance.client, parent_client)
+
+        exit_codes = [os.waitpid(pid, 0)[1] for pid in pids]
+        self.assertEqual(exit_codes, [0] * self.workers)
+
+    def test_locks_held_at_fork_are_replaced(self):
+        cache = MemoryCache()
+        policy = RetryPolicy()
+        # as if other threads held them when the process forked
+        cache._lock.acquire()
+        policy._lock.acquire()
+        try:
+            pid = os.fork()
+            if not pid:
+                code = 1
+                # a deadlocked child is killed instead of hanging the test
+                signal.alarm(10)
+                try:
+                    cache.set('key', 'value')
+                    with policy._lock:
+                        code = 0 if cache.get('key') == 'value' else 2
+                finally:
+                    os._exit(code)
+        finally:
+            cache._lock.release()
+            policy._lock.release()
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
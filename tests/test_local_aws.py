@@ -0,0 +1,85 @@
+from __future__ import unicode_literals
+
+import json
+
+from botocore.client import Config
+
+from aws_client.aws_lambda.lambda_function import LambdaFunction
+from aws_client.registry import registry
+from aws_client.s3.s3bucket import S3Bucket
+from aws_client.sns.client import SNSClient
+from aws_client.sqs.queue import SQSQueue
+from tests.base_test import BaseTest
+from tests.local_aws import LocalAWS
+
+
+class LocalAWSTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.settings = dict(
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+
+    def test_s3_bucket(self):
+        self.aws.create_bucket('test-bucket')
+        bucket = S3Bucket('test-bucket', self.region_name,
+                          self.aws_access_key_id, self.aws_secret_access_key,
+                          endpoint_url=self.aws.endpoint_url,
+                          config=Config(s3={'addressing_style': 'path'}))
+        bucket.upload_from_string('hello world', 'dir/a b.txt')
+        bucket.copy('dir/a b.txt', 'dir/copy.txt')
+
+        body, length = bucket.get_object('dir/copy.txt')
+        self.assertEqual((body.read(), length), (b'hello world', 11))
+        self.assertTrue(bucket.exist('dir/a b.txt'))
+        self.assertEqual(bucket.get_file_size('dir/a b.txt'), 11)
+        self.assertEqual(
+            sorted(obj['Key'] for obj
+                   in bucket.list_objects('dir/')['Contents']),
+            ['dir/a b.txt', 'dir/copy.txt']
+        )
+        bucket.remove('dir/a b.txt')
+        self.assertFalse(bucket.exist('dir/a b.txt'))
+
+    def test_sqs_visibility_timeout(self):
+        self.aws.create_queue('test-queue', VisibilityTimeout=0.5)
+        queue = SQSQueue('test-queue', use_resource=False, **self.settings)
+        queue.send_messages([{'idx': 1}, {'idx': 2}])
+
+        messages = queue.receive_messages(count=10)
+        self.assertEqual([json.loads(m['Body']) for m in messages],
+                         [{'idx': 1}, {'idx': 2}])
+        self.assertEqual(queue.receive_messages(count=10), [])
+        self.assertEqual(queue.get_queue_not_visible_number(), 2)
+
+        queue.delete_messages(messages[0]['ReceiptHandle'])
+        redelivered = queue.receive_messages(count=10, wait_timeout=2)
+        self.assertEqual([json.loads(m['Body']) for m in redelivered],
+                         [{'idx': 2}])
+
+    def test_sns_to_sqs_and_lambda(self):
+        self.aws.subscribe_queue('test-topic', 'test-queue')
+        self.aws.add_function('test-function')
+        sns = SNSClient(**self.settings)
+        sns.subscribe_to_lambda('test-topic', 'test-function')
+        sns.publish('test-topic', {'key': 'value'}, 'sqs')
+
+        queue = SQSQueue('test-queue', use_resource=False, **self.settings)
+        notification = json.loads(queue.receive_messages()[0]['Body'])
+        self.assertEqual(json.loads(notification['Message']),
+                         {'key': 'value'})
+        self.assertEqual(len(self.aws.aws_lambda.invocations), 1)
+
+        function = LambdaFunction('test-function', **self.settings)
+        self.assertEqual(
+            json.loads(function({'key': 'value'}, async_call=False)),
+            {'key': 'value'}
+        )
+        self.assertIsNone(function({'key': 'value'}))
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
@@ -1,11 +1,32 @@
 from __future__ import unicode_literals
 
+import base64
 import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
 
+import rsa
+from botocore.client import Config
+from botocore.exceptions import ClientError
+from botocore.signers import CloudFrontSigner
 from freezefrog import FreezeTime
+from mock import ANY, patch
+# noinspection PyUnresolvedReferences
+from six.moves.urllib.parse import parse_qsl
 
+from aws_client.registry import registry
+from aws_client.retry import RetryPolicy
+from aws_client.s3.listing import CommonPrefix, ObjectSummary
+from aws_client.s3.presign import UrlCache
 from aws_client.s3.s3bucket import S3Bucket
+from aws_client.s3.transfer import MB, TransferConfig, TransferError
 from tests.base_test import BaseTest
+from tests.local_aws import LocalAWS
 
 
 class S3Test(BaseTest):
@@ -58,3 +79,619 @@ PCVtpEG-T8Zi4pzO3YcnoEh-XgUMwn23IjxzH7PEKAgsaOAtByT8HitDYMCEHEuSJU4qEgbhuEInU3j9
 ka68s47iep~k8QJFMoB6zyBz8~D6sw3DqWtS1swscs1JvEQamb3lgeBv8qYVW4IoPouOwpZo~igwUhBu
 mcLYQkGmOB~oLaWC6SnfyYUKUyH~lhaot5Kj1wP9Nw8u090WPUkYYc_&Key-Pair-Id=AKIAIOSFODNN
 7EXAMPLE"""))
+
+
+class S3ListingTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        self.keys = sorted(
+            '{}/{:04d}'.format(folder, idx)
+            for folder in ('logs', 'media', 'tmp') for idx in range(900)
+        ) + ['README', 'media.json', '~backup']
+        self.keys.sort()
+        for key in self.keys:
+            self.aws.put_object('test-bucket', key, b'x')
+        self.bucket = S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+        self.requests = []
+        self.aws.latency = self.latency
+
+    def latency(self, request):
+        self.requests.append(request.path)
+        return 0
+
+    def test_iter_objects_pages_lazily(self):
+        objects = self.bucket.iter_objects()
+        first = next(objects)
+        self.assertEqual(first, ObjectSummary(
+            'README', 1, first.last_modified, first.etag
+        ))
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual([first.key] + [obj.key for obj in objects],
+                         self.keys)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_iter_objects_delimiter_and_start_after(self):
+        self.assertEqual(list(self.bucket.iter_objects(delimiter='/')), [
+            ObjectSummary('README', 1, ANY, ANY),
+            CommonPrefix('logs/'),
+            ObjectSummary('media.json', 1, ANY, ANY),
+            CommonPrefix('media/'),
+            CommonPrefix('tmp/'),
+            ObjectSummary('~backup', 1, ANY, ANY),
+        ])
+        self.assertEqual(
+            [obj.key for obj in self.bucket.iter_objects(
+                'media/', start_after='media/0897'
+            )],
+            ['media/0898', 'media/0899'],
+        )
+
+    def test_parallel_iter_objects(self):
+        self.assertEqual(
+            sorted(obj.key for obj in self.bucket.iter_objects(workers=4)),
+            self.keys,
+        )
+        self.assertEqual(
+            sorted(obj.key for obj in self.bucket.iter_objects(
+                delimiter='/', workers=4
+            )),
+            self.keys,
+        )
+        self.assertEqual(
+            sorted(obj.key for obj in self.bucket.iter_objects(
+                'media/', start_after='media/0500', workers=4
+            )),
+            [key for key in self.keys
+             if key.startswith('media/') and key > 'media/0500'],
+        )
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+
+
+class S3TransferTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        self.stats = []
+        self.progress = []
+        # LocalAWS accepts parts of any size
+        with patch('aws_client.s3.transfer.MIN_PART_SIZE', 1024):
+            self.config = TransferConfig(
+                multipart_threshold=1024,
+                part_size=1024,
+                max_concurrency=3,
+                progress_callback=self.progress.append,
+                on_complete=self.stats.append
+            )
+        self.bucket = S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+            transfer_config=self.config,
+        )
+        self.payload = bytes(bytearray(range(256))) * 20
+        self.failed = []
+
+    def read(self, key):
+        body, _ = self.bucket.get_object(key)
+        return body.read()
+
+    def test_config_is_validated(self):
+        self.assertRaises(ValueError, TransferConfig, part_size=5 * MB - 1)
+        self.assertRaises(ValueError, TransferConfig, max_concurrency=0)
+        self.assertEqual(TransferConfig(part_size=5 * MB).part_size, 5 * MB)
+
+    def test_small_payload_is_put_at_once(self):
+        self.bucket.upload_from_string(b'data', 'small')
+        self.assertEqual(self.read('small'), b'data')
+        self.assertEqual(self.stats[0].parts, 1)
+        self.assertEqual(self.progress, [4])
+
+    def test_upload_from_path_in_parts(self):
+        with tempfile.NamedTemporaryFile() as source:
+            source.write(self.payload)
+            source.flush()
+            self.bucket.upload_from_path(source.name, 'large')
+        self.assertEqual(self.read('large'), self.payload)
+        self.assertEqual(self.stats[0].parts, 5)
+        self.assertEqual(self.stats[0].size, len(self.payload))
+        self.assertEqual(sum(self.progress), len(self.payload))
+
+    def test_stream_of_unknown_size(self):
+        class Stream(object):
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+
+            def read(self, size):
+                return self.data.read(min(size, 100))
+
+        self.bucket.upload_from_string(Stream(self.payload), 'stream')
+        self.assertEqual(self.read('stream'), self.payload)
+        self.assertEqual(self.stats[0].parts, 5)
+
+    def test_failed_part_is_retried_alone(self):
+        def latency(request):
+            if request.query.get('partNumber') == '3':
+                self.failed.append(request.query['partNumber'])
+                if len(self.failed) == 1:
+                    raise IOError('connection reset')
+            return 0
+
+        self.aws.latency = latency
+        self.bucket.upload_from_string(self.payload, 'retried')
+        self.assertEqual(self.read('retried'), self.payload)
+        self.assertEqual(self.failed, ['3', '3'])
+        self.assertEqual(sorted(self.progress), [1024] * 5)
+
+    def test_large_copy_in_parts(self):
+        self.bucket.client.call('put_object', Bucket='test-bucket',
+                                Key='master', Body=self.payload,
+                                ContentType='video/mp4')
+        self.aws.create_bucket('other-bucket')
+        requests = []
+        self.aws.latency = lambda request: requests.append(
+            request.headers.get('x-amz-copy-source-range')
+        )
+        self.assertIsNone(self.bucket.copy('master', 'copy',
+                                           return_url=False))
+        self.assertEqual(self.read('copy'), self.payload)
+        self.assertEqual(self.stats[-1].parts, 5)
+        self.assertEqual(sorted(filter(None, requests)), [
+            'bytes=0-1023', 'bytes=1024-2047', 'bytes=2048-3071',
+            'bytes=3072-4095', 'bytes=4096-5119',
+        ])
+        self.assertEqual(self.bucket.client.call(
+            'head_object', Bucket='test-bucket', Key='copy'
+        )['ContentType'], 'video/mp4')
+
+    def test_copy_many(self):
+        self.bucket.upload_from_string(b'small', 'a')
+        self.bucket.upload_from_string(self.payload, 'b')
+        result = self.bucket.copy_many(
+            [('a', 'copies/a'), ('b', 'copies/b'), ('missing', 'copies/c')],
+            return_urls=True
+        )
+        self.assertEqual(result.succeeded, 2)
+        self.assertEqual(result.errors, {'copies/c': '404'})
+        self.assertIn('copies/a', result.results['copies/a'])
+        self.assertEqual(self.read('copies/b'), self.payload)
+
+    def test_copy_many_with_known_sizes(self):
+        self.bucket.upload_from_string(b'small', 'media/a')
+        self.bucket.upload_from_string(self.payload, 'media/b')
+        requests = []
+        self.aws.latency = lambda request: requests.append(request.method)
+        result = self.bucket.copy_many(
+            (obj.key, 'copies/' + obj.key, obj.size)
+            for obj in self.bucket.iter_objects('media/')
+        )
+        self.assertEqual(result.succeeded, 2)
+        self.assertEqual(self.read('copies/media/a'), b'small')
+        self.assertEqual(self.read('copies/media/b'), self.payload)
+        # only the part copy needs ETag and headers of the source
+        self.assertEqual(requests.count('HEAD'), 1)
+
+    def test_download_into_buffer_in_ranges(self):
+        self.aws.put_object('test-bucket', 'large', self.payload)
+        buffer = bytearray(len(self.payload) + 10)
+        stats = self.bucket.download_into('large', buffer)
+        self.assertEqual(bytes(buffer[:len(self.payload)]), self.payload)
+        self.assertEqual((stats.size, stats.parts), (len(self.payload), 5))
+        self.assertEqual(sorted(self.progress), [1024] * 5)
+        with self.assertRaises(ValueError):
+            self.bucket.download_into('large', bytearray(10))
+
+    def test_download_to_path(self):
+        self.aws.put_object('test-bucket', 'large', self.payload)
+        self.aws.put_object('test-bucket', 'empty', b'')
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'large')
+            self.bucket.download_to_path('large', path)
+            with open(path, 'rb') as downloaded:
+                self.assertEqual(downloaded.read(), self.payload)
+            path = os.path.join(directory, 'empty')
+            self.bucket.download_to_path('empty', path)
+            self.assertEqual(os.path.getsize(path), 0)
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ['empty', 'large'])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_concurrent_downloads_to_one_path(self):
+        self.aws.put_object('test-bucket', 'large', self.payload)
+        self.aws.latency = lambda request: 0.01
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'large')
+        errors = []
+
+        def download():
+            try:
+                self.bucket.download_to_path('large', path)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=download) for _ in range(4)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            with open(path, 'rb') as downloaded:
+                self.assertEqual(downloaded.read(), self.payload)
+            self.assertEqual(os.listdir(directory), ['large'])
+            umask = os.umask(0)
+            os.umask(umask)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~umask)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_range_errors_are_retried_by_client_only(self):
+        self.aws.put_object('test-bucket', 'large', self.payload)
+        bucket = S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+            transfer_config=self.config,
+            retry_policy=RetryPolicy(max_attempts=2, adaptive=False),
+        )
+
+        def latency(request):
+            if request.headers.get('Range') == 'bytes=2048-3071':
+                self.failed.append(request.headers['Range'])
+                raise IOError('internal error')
+            return 0
+
+        self.aws.latency = latency
+        with self.assertRaises(ClientError):
+            bucket.download_into('large', bytearray(len(self.payload)))
+        self.assertEqual(len(self.failed), 2)
+
+    def test_download_detects_changed_object(self):
+        self.aws.put_object('test-bucket', 'large', self.payload)
+
+        def latency(request):
+            if request.headers.get('Range') == 'bytes=4096-5119':
+                self.aws.put_object('test-bucket', 'large', b'changed' * 800)
+            return 0
+
+        self.aws.latency = latency
+        with self.assertRaises(TransferError):
+            self.bucket.download_into('large', bytearray(len(self.payload)))
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+
+
+class S3ReaderTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        self.bucket = S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+        )
+        self.payload = bytes(bytearray(range(256))) * 64
+
+    def test_seek_and_read(self):
+        self.aws.put_object('test-bucket', 'data', self.payload)
+        with self.bucket.open('data', block_size=1024) as reader:
+            self.assertEqual(reader.seek(-10, io.SEEK_END),
+                             len(self.payload) - 10)
+            self.assertEqual(reader.read(), self.payload[-10:])
+            self.assertEqual(reader.read(5), b'')
+            reader.seek(1000)
+            self.assertEqual(reader.read(100), self.payload[1000:1100])
+            self.assertEqual(reader.tell(), 1100)
+            # last block, block 0, then blocks 1-2 read ahead
+            self.assertEqual(reader.stats, dict(
+                requests=3, bytes_fetched=4 * 1024, bytes_read=110
+            ))
+
+    def test_sequential_reads_ahead(self):
+        self.aws.put_object('test-bucket', 'data', self.payload)
+        reader = self.bucket.open('data', block_size=1024, max_read_ahead=4)
+        chunks = []
+        while True:
+            chunk = reader.read(1000)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        self.assertEqual(b''.join(chunks), self.payload)
+        # blocks fetched 1, 2, 4, 4, 4, 1
+        self.assertEqual(reader.stats['requests'], 6)
+        self.assertEqual(reader.stats['bytes_fetched'], len(self.payload))
+
+    def test_zipfile_member_is_read_without_full_download(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as writer:
+            for idx in range(8):
+                writer.writestr('member{}'.format(idx), os.urandom(16384))
+            writer.writestr('manifest.json', b'{"version": 1}')
+        self.aws.put_object('test-bucket', 'archive.zip', archive.getvalue())
+        reader = self.bucket.open('archive.zip', block_size=4096)
+        with zipfile.ZipFile(reader) as archive_reader:
+            self.assertEqual(archive_reader.read('manifest.json'),
+                             b'{"version": 1}')
+        self.assertLess(reader.stats['bytes_fetched'],
+                        len(archive.getvalue()) // 4)
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+
+
+class S3BatchTest(BaseTest):
+    def setUp(self):
+        self.aws = LocalAWS(account_id=self.account_id).start()
+        self.aws.create_bucket('test-bucket')
+        for idx in range(2500):
+            self.aws.put_object('test-bucket', 'thumbs/{:05d}'.format(idx),
+                                b'x')
+        self.aws.put_object('test-bucket', 'original', b'x')
+        self.bucket = S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            endpoint_url=self.aws.endpoint_url,
+            retry_policy=RetryPolicy(max_attempts=1, adaptive=False),
+        )
+        self.deletes = []
+        self.requests = []
+        self.aws.latency = self.latency
+
+    def latency(self, request):
+        self.requests.append(request.method)
+        if 'delete' in request.query:
+            self.deletes.append(request.body.count(b'<Key>'))
+            if b'thumbs/00000' in request.body and self.failing:
+                raise IOError('connection reset')
+        return 0
+
+    failing = False
+
+    def keys(self):
+        return sorted(self.aws.s3.buckets['test-bucket'])
+
+    def test_remove_many_in_batches(self):
+        result = self.bucket.remove_many(
+            'thumbs/{:05d}'.format(idx) for idx in range(2500)
+        )
+        self.assertEqual((result.succeeded, result.errors), (2500, {}))
+        self.assertEqual(sorted(self.deletes), [500, 1000, 1000])
+        self.assertEqual(self.keys(), ['original'])
+
+    def test_remove_prefix_reports_failed_keys(self):
+        self.failing = True
+        result = self.bucket.remove_prefix('thumbs/')
+        self.assertEqual(result.succeeded, 1500)
+        self.assertEqual(len(result.errors), 1000)
+        self.assertEqual(result.errors['thumbs/00000'], '500')
+        self.assertEqual(len(self.keys()), 1001)
+        with self.assertRaises(ValueError):
+            self.bucket.remove_prefix('')
+
+    def test_sizes_lists_clustered_keys(self):
+        thumbs = ['thumbs/{:05d}'.format(idx) for idx in range(10, 60)]
+        sizes = self.bucket.sizes(thumbs + ['thumbs/99999', 'original',
+                                            'missing', 'original'])
+        expected = dict((key, 1) for key in thumbs)
+        expected.update({'thumbs/99999': None, 'original': 1,
+                         'missing': None})
+        self.assertEqual(sizes, expected)
+        # listing stops after a page without wanted keys, the key above
+        # it and keys of a small folder are checked with HEAD
+        self.assertEqual(sorted(self.requests),
+                         ['GET', 'GET', 'HEAD', 'HEAD', 'HEAD'])
+
+    def test_exist_many_caches_missing_keys(self):
+        self.assertEqual(self.bucket.exist_many(['missing', 'original']),
+                         {'missing': False, 'original': True})
+        self.requests[:] = []
+        self.assertEqual(self.bucket.exist_many(['missing']),
+                         {'missing': False})
+        self.assertEqual(self.requests, [])
+        self.bucket.upload_from_string(b'x', 'missing')
+        self.requests[:] = []
+        self.assertEqual(self.bucket.exist_many(['missing']),
+                         {'missing': True})
+        self.assertEqual(self.requests, ['HEAD'])
+
+    def tearDown(self):
+        self.aws.stop()
+        registry.clear()
+
+
+class S3PresignTest(BaseTest):
+    keys = ['a/b c+d.jpg', '/gallery/ümläut~1.png']
+
+    def bucket(self, **kwargs):
+        return S3Bucket(
+            bucket_name='test-bucket',
+            region_name=self.region_name,
+            aws_access_key_id=self.aws_access_key_id,
+            aws_secret_access_key=self.aws_secret_access_key,
+            **kwargs
+        )
+
+    @staticmethod
+    def botocore_url(bucket, key, content_type=None):
+        def add_content_type(request, **kwargs):
+            if content_type:
+                request.headers['Content-Type'] = content_type
+
+        client = bucket.client.instance
+        client.meta.events.register('before-sign.s3.GetObject',
+                                    add_content_type,
+                                    unique_id='test-content-type')
+        try:
+            return client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': 'test-bucket', 'Key': key.lstrip('/')},
+                ExpiresIn=3600
+            )
+        finally:
+            client.meta.events.unregister('before-sign.s3.GetObject',
+                                          unique_id='test-content-type')
+
+    def assert_signed_like_botocore(self, bucket):
+        with FreezeTime(datetime.datetime(2014, 1, 1)):
+            for content_type in (None, 'image/jpeg'):
+                self.assertEqual(
+                    bucket.generate_urls(self.keys, 3600,
+                                         content_type=content_type),
+                    [self.botocore_url(bucket, key, content_type)
+                     for key in self.keys]
+                )
+
+    def test_sigv2_urls(self):
+        self.assert_signed_like_botocore(self.bucket())
+
+    def test_sigv4_urls_with_session_token(self):
+        self.assert_signed_like_botocore(self.bucket(
+            aws_session_token='session/token+=',
+            config=Config(signature_version='s3v4'),
+        ))
+
+    def test_none_keys_and_http_urls(self):
+        urls = self.bucket().generate_urls(['key', None],
+                                           force_http_url=True)
+        self.assertTrue(urls[0].startswith('http://test-bucket.'))
+        self.assertIsNone(urls[1])
+        self.assertIsNone(self.bucket().generate_url(None))
+
+    def test_url_cache(self):
+        clock = [1000000.0]
+        cache = UrlCache(max_size=2, min_remaining=0.5, granularity=600,
+                         clock=lambda: clock[0])
+        bucket = self.bucket(url_cache=cache)
+        url = bucket.generate_url('key', 3600)
+        # signed as of start of time bucket
+        self.assertIn('Expires={}'.format(999600 + 3600), url)
+        clock[0] += 1200
+        self.assertEqual(bucket.generate_url('/key', 3600), url)
+        self.assertEqual(cache.stats['hits'], 1)
+        # half of validity left, signed again
+        clock[0] += 400
+        fresh = bucket.generate_url('key', 3600)
+        self.assertIn('Expires={}'.format(1001400 + 3600), fresh)
+        # same url from another cache in the same time bucket
+        other = self.bucket(url_cache=UrlCache(granularity=600,
+                                               clock=lambda: clock[0]))
+        self.assertEqual(other.generate_url('key', 3600), fresh)
+        bucket.generate_urls(['a', 'b'], 3600)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+    def test_cloudfront_url_cache(self):
+        clock = [1000000.0]
+        bucket = self.bucket(url_cache=UrlCache(granularity=600,
+                                                clock=lambda: clock[0]))
+        kwargs = dict(cloudfront_domain='test.domain',
+                      cloudfront_key_id=self.aws_access_key_id,
+                      cloudfront_private_key=self.private_key,
+                      url_expiration_time=3600)
+        url = bucket.generate_cloudfront_url('key', **kwargs)
+        self.assertIn('Expires={}'.format(999600 + 3600), url)
+        clock[0] += 300
+        self.assertIs(bucket.generate_cloudfront_url('/key', **kwargs), url)
+        self.assertTrue(bucket.generate_cloudfront_url(
+            'key', force_http_url=True, **kwargs
+        ).startswith('http://test.domain/key?'))
+
+    def cloudfront_args(self):
+        return ('test.domain', self.aws_access_key_id, self.private_key)
+
+    def assert_policy_signed(self, policy, signature, resource):
+        def decode(value):
+            return base64.b64decode(value.replace('-', '+').replace(
+                '_', '=').replace('~', '/'))
+
+        policy = decode(policy)
+        private_key = rsa.PrivateKey.load_pkcs1(self.private_key.encode())
+        rsa.verify(policy, decode(signature),
+                   rsa.PublicKey(private_key.n, private_key.e))
+        statement = json.loads(policy.decode())['Statement'][0]
+        self.assertEqual(statement['Resource'], resource)
+        return statement['Condition']
+
+    def test_cloudfront_signer_reused(self):
+        bucket = self.bucket()
+        signer = bucket.cloudfront_signer(*self.cloudfront_args())
+        self.assertIs(bucket.cloudfront_signer(*self.cloudfront_args()),
+                      signer)
+
+        def rsa_signer(message):
+            return rsa.sign(message, rsa.PrivateKey.load_pkcs1(
+                self.private_key.encode()), 'SHA-1')
+
+        with FreezeTime(datetime.datetime(2014, 1, 1)):
+            expected = CloudFrontSigner(
+                self.aws_access_key_id, rsa_signer
+            ).generate_presigned_url(
+                'https://test.domain/a/b.jpg',
+                date_less_than=datetime.datetime(2014, 1, 1, 1)
+            )
+            self.assertEqual(bucket.generate_cloudfront_urls(
+                ['/a/b.jpg', None], *self.cloudfront_args(),
+                url_expiration_time=3600
+            ), [expected, None])
+
+    def test_cloudfront_pattern_urls(self):
+        urls = self.bucket().generate_cloudfront_urls(
+            ['gallery/1.jpg', 'gallery/2.jpg'], *self.cloudfront_args(),
+            url_expiration_time=3600, pattern='gallery/*'
+        )
+        self.assertTrue(urls[0].startswith('https://test.domain/'
+                                           'gallery/1.jpg?Policy='))
+        self.assertEqual(urls[0].split('?')[1], urls[1].split('?')[1])
+        params = dict(parse_qsl(urls[0].split('?')[1]))
+        self.assertEqual(params['Key-Pair-Id'], self.aws_access_key_id)
+        self.assert_policy_signed(params['Policy'], params['Signature'],
+                                  'http*://test.domain/gallery/*')
+
+    def test_cloudfront_pattern_rejects_other_keys(self):
+        with self.assertRaises(ValueError) as context:
+            self.bucket().generate_cloudfront_urls(
+                ['gallery/1.jpg', 'private/2.jpg'], *self.cloudfront_args(),
+                url_expiration_time=3600, pattern='/gallery/*'
+            )
+        self.assertIn('private/2.jpg', str(context.exception))
+
+    def test_cloudfront_cookies(self):
+        with FreezeTime(datetime.datetime(2014, 1, 1)):
+            cookies = self.bucket().generate_cloudfront_cookies(
+                '/gallery/12/', *self.cloudfront_args(),
+                url_expiration_time=3600, ip_address='10.0.0.1'
+            )
+        self.assertEqual(cookies['CloudFront-Key-Pair-Id'],
+                         self.aws_access_key_id)
+        condition = self.assert_policy_signed(
+            cookies['CloudFront-Policy'], cookies['CloudFront-Signature'],
+            'http*://test.domain/gallery/12/*'
+        )
+        self.assertEqual(condition, {
+            'DateLessThan': {'AWS:EpochTime': 1388538000},
+            'IpAddress': {'AWS:SourceIp': '10.0.0.1/32'},
+        })
+
+    def tearDown(self):
+        registry.clear()
@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+from mock import patch
+
+from aws_client.sqs.queue import SQSQueue
+from tests.base_test import BaseTest
+
+QUEUE_URL = 'https://sqs.us-east-1.amazonaws.com/1234567890/test-queue'
+
+
+class SQSQueueTest(BaseTest):
+    def setUp(self):
+        self.calls = []
+
+    def make_api_call(self, operation_name, kwargs):
+        self.calls.append(operation_name)
+        if operation_name == 'GetQueueUrl':
+            return {'QueueUrl': QUEUE_URL}
+        if operation_name == 'ReceiveMessage':
+            return {'Messages': [
+                {'MessageId': '1', 'ReceiptHandle': 'handle', 'Body': '{}'}
+            ]}
+        return {}
+
+    def test_constructor_is_lazy(self):
+        test = self
+
+        def make_api_call(client, operation_name, kwargs):
+            return test.make_api_call(operation_name, kwargs)
+
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            queue = SQSQueue('test-queue', self.region_name,
+                             self.aws_access_key_id,
+                             self.aws_secret_access_key,
+                             use_resource=False)
+            self.assertEqual(self.calls, [])
+            messages = queue.receive_messages(count=10)
+            queue.delete_messages([m['ReceiptHandle'] for m in messages])
+            queue.send_messages({'test': 1})
+
+        self.assertEqual(self.calls, ['GetQueueUrl', 'ReceiveMessage',
+                                      'DeleteMessageBatch', 'SendMessageBatch'])
+        self.assertEqual(queue.get_queue_url(), QUEUE_URL)
+
+    def test_receive_messages_returns_resources(self):
+        test = self
+
+        def make_api_call(client, operation_name, kwargs):
+            return test.make_api_call(operation_name, kwargs)
+
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            queue = SQSQueue('test-queue', self.region_name,
+                             self.aws_access_key_id,
+                             self.aws_secret_access_key)
+            messages = queue.receive_messages()
+
+        self.assertEqual([(m.queue_url, m.receipt_handle, m.body)
+                          for m in messages],
+                         [(QUEUE_URL, 'handle', '{}')])
+        self.assertEqual(self.calls[-1], 'ReceiveMessage')
+
+    def test_assigned_queue_url_is_used(self):
+        test = self
+        queue_urls = []
+
+        def make_api_call(client, operation_name, kwargs):
+            queue_urls.append(kwargs.get('QueueUrl'))
+            return test.make_api_call(operation_name, kwargs)
+
+        other_url = QUEUE_URL.replace('test-queue', 'other-queue')
+        with patch('botocore.client.BaseClient._make_api_call',
+                   new=make_api_call):
+            queue = SQSQueue('test-queue', self.region_name,
+                             self.aws_access_key_id,
+                             self.aws_secret_access_key,
+                             use_resource=False)
+            queue.queue_url = other_url
+            queue.receive_messages()
+
+        self.assertEqual(self.calls, ['ReceiveMessage'])
+        self.assertEqual(queue_urls, [other_url])
+        self.assertEqual(queue.get_queue_url(), other_url)